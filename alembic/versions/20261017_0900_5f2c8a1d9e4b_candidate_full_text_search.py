@@ -0,0 +1,52 @@
+"""candidate full text search
+
+Revision ID: 5f2c8a1d9e4b
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f2c8a1d9e4b'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# Frozen copy of app.models.candidate.CANDIDATE_SEARCH_DOCUMENT
+SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || "
+    "coalesce(last_name, '') || ' ' || coalesce(email, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(current_title, '') || ' ' || "
+    "coalesce(current_company, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(summary, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(resume_text, '')), 'D')"
+)
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS throughout: databases bootstrapped with scripts/init_db.py
+    # already have these objects from create_all
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "ALTER TABLE candidates ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({SEARCH_DOCUMENT}) STORED"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_candidates_search_vector "
+        "ON candidates USING gin (search_vector)"
+    )
+    for column in ("first_name", "last_name", "email"):
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_candidates_{column}_trgm "
+            f"ON candidates USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    for column in ("first_name", "last_name", "email"):
+        op.execute(f"DROP INDEX IF EXISTS ix_candidates_{column}_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_candidates_search_vector")
+    op.execute("ALTER TABLE candidates DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,35 @@
+"""candidate structured search indexes
+
+Revision ID: 8b1e4d7a2c6f
+Revises: 5f2c8a1d9e4b
+Create Date: 2026-10-17 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e4d7a2c6f'
+down_revision = '5f2c8a1d9e4b'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_candidates_years_of_experience": "candidates (years_of_experience)",
+    "ix_candidates_expected_salary": "candidates (expected_salary_min, expected_salary_max)",
+    "ix_candidates_preferred_locations": "candidates USING gin (preferred_locations)",
+    "ix_candidates_availability_remote": "candidates (availability_status, remote_work_preference)",
+    "ix_candidate_skills_candidate_id": "candidate_skills (candidate_id)",
+    "ix_candidate_skills_skill_id_candidate_id": "candidate_skills (skill_id, candidate_id)",
+}
+
+
+def upgrade() -> None:
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade() -> None:
+    for name in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
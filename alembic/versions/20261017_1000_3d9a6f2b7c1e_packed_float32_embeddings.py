@@ -0,0 +1,69 @@
+"""packed float32 embeddings
+
+Revision ID: 3d9a6f2b7c1e
+Revises: 8b1e4d7a2c6f
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+import json
+import struct
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d9a6f2b7c1e'
+down_revision = '8b1e4d7a2c6f'
+branch_labels = None
+depends_on = None
+
+EMBEDDING_COLUMNS = (("candidates", "embedding_vector"), ("jobs", "job_embedding"))
+
+
+def column_type(table: str, column: str) -> str:
+    return op.get_bind().execute(
+        sa.text(
+            "SELECT data_type FROM information_schema.columns "
+            "WHERE table_name = :table AND column_name = :column"
+        ),
+        {"table": table, "column": column}
+    ).scalar()
+
+
+def upgrade() -> None:
+    for table, column in EMBEDDING_COLUMNS:
+        # Databases bootstrapped with scripts/init_db.py are already bytea
+        if column_type(table, column) != "text":
+            continue
+        # JSON array -> big-endian float32 bytes, the format of
+        # app.utils.ai_helpers.encode_embedding (float4send is big-endian)
+        op.add_column(table, sa.Column(f"{column}_packed", sa.LargeBinary(), nullable=True))
+        op.execute(
+            f"UPDATE {table} SET {column}_packed = ("
+            "SELECT string_agg(float4send(e.value::float4), ''::bytea ORDER BY e.n) "
+            f"FROM json_array_elements_text({column}::json) WITH ORDINALITY AS e(value, n)"
+            f") WHERE {column} IS NOT NULL"
+        )
+        op.drop_column(table, column)
+        op.alter_column(table, f"{column}_packed", new_column_name=column)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_candidates_updated_at ON candidates (updated_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_candidates_updated_at")
+    connection = op.get_bind()
+    for table, column in EMBEDDING_COLUMNS:
+        if column_type(table, column) != "bytea":
+            continue
+        op.add_column(table, sa.Column(f"{column}_json", sa.Text(), nullable=True))
+        # No float4 decoder is callable from SQL, so unpack in Python
+        rows = connection.execute(sa.text(f"SELECT id, {column} FROM {table} WHERE {column} IS NOT NULL"))
+        for row_id, packed in rows.fetchall():
+            values = struct.unpack(f">{len(packed) // 4}f", packed)
+            connection.execute(
+                sa.text(f"UPDATE {table} SET {column}_json = :value WHERE id = :id"),
+                {"value": json.dumps(list(values)), "id": row_id}
+            )
+        op.drop_column(table, column)
+        op.alter_column(table, f"{column}_json", new_column_name=column)
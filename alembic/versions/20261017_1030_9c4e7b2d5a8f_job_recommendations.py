@@ -0,0 +1,45 @@
+"""job recommendations
+
+Revision ID: 9c4e7b2d5a8f
+Revises: 3d9a6f2b7c1e
+Create Date: 2026-10-17 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c4e7b2d5a8f'
+down_revision = '3d9a6f2b7c1e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: databases bootstrapped with scripts/init_db.py already
+    # have the table from create_all
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS job_recommendations (
+            id SERIAL PRIMARY KEY,
+            job_id INTEGER NOT NULL REFERENCES jobs (id),
+            candidate_id INTEGER NOT NULL REFERENCES candidates (id),
+            score DOUBLE PRECISION NOT NULL,
+            rank INTEGER NOT NULL,
+            computed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            is_active BOOLEAN NOT NULL,
+            CONSTRAINT uq_job_recommendations_job_candidate UNIQUE (job_id, candidate_id)
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_job_recommendations_id ON job_recommendations (id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_job_recommendations_job_rank ON job_recommendations (job_id, rank)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_job_recommendations_candidate_score "
+        "ON job_recommendations (candidate_id, score)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS job_recommendations")
@@ -0,0 +1,51 @@
+"""skill category closure
+
+Revision ID: 6e1b3c9f4d2a
+Revises: 9c4e7b2d5a8f
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e1b3c9f4d2a'
+down_revision = '9c4e7b2d5a8f'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of app.services.skill_service.REBUILD_CLOSURE_SQL
+REBUILD_CLOSURE_SQL = """
+    WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+        SELECT id, id, 0 FROM skill_categories
+        UNION ALL
+        SELECT tree.ancestor_id, child.id, tree.depth + 1
+        FROM tree JOIN skill_categories child ON child.parent_id = tree.descendant_id
+    )
+    INSERT INTO skill_category_closure (ancestor_id, descendant_id, depth)
+    SELECT ancestor_id, descendant_id, depth FROM tree
+"""
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: databases bootstrapped with scripts/init_db.py already
+    # have the table from create_all
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS skill_category_closure (
+            ancestor_id INTEGER NOT NULL REFERENCES skill_categories (id) ON DELETE CASCADE,
+            descendant_id INTEGER NOT NULL REFERENCES skill_categories (id) ON DELETE CASCADE,
+            depth INTEGER NOT NULL,
+            PRIMARY KEY (ancestor_id, descendant_id)
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_skill_category_closure_descendant "
+        "ON skill_category_closure (descendant_id, ancestor_id)"
+    )
+    op.execute("DELETE FROM skill_category_closure")
+    op.execute(REBUILD_CLOSURE_SQL)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS skill_category_closure")
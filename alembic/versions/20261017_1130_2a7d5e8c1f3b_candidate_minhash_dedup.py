@@ -0,0 +1,50 @@
+"""candidate minhash dedup
+
+Revision ID: 2a7d5e8c1f3b
+Revises: 6e1b3c9f4d2a
+Create Date: 2026-10-17 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2a7d5e8c1f3b'
+down_revision = '6e1b3c9f4d2a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: databases bootstrapped with scripts/init_db.py already
+    # have the tables from create_all. Existing candidates are indexed by
+    # scripts/cluster_duplicate_candidates.py.
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_minhashes (
+            candidate_id INTEGER PRIMARY KEY REFERENCES candidates (id) ON DELETE CASCADE,
+            profile_signature BYTEA,
+            resume_signature BYTEA,
+            cluster_id INTEGER NOT NULL,
+            computed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_candidate_minhashes_cluster_id ON candidate_minhashes (cluster_id)"
+    )
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS candidate_lsh_buckets (
+            band SMALLINT NOT NULL,
+            bucket BIGINT NOT NULL,
+            candidate_id INTEGER NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+            PRIMARY KEY (band, bucket, candidate_id)
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_candidate_lsh_buckets_candidate_id ON candidate_lsh_buckets (candidate_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS candidate_lsh_buckets")
+    op.execute("DROP TABLE IF EXISTS candidate_minhashes")
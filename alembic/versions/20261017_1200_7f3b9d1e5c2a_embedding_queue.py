@@ -0,0 +1,42 @@
+"""embedding queue
+
+Revision ID: 7f3b9d1e5c2a
+Revises: 2a7d5e8c1f3b
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3b9d1e5c2a'
+down_revision = '2a7d5e8c1f3b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: databases bootstrapped with scripts/init_db.py already
+    # have these from create_all. Existing rows have no embedding_hash, so
+    # the embedding worker's first sweep queues all of them.
+    op.execute("ALTER TABLE candidates ADD COLUMN IF NOT EXISTS embedding_hash VARCHAR(64)")
+    op.execute("ALTER TABLE jobs ADD COLUMN IF NOT EXISTS embedding_hash VARCHAR(64)")
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS embedding_queue (
+            entity_type VARCHAR(20) NOT NULL,
+            entity_id INTEGER NOT NULL,
+            enqueued_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            available_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            PRIMARY KEY (entity_type, entity_id)
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_embedding_queue_available_at ON embedding_queue (available_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS embedding_queue")
+    op.execute("ALTER TABLE jobs DROP COLUMN IF EXISTS embedding_hash")
+    op.execute("ALTER TABLE candidates DROP COLUMN IF EXISTS embedding_hash")
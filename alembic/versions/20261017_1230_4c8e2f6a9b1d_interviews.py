@@ -0,0 +1,73 @@
+"""interviews
+
+Revision ID: 4c8e2f6a9b1d
+Revises: 7f3b9d1e5c2a
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8e2f6a9b1d'
+down_revision = '7f3b9d1e5c2a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: databases bootstrapped with scripts/init_db.py already
+    # have these from create_all
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS interviews (
+            id SERIAL PRIMARY KEY,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            is_active BOOLEAN NOT NULL,
+            uuid UUID NOT NULL UNIQUE,
+            company_id INTEGER NOT NULL REFERENCES companies (id),
+            candidate_id INTEGER NOT NULL REFERENCES candidates (id),
+            job_id INTEGER REFERENCES jobs (id),
+            title VARCHAR(200) NOT NULL,
+            interview_type VARCHAR(50),
+            status VARCHAR(20),
+            scheduled_at TIMESTAMP WITHOUT TIME ZONE,
+            duration_minutes INTEGER,
+            started_at TIMESTAMP WITHOUT TIME ZONE,
+            completed_at TIMESTAMP WITHOUT TIME ZONE
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_interviews_id ON interviews (id)")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_interviews_candidate_id ON interviews (candidate_id)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_interviews_company_id_scheduled_at ON interviews (company_id, scheduled_at)"
+    )
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS interview_responses (
+            id SERIAL PRIMARY KEY,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            is_active BOOLEAN NOT NULL,
+            interview_id INTEGER NOT NULL REFERENCES interviews (id) ON DELETE CASCADE,
+            question TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            rubric TEXT,
+            score DOUBLE PRECISION,
+            feedback TEXT,
+            follow_up_question TEXT,
+            model VARCHAR(100),
+            prompt_tokens INTEGER,
+            completion_tokens INTEGER,
+            evaluated_at TIMESTAMP WITHOUT TIME ZONE
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_interview_responses_id ON interview_responses (id)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_interview_responses_interview_id ON interview_responses (interview_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS interview_responses")
+    op.execute("DROP TABLE IF EXISTS interviews")
@@ -0,0 +1,33 @@
+"""interview sessions
+
+Revision ID: b5d1a7e3c9f2
+Revises: 4c8e2f6a9b1d
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d1a7e3c9f2'
+down_revision = '4c8e2f6a9b1d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: databases bootstrapped with scripts/init_db.py already
+    # have this from create_all
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS interview_sessions (
+            interview_id INTEGER PRIMARY KEY REFERENCES interviews (id) ON DELETE CASCADE,
+            seq BIGINT NOT NULL,
+            state JSONB NOT NULL,
+            updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS interview_sessions")
@@ -0,0 +1,45 @@
+"""interview scheduling
+
+Revision ID: e2a6c4f8d3b7
+Revises: b5d1a7e3c9f2
+Create Date: 2026-10-17 13:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a6c4f8d3b7'
+down_revision = 'b5d1a7e3c9f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: databases bootstrapped with scripts/init_db.py already
+    # have these from create_all
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS interview_interviewers (
+            interview_id INTEGER NOT NULL REFERENCES interviews (id) ON DELETE CASCADE,
+            user_id INTEGER NOT NULL REFERENCES users (id),
+            starts_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            ends_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            active BOOLEAN NOT NULL DEFAULT true,
+            PRIMARY KEY (interview_id, user_id)
+        )
+    """)
+    # Double-booking checks: one range scan per interviewer over live bookings
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_interview_interviewers_user_id_starts_at "
+        "ON interview_interviewers (user_id, starts_at) WHERE active"
+    )
+    # Lets the scheduling index pull only interviews changed since its last sync
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_interviews_company_id_updated_at ON interviews (company_id, updated_at)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_interviews_company_id_updated_at")
+    op.execute("DROP TABLE IF EXISTS interview_interviewers")
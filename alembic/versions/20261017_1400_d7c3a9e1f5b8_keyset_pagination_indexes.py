@@ -0,0 +1,37 @@
+"""keyset pagination indexes
+
+Revision ID: d7c3a9e1f5b8
+Revises: e2a6c4f8d3b7
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7c3a9e1f5b8'
+down_revision = 'e2a6c4f8d3b7'
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_candidates_created_at_id": "candidates (created_at, id)",
+    "ix_companies_created_at_id": "companies (created_at, id)",
+    "ix_users_created_at_id": "users (created_at, id)",
+    "ix_company_users_user_id_company_id": "company_users (user_id, company_id)",
+}
+
+
+def upgrade() -> None:
+    # CONCURRENTLY can't run inside a transaction, and avoids locking these
+    # tables against writes while the indexes build
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {definition}")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,35 @@
+"""submission fingerprints
+
+Revision ID: a4f8c2e6b1d9
+Revises: d7c3a9e1f5b8
+Create Date: 2026-10-17 14:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4f8c2e6b1d9'
+down_revision = 'd7c3a9e1f5b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: databases bootstrapped with scripts/init_db.py already
+    # have the table from create_all
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS submission_fingerprints (
+            problem_key VARCHAR(100) NOT NULL,
+            submission_id INTEGER NOT NULL,
+            fingerprints BYTEA NOT NULL,
+            lines BYTEA NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            PRIMARY KEY (problem_key, submission_id)
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS submission_fingerprints")
@@ -0,0 +1,34 @@
+"""interview response session seq
+
+Revision ID: c3e7a1f9d5b2
+Revises: a4f8c2e6b1d9
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e7a1f9d5b2'
+down_revision = 'a4f8c2e6b1d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: databases bootstrapped with scripts/init_db.py already
+    # have these from create_all
+    op.execute("ALTER TABLE interview_responses ADD COLUMN IF NOT EXISTS session_seq BIGINT")
+    # Live-session answers insert ON CONFLICT DO NOTHING against this, so a
+    # retried flush can't save an answer twice; NULLs (answers from the
+    # streaming endpoints) never conflict
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_interview_responses_interview_id_session_seq "
+        "ON interview_responses (interview_id, session_seq)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS uq_interview_responses_interview_id_session_seq")
+    op.execute("ALTER TABLE interview_responses DROP COLUMN IF EXISTS session_seq")
@@ -0,0 +1,30 @@
+"""submission fingerprints created_at index
+
+Revision ID: f1b6d4a8c2e9
+Revises: c3e7a1f9d5b2
+Create Date: 2026-10-17 15:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b6d4a8c2e9'
+down_revision = 'c3e7a1f9d5b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: databases bootstrapped with scripts/init_db.py already
+    # have these from create_all. Plagiarism checks read only a problem's
+    # fingerprints stored since their previous load
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_submission_fingerprints_problem_key_created_at "
+        "ON submission_fingerprints (problem_key, created_at)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_submission_fingerprints_problem_key_created_at")
@@ -1,55 +1,108 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import or_, and_, distinct, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload, undefer
+from typing import Any, Dict, List, Literal, Optional, Set
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.exceptions import NotFoundError, ValidationError
+from app.core.pagination import paginate
 from app.core.security import get_current_active_user
 from app.models.user import User
-from app.models.candidate import Candidate, CandidateSkill, Skill
+from app.models.candidate import Candidate, CandidateMinHash, CandidateSkill, Skill, SkillCategoryClosure
+from app.services import candidate_service
+from app.services.candidate_service import calculate_profile_completion
+from app.services.embedding_service import CANDIDATE, CANDIDATE_EMBEDDING_FIELDS, enqueue_embeddings
+from app.services.similarity_service import candidate_deduplicator
+from app.services.skill_service import skill_category_tree
+from app.utils.file_handler import iter_csv_records, iter_ndjson_records
 from app.schemas.candidate import (
     Candidate as CandidateSchema,
+    CandidateSkill as CandidateSkillSchema,
+    CandidateSummary,
     CandidateCreate,
     CandidateUpdate,
-    CandidateSearch
+    CandidateSearch,
+    CandidateSearchFacets,
+    CandidateSearchResponse,
+    CandidateImportResult,
+    DuplicateCandidate
 )
-from app.schemas.common import BaseResponse, PaginatedResponse, PaginationMeta
+from app.schemas.common import BaseResponse, PaginatedResponse
 
 router = APIRouter()
 
+# Fields that feed the near-duplicate signatures; updating one re-indexes the candidate
+DUPLICATE_INDEX_FIELDS = {"first_name", "last_name", "phone_number", "linkedin_url", "github_url"}
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return (sparse fieldset), e.g. id,first_name,last_name,skills"
+
+# CandidateSchema serializes skills -> skill, which cannot be lazy loaded on an
+# AsyncSession, so every read path loads the graph up front
+def candidate_skill_options():
+    return selectinload(Candidate.skills).selectinload(CandidateSkill.skill)
+
+def parse_fields(fields: Optional[str]) -> Optional[Set[str]]:
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(CandidateSchema.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested | {"id"}
+
+def candidate_load_options(fields: Optional[Set[str]] = None, detail: bool = False) -> list:
+    """Loader options for a read path.
+
+    Heavy Text columns are deferred on the model; only detail views undefer
+    resume_text. A sparse fieldset narrows the SELECT to the requested
+    columns and skips the skill queries unless ``skills`` was asked for.
+    """
+    if fields is None:
+        options = [candidate_skill_options()]
+        if detail:
+            options.append(undefer(Candidate.resume_text))
+        return options
+    # created_at/id are the keyset pagination sort key
+    columns = [getattr(Candidate, field) for field in fields | {"created_at"} if field != "skills"]
+    options = [load_only(*columns)]
+    if "skills" in fields:
+        options.append(candidate_skill_options())
+    return options
+
+def candidate_fields(candidate: Candidate, fields: Set[str]) -> Dict[str, Any]:
+    data = {field: getattr(candidate, field) for field in fields if field != "skills"}
+    if "skills" in fields:
+        data["skills"] = [CandidateSkillSchema.from_orm(skill) for skill in candidate.skills]
+    return data
+
+def sparse_response(response, candidates, fields: Set[str]) -> JSONResponse:
+    # Bypasses response_model validation, which would reject the partial objects
+    response.data = [candidate_fields(candidate, fields) for candidate in candidates]
+    return JSONResponse(content=jsonable_encoder(response))
+
+async def get_candidate_with_skills(
+    db: AsyncSession, candidate_id: int, fields: Optional[Set[str]] = None
+) -> Optional[Candidate]:
+    return await db.scalar(
+        select(Candidate)
+        .options(*candidate_load_options(fields, detail=True))
+        .where(Candidate.id == candidate_id)
+        .execution_options(populate_existing=True)
+    )
+
 @router.post("/", response_model=BaseResponse[CandidateSchema])
 async def create_candidate(
     candidate_data: CandidateCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    # Check if candidate email already exists
-    existing_candidate = db.query(Candidate).filter(
-        Candidate.email == candidate_data.email
-    ).first()
-    if existing_candidate:
-        raise HTTPException(status_code=400, detail="Candidate email already exists")
-    
-    # Create candidate
-    candidate_dict = candidate_data.dict(exclude={'skills'})
-    db_candidate = Candidate(**candidate_dict)
-    db.add(db_candidate)
-    db.commit()
-    db.refresh(db_candidate)
-    
-    # Add skills if provided
-    if candidate_data.skills:
-        for skill_data in candidate_data.skills:
-            candidate_skill = CandidateSkill(
-                candidate_id=db_candidate.id,
-                **skill_data.dict()
-            )
-            db.add(candidate_skill)
-        db.commit()
-    
-    # Calculate profile completion score
-    db_candidate.profile_completion_score = calculate_profile_completion(db_candidate)
-    db.commit()
+    try:
+        db_candidate = await candidate_service.create_candidate(db, candidate_data)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
     
     return BaseResponse(
         data=CandidateSchema.from_orm(db_candidate),
@@ -57,71 +110,202 @@ async def create_candidate(
         code="CANDIDATE_CREATED"
     )
 
-@router.get("/", response_model=PaginatedResponse[CandidateSchema])
+@router.post("/import", response_model=BaseResponse[CandidateImportResult])
+async def import_candidates(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = Query(None, description="Body format; inferred from Content-Type when omitted"),
+    on_conflict: Literal["update", "skip"] = Query("update", description="What to do with rows whose email already exists"),
+    chunk_size: int = Query(1000, ge=1, le=5000, description="Rows validated and written per transaction"),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream a CSV (header row) or NDJSON (one CandidateCreate per line) body"""
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        if "csv" in content_type:
+            format = "csv"
+        elif "ndjson" in content_type or "jsonl" in content_type:
+            format = "ndjson"
+        else:
+            raise HTTPException(
+                status_code=415,
+                detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson"
+            )
+    
+    records = iter_csv_records(request.stream()) if format == "csv" else iter_ndjson_records(request.stream())
+    result = await candidate_service.import_candidates(
+        db,
+        records,
+        from_csv=format == "csv",
+        chunk_size=chunk_size,
+        on_conflict=on_conflict
+    )
+    
+    return BaseResponse(
+        data=result,
+        message="Candidate import completed",
+        code="CANDIDATES_IMPORTED"
+    )
+
+@router.get("/", response_model=PaginatedResponse[CandidateSummary])
 async def get_candidates(
     page: int = 1,
     size: int = 20,
-    search: Optional[str] = Query(None, description="Search in name, email, or skills"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; switches to keyset pagination"),
+    include_total: bool = Query(True, description="Include a (cached) total_count"),
+    search: Optional[str] = Query(None, description="Full-text search over name, email, title, company, summary and resume; results are ranked"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    offset = (page - 1) * size
-    query = db.query(Candidate)
+    selected = parse_fields(fields)
+    query = select(Candidate)
+    order_by = None
     
     if search:
-        search_filter = or_(
-            Candidate.first_name.ilike(f"%{search}%"),
-            Candidate.last_name.ilike(f"%{search}%"),
-            Candidate.email.ilike(f"%{search}%"),
-            Candidate.current_title.ilike(f"%{search}%"),
-            Candidate.current_company.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
-    
-    candidates = query.offset(offset).limit(size).all()
-    total_count = query.count()
-    total_pages = (total_count + size - 1) // size
-    
-    pagination = PaginationMeta(
-        page_index=page,
-        page_size=size,
-        total_count=total_count,
-        total_pages=total_pages,
-        has_previous=page > 1,
-        has_next=page < total_pages
+        search_filter, order_by = text_search(search)
+        query = query.where(search_filter)
+    
+    candidates, pagination = await paginate(
+        db,
+        query.options(*candidate_load_options(selected)),
+        Candidate,
+        page=page,
+        size=size,
+        cursor=cursor,
+        include_total=include_total,
+        order_by=order_by
     )
     
-    return PaginatedResponse(
-        data=[CandidateSchema.from_orm(candidate) for candidate in candidates],
+    response = PaginatedResponse(
+        data=[],
         pagination=pagination,
         message="Candidates retrieved successfully",
         code="CANDIDATES_RETRIEVED"
     )
+    if selected is not None:
+        return sparse_response(response, candidates, selected)
+    response.data = [CandidateSummary.from_orm(candidate) for candidate in candidates]
+    return response
+
+@router.post("/search", response_model=CandidateSearchResponse)
+async def search_candidates(
+    search: CandidateSearch,
+    page: int = 1,
+    size: int = 20,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; not available with a text query"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    selected = parse_fields(fields)
+    category_skill_ids = None
+    if search.skill_categories:
+        category_skill_ids = await skill_category_tree.skill_ids(db, search.skill_categories)
+    filters, order_by = build_search_filters(search, category_skill_ids)
+    
+    candidates, pagination = await paginate(
+        db,
+        select(Candidate).where(*filters).options(*candidate_load_options(selected)),
+        Candidate,
+        page=page,
+        size=size,
+        cursor=cursor,
+        include_total=False,
+        order_by=order_by
+    )
+    
+    facets, total_count = await compute_search_facets(db, filters)
+    pagination.total_count = total_count
+    pagination.total_pages = (total_count + size - 1) // size
+    
+    response = CandidateSearchResponse(
+        data=[],
+        pagination=pagination,
+        facets=facets,
+        message="Candidates searched successfully",
+        code="CANDIDATES_SEARCHED"
+    )
+    if selected is not None:
+        return sparse_response(response, candidates, selected)
+    response.data = [CandidateSummary.from_orm(candidate) for candidate in candidates]
+    return response
 
 @router.get("/{candidate_id}", response_model=BaseResponse[CandidateSchema])
 async def get_candidate(
     candidate_id: int,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+    selected = parse_fields(fields)
+    candidate = await get_candidate_with_skills(db, candidate_id, selected)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
+    if selected is not None:
+        return JSONResponse(content=jsonable_encoder(BaseResponse(
+            data=candidate_fields(candidate, selected),
+            message="Candidate retrieved successfully",
+            code="CANDIDATE_RETRIEVED"
+        )))
+    
     return BaseResponse(
         data=CandidateSchema.from_orm(candidate),
         message="Candidate retrieved successfully",
         code="CANDIDATE_RETRIEVED"
     )
 
+@router.get("/{candidate_id}/duplicates", response_model=BaseResponse[List[DuplicateCandidate]])
+async def get_candidate_duplicates(
+    candidate_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Likely duplicate profiles of a candidate (MinHash/LSH lookup), most similar first"""
+    try:
+        matches = (await candidate_deduplicator.find_duplicates(db, candidate_id))[:limit]
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    
+    rows = {
+        row.id: row
+        for row in await db.execute(
+            select(Candidate.id, Candidate.first_name, Candidate.last_name, Candidate.email, CandidateMinHash.cluster_id)
+            .outerjoin(CandidateMinHash, CandidateMinHash.candidate_id == Candidate.id)
+            .where(Candidate.id.in_([match.candidate_id for match in matches]))
+        )
+    }
+    data = [
+        DuplicateCandidate(
+            candidate_id=match.candidate_id,
+            first_name=rows[match.candidate_id].first_name,
+            last_name=rows[match.candidate_id].last_name,
+            email=rows[match.candidate_id].email,
+            cluster_id=rows[match.candidate_id].cluster_id,
+            similarity=round(match.similarity, 4),
+            profile_similarity=round(match.profile_similarity, 4),
+            resume_similarity=round(match.resume_similarity, 4)
+        )
+        for match in matches
+        if match.candidate_id in rows
+    ]
+    
+    return BaseResponse(
+        data=data,
+        message="Candidate duplicates retrieved successfully",
+        code="CANDIDATE_DUPLICATES_RETRIEVED"
+    )
+
 @router.put("/{candidate_id}", response_model=BaseResponse[CandidateSchema])
 async def update_candidate(
     candidate_id: int,
     candidate_update: CandidateUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    candidate = db.query(Candidate).filter(Candidate.id == candidate_id).first()
+    candidate = await get_candidate_with_skills(db, candidate_id)
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
@@ -132,8 +316,12 @@ async def update_candidate(
     # Recalculate profile completion score
     candidate.profile_completion_score = calculate_profile_completion(candidate)
     
-    db.commit()
-    db.refresh(candidate)
+    if DUPLICATE_INDEX_FIELDS & update_data.keys():
+        await db.flush()
+        await candidate_deduplicator.index_candidates(db, [candidate_id])
+    if CANDIDATE_EMBEDDING_FIELDS & update_data.keys():
+        await enqueue_embeddings(db, CANDIDATE, [candidate_id])
+    await db.commit()
     
     return BaseResponse(
         data=CandidateSchema.from_orm(candidate),
@@ -141,26 +329,125 @@ async def update_candidate(
         code="CANDIDATE_UPDATED"
     )
 
-def calculate_profile_completion(candidate: Candidate) -> float:
-    """Calculate profile completion score based on filled fields"""
-    total_fields = 15
-    completed_fields = 0
-    
-    # Check required fields
-    if candidate.first_name: completed_fields += 1
-    if candidate.last_name: completed_fields += 1
-    if candidate.email: completed_fields += 1
-    if candidate.phone_number: completed_fields += 1
-    if candidate.current_title: completed_fields += 1
-    if candidate.current_company: completed_fields += 1
-    if candidate.years_of_experience: completed_fields += 1
-    if candidate.summary: completed_fields += 1
-    if candidate.linkedin_url: completed_fields += 1
-    if candidate.github_url: completed_fields += 1
-    if candidate.portfolio_url: completed_fields += 1
-    if candidate.expected_salary_min: completed_fields += 1
-    if candidate.expected_salary_max: completed_fields += 1
-    if candidate.preferred_locations: completed_fields += 1
-    if candidate.remote_work_preference: completed_fields += 1
-    
-    return round((completed_fields / total_fields) * 100, 2)
\ No newline at end of file
+def text_search(term: str):
+    """Full-text filter and rank ordering for a free-text candidate query"""
+    # GIN-indexed tsvector match, plus trigram-indexed substring match on
+    # names/emails for partial input like "jo" or "@acme"
+    ts_query = func.websearch_to_tsquery("english", term)
+    search_filter = or_(
+        Candidate.search_vector.op("@@")(ts_query),
+        Candidate.first_name.ilike(f"%{term}%"),
+        Candidate.last_name.ilike(f"%{term}%"),
+        Candidate.email.ilike(f"%{term}%")
+    )
+    order_by = [func.ts_rank_cd(Candidate.search_vector, ts_query).desc(), Candidate.id.desc()]
+    return search_filter, order_by
+
+def build_search_filters(search: CandidateSearch, category_skill_ids: Optional[Set[int]] = None):
+    """Translate a CandidateSearch into WHERE clauses (and rank order for text queries).
+
+    ``category_skill_ids`` is ``search.skill_categories`` already expanded to
+    skill ids (see skill_service.skill_category_tree); without it the
+    expansion is done in SQL through the category closure table.
+    """
+    filters = []
+    order_by = None
+    
+    if search.query:
+        search_filter, order_by = text_search(search.query)
+        filters.append(search_filter)
+    
+    if search.skills:
+        # Candidates must have every requested skill
+        skill_names = {name.lower() for name in search.skills}
+        filters.append(Candidate.id.in_(
+            select(CandidateSkill.candidate_id)
+            .join(Skill, Skill.id == CandidateSkill.skill_id)
+            .where(func.lower(Skill.name).in_(skill_names))
+            .group_by(CandidateSkill.candidate_id)
+            .having(func.count(distinct(CandidateSkill.skill_id)) == len(skill_names))
+        ))
+    
+    if category_skill_ids is not None:
+        filters.append(Candidate.id.in_(
+            select(CandidateSkill.candidate_id).where(CandidateSkill.skill_id.in_(category_skill_ids))
+        ))
+    elif search.skill_categories:
+        filters.append(Candidate.id.in_(
+            select(CandidateSkill.candidate_id)
+            .join(Skill, Skill.id == CandidateSkill.skill_id)
+            .join(SkillCategoryClosure, SkillCategoryClosure.descendant_id == Skill.category_id)
+            .where(SkillCategoryClosure.ancestor_id.in_(search.skill_categories))
+        ))
+    
+    if search.min_experience is not None:
+        filters.append(Candidate.years_of_experience >= search.min_experience)
+    if search.max_experience is not None:
+        filters.append(Candidate.years_of_experience <= search.max_experience)
+    
+    if search.locations:
+        filters.append(Candidate.preferred_locations.overlap(search.locations))
+    
+    if search.remote_work_preference and search.remote_work_preference.lower() != "any":
+        filters.append(Candidate.remote_work_preference.in_(
+            [search.remote_work_preference.lower(), "any"]
+        ))
+    
+    if search.availability_status:
+        filters.append(Candidate.availability_status == search.availability_status)
+    
+    # Expected salary range must overlap the requested budget
+    if search.max_salary is not None:
+        filters.append(Candidate.expected_salary_min <= search.max_salary)
+    if search.min_salary is not None:
+        filters.append(Candidate.expected_salary_max >= search.min_salary)
+    
+    return filters, order_by
+
+async def compute_search_facets(db: AsyncSession, filters: list, max_skills: int = 50):
+    """Facet counts and the total match count from a single GROUPING SETS query"""
+    matched = select(
+        Candidate.id,
+        Candidate.availability_status,
+        Candidate.remote_work_preference
+    ).where(*filters).subquery()
+    
+    skill_name = Skill.name
+    stmt = (
+        select(
+            matched.c.availability_status,
+            matched.c.remote_work_preference,
+            skill_name,
+            func.grouping(matched.c.availability_status),
+            func.grouping(matched.c.remote_work_preference),
+            func.grouping(skill_name),
+            func.count(distinct(matched.c.id))
+        )
+        .select_from(matched)
+        .outerjoin(CandidateSkill, CandidateSkill.candidate_id == matched.c.id)
+        .outerjoin(Skill, Skill.id == CandidateSkill.skill_id)
+        .group_by(func.grouping_sets(
+            matched.c.availability_status,
+            matched.c.remote_work_preference,
+            skill_name,
+            literal_column("()")  # Empty grouping set: the total match count
+        ))
+    )
+    
+    facets = CandidateSearchFacets()
+    total_count = 0
+    skills = []
+    for status, remote, skill, g_status, g_remote, g_skill, count in await db.execute(stmt):
+        if g_status == 0:
+            facets.availability_status[status or "unknown"] = count
+        elif g_remote == 0:
+            facets.remote_work_preference[remote or "unknown"] = count
+        elif g_skill == 0:
+            if skill is not None:
+                skills.append((skill, count))
+        else:
+            total_count = count
+    
+    skills.sort(key=lambda item: (-item[1], item[0]))
+    facets.skills = dict(skills[:max_skills])
+    return facets, total_count
@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.core.pagination import paginate
 from app.core.security import get_current_active_user
 from app.models.user import User
 from app.models.company import Company, CompanyUser
@@ -12,7 +14,7 @@ from app.schemas.company import (
     CompanyUpdate,
     CompanyWithUsers
 )
-from app.schemas.common import BaseResponse, PaginatedResponse, PaginationMeta
+from app.schemas.common import BaseResponse, PaginatedResponse
 
 router = APIRouter()
 
@@ -20,18 +22,18 @@ router = APIRouter()
 async def create_company(
     company_data: CompanyCreate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check if company slug already exists
-    existing_company = db.query(Company).filter(Company.slug == company_data.slug).first()
+    existing_company = await db.scalar(select(Company).where(Company.slug == company_data.slug))
     if existing_company:
         raise HTTPException(status_code=400, detail="Company slug already exists")
     
     # Create company
     db_company = Company(**company_data.dict())
     db.add(db_company)
-    db.commit()
-    db.refresh(db_company)
+    await db.commit()
+    await db.refresh(db_company)
     
     # Add current user as admin
     company_user = CompanyUser(
@@ -41,7 +43,7 @@ async def create_company(
         invitation_accepted=True
     )
     db.add(company_user)
-    db.commit()
+    await db.commit()
     
     return BaseResponse(
         data=CompanySchema.from_orm(db_company),
@@ -53,29 +55,23 @@ async def create_company(
 async def get_companies(
     page: int = 1,
     size: int = 20,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; switches to keyset pagination"),
+    include_total: bool = Query(True, description="Include a (cached) total_count"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    offset = (page - 1) * size
-    
     # Get companies where user is a member
-    user_companies = db.query(Company).join(CompanyUser).filter(
-        CompanyUser.user_id == current_user.id
-    ).offset(offset).limit(size).all()
-    
-    total_count = db.query(Company).join(CompanyUser).filter(
+    query = select(Company).join(CompanyUser).where(
         CompanyUser.user_id == current_user.id
-    ).count()
-    
-    total_pages = (total_count + size - 1) // size
-    
-    pagination = PaginationMeta(
-        page_index=page,
-        page_size=size,
-        total_count=total_count,
-        total_pages=total_pages,
-        has_previous=page > 1,
-        has_next=page < total_pages
+    )
+    user_companies, pagination = await paginate(
+        db,
+        query,
+        Company,
+        page=page,
+        size=size,
+        cursor=cursor,
+        include_total=include_total
     )
     
     return PaginatedResponse(
@@ -89,17 +85,19 @@ async def get_companies(
 async def get_company(
     company_id: int,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    company = db.query(Company).filter(Company.id == company_id).first()
+    company = await db.scalar(select(Company).where(Company.id == company_id))
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
     # Check if user has access to this company
-    user_company = db.query(CompanyUser).filter(
-        CompanyUser.company_id == company_id,
-        CompanyUser.user_id == current_user.id
-    ).first()
+    user_company = await db.scalar(
+        select(CompanyUser).where(
+            CompanyUser.company_id == company_id,
+            CompanyUser.user_id == current_user.id
+        )
+    )
     
     if not user_company and not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
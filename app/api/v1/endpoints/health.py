@@ -1,9 +1,14 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import time
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.config import settings
+from app.core.security import password_hashing_pool
+from app.services.ai_service import ai_client
+from app.services.coding_service import code_runner, grading_result_cache
+from app.services.embedding_service import embedding_pipeline
+from app.services.interview_session_service import interview_session_manager
 
 router = APIRouter()
 
@@ -17,10 +22,10 @@ async def health_check():
     }
 
 @router.get("/database")
-async def database_health(db: Session = Depends(get_db)):
+async def database_health(db: AsyncSession = Depends(get_async_db)):
     try:
         # Test database connection
-        result = db.execute(text("SELECT 1")).fetchone()
+        result = (await db.execute(text("SELECT 1"))).fetchone()
         return {
             "status": "healthy",
             "database": "connected",
@@ -33,3 +38,55 @@ async def database_health(db: Session = Depends(get_db)):
             "error": str(e),
             "timestamp": time.time()
         }
+
+@router.get("/password-hashing")
+async def password_hashing_health():
+    stats = password_hashing_pool.stats()
+    return {
+        "status": "degraded" if stats["queued"] >= stats["max_queue"] else "healthy",
+        "pool": stats,
+        "timestamp": time.time()
+    }
+
+@router.get("/code-runner")
+async def code_runner_health():
+    pools = code_runner.stats()
+    saturated = any(pool["queue_depth"] >= pool["max_queue"] for pool in pools.values())
+    if any(pool["unavailable"] for pool in pools.values()):
+        status = "unavailable"
+    else:
+        status = "degraded" if saturated else "healthy"
+    return {
+        "status": status,
+        "pools": pools,
+        "result_cache": grading_result_cache.stats(),
+        "timestamp": time.time()
+    }
+
+@router.get("/ai")
+async def ai_health():
+    stats = ai_client.stats()
+    return {
+        "status": "degraded" if stats["queued"] >= stats["max_queue"] else "healthy",
+        "client": stats,
+        "timestamp": time.time()
+    }
+
+@router.get("/embeddings")
+async def embeddings_health(db: AsyncSession = Depends(get_async_db)):
+    queue = await embedding_pipeline.queue_stats(db)
+    return {
+        "status": "degraded" if queue["retrying"] else "healthy",
+        "embedder": embedding_pipeline.embedder.name,
+        "queue": queue,
+        "timestamp": time.time()
+    }
+
+@router.get("/interview-sessions")
+async def interview_sessions_health():
+    stats = interview_session_manager.stats()
+    return {
+        "status": "degraded" if stats["flush_failures"] and stats["dirty"] else "healthy",
+        "sessions": stats,
+        "timestamp": time.time()
+    }
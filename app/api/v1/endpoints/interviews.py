@@ -0,0 +1,263 @@
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Union
+
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, WebSocketException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import get_async_db, get_async_session_factory
+from app.core.exceptions import InterviewOrchestratorException, NotFoundError, ValidationError
+from app.core.security import get_current_active_user, get_current_websocket_user
+from app.models.company import CompanyUser
+from app.models.user import User
+from app.models.interview import InterviewResponse
+from app.services import interview_service, interview_session_service
+from app.schemas.common import BaseResponse
+from app.schemas.interview import (
+    AnswerEvaluationRequest,
+    Interview as InterviewSchema,
+    InterviewCreate,
+    InterviewerAvailability,
+    InterviewReschedule,
+    InterviewResponse as InterviewResponseSchema,
+    MAX_DURATION_MINUTES,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# Streaming endpoints answer with server-sent events: one "token" event per
+# chunk of model output as it arrives, then a single "result" event with the
+# persisted record, or an "error" event if the model fails mid-stream.
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # Stop nginx from buffering the stream
+}
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+def chunk_event(chunk: Union[str, InterviewResponse]) -> str:
+    if isinstance(chunk, str):
+        return sse_event("token", {"text": chunk})
+    return sse_event("result", InterviewResponseSchema.from_orm(chunk))
+
+async def event_stream(chunks: AsyncIterator[Union[str, InterviewResponse]]) -> StreamingResponse:
+    # The first chunk is awaited before the response starts, so a busy or
+    # failing AI service is still reported with a proper status code
+    try:
+        first = await chunks.__anext__()
+    except BaseException:
+        await chunks.aclose()
+        raise
+    
+    async def events() -> AsyncIterator[str]:
+        try:
+            yield chunk_event(first)
+            async for chunk in chunks:
+                yield chunk_event(chunk)
+        except InterviewOrchestratorException as e:
+            logger.error(f"Interview stream failed: {e.message}")
+            yield sse_event("error", {"code": e.code, "message": e.message})
+        except Exception:
+            logger.exception("Interview stream failed")
+            yield sse_event("error", {"code": "INTERNAL_ERROR", "message": "Internal server error"})
+        finally:
+            await chunks.aclose()
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+async def is_company_member(db: AsyncSession, user: User, company_id: int) -> bool:
+    """Superusers, and active members of the company"""
+    if user.is_superuser:
+        return True
+    membership = await db.scalar(
+        select(CompanyUser.id).where(
+            CompanyUser.company_id == company_id,
+            CompanyUser.user_id == user.id,
+            CompanyUser.is_active.is_(True)
+        )
+    )
+    return membership is not None
+
+async def require_company_member(db: AsyncSession, user: User, company_id: int):
+    if not await is_company_member(db, user, company_id):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+@router.post("/", response_model=BaseResponse[InterviewSchema])
+async def schedule_interview(
+    interview_data: InterviewCreate,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Book an interview; 409 if any interviewer is already booked at that time"""
+    await require_company_member(db, current_user, interview_data.company_id)
+    try:
+        interview = await interview_service.schedule_interview(db, interview_data)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    
+    return BaseResponse(
+        data=InterviewSchema.from_orm(interview),
+        message="Interview scheduled successfully",
+        code="INTERVIEW_SCHEDULED"
+    )
+
+@router.get("/availability", response_model=BaseResponse[InterviewerAvailability])
+async def get_interviewer_availability(
+    company_id: int,
+    start: datetime,
+    end: datetime,
+    interviewer_ids: List[int] = Query(..., min_length=1),
+    duration_minutes: int = Query(60, ge=5, le=MAX_DURATION_MINUTES),
+    slot_step_minutes: int = Query(30, ge=5, le=240),
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Times between start and end when all the interviewers are free"""
+    await require_company_member(db, current_user, company_id)
+    try:
+        availability = await interview_service.find_free_slots(
+            db,
+            company_id,
+            interviewer_ids,
+            start,
+            end,
+            duration_minutes=duration_minutes,
+            step_minutes=slot_step_minutes,
+            limit=limit
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    
+    return BaseResponse(
+        data=InterviewerAvailability(**availability),
+        message="Availability retrieved successfully",
+        code="AVAILABILITY_RETRIEVED"
+    )
+
+@router.put("/{interview_id}/schedule", response_model=BaseResponse[InterviewSchema])
+async def reschedule_interview(
+    interview_id: int,
+    changes: InterviewReschedule,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Move an interview or change its interviewers; 409 on a double booking"""
+    interview = await interview_service.get_interview(db, interview_id)
+    await require_company_member(db, current_user, interview.company_id)
+    try:
+        interview = await interview_service.reschedule_interview(db, interview_id, changes)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    
+    return BaseResponse(
+        data=InterviewSchema.from_orm(interview),
+        message="Interview rescheduled successfully",
+        code="INTERVIEW_RESCHEDULED"
+    )
+
+@router.post("/{interview_id}/cancel", response_model=BaseResponse[InterviewSchema])
+async def cancel_interview(
+    interview_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    interview = await interview_service.get_interview(db, interview_id)
+    await require_company_member(db, current_user, interview.company_id)
+    try:
+        interview = await interview_service.cancel_interview(db, interview_id)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=e.message)
+    
+    return BaseResponse(
+        data=InterviewSchema.from_orm(interview),
+        message="Interview cancelled successfully",
+        code="INTERVIEW_CANCELLED"
+    )
+
+@router.post("/{interview_id}/responses/evaluate/stream")
+async def stream_answer_evaluation(
+    interview_id: int,
+    evaluation: AnswerEvaluationRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: async_sessionmaker = Depends(get_async_session_factory)
+):
+    """Evaluate an answer, streaming the model's feedback; the result event
+    carries the saved interview response"""
+    interview = await interview_service.get_interview(db, interview_id)
+    await require_company_member(db, current_user, interview.company_id)
+    return await event_stream(interview_service.stream_answer_evaluation(
+        interview,
+        evaluation.question,
+        evaluation.answer,
+        evaluation.rubric,
+        session_factory=session_factory
+    ))
+
+@router.post("/{interview_id}/responses/{response_id}/follow-up/stream")
+async def stream_follow_up_question(
+    interview_id: int,
+    response_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: async_sessionmaker = Depends(get_async_session_factory)
+):
+    """Generate a follow-up question to an answer, streaming it as it is
+    written; the result event carries the updated interview response"""
+    interview = await interview_service.get_interview(db, interview_id)
+    await require_company_member(db, current_user, interview.company_id)
+    response = await interview_service.get_interview_response(db, interview_id, response_id)
+    return await event_stream(
+        interview_service.stream_follow_up_question(interview, response, session_factory=session_factory)
+    )
+
+@router.websocket("/{interview_id}/session")
+async def interview_session(
+    websocket: WebSocket,
+    interview_id: int,
+    current_user: User = Depends(get_current_websocket_user),
+    session_factory: async_sessionmaker = Depends(get_async_session_factory)
+):
+    """Live interview session; see services.interview_session_service for the protocol.
+    
+    The first message is the session state to resume from; every event
+    after that gets an ack (or error/resync) and flushed events a "saved".
+    """
+    manager = interview_session_service.interview_session_manager
+    try:
+        async with session_factory() as db:
+            interview = await interview_service.get_interview(db, interview_id)
+            member = await is_company_member(db, current_user, interview.company_id)
+    except NotFoundError as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=e.message)
+    if not member:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Not enough permissions")
+    await websocket.accept()
+    try:
+        live = await manager.connect(interview, websocket)
+    except ValidationError as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.message)
+        return
+    
+    try:
+        await live.send(websocket, manager.resume_message(live))
+        while True:
+            try:
+                event = await websocket.receive_json()
+            except (ValueError, KeyError):
+                # Not JSON (or a binary frame)
+                await live.send(websocket, {"type": "error", "message": "Events must be JSON objects"})
+                continue
+            await live.send(websocket, manager.handle(live, event))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(live, websocket)
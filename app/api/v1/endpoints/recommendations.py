@@ -0,0 +1,99 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from app.core.database import get_async_db
+from app.core.security import get_current_active_user
+from app.models.user import User
+from app.models.candidate import Candidate
+from app.models.job import Job, JobRecommendation
+from app.schemas.common import BaseResponse
+from app.schemas.job import RecommendedCandidate, RecommendedJob
+from app.services.skill_service import suggest_job_skills
+
+router = APIRouter()
+
+# Both reads are a single index range scan over job_recommendations, which
+# services.recommendation_service keeps up to date in the background
+
+@router.get("/jobs/{job_id}", response_model=BaseResponse[List[RecommendedCandidate]])
+async def get_job_recommendations(
+    job_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    rows = (await db.execute(
+        select(
+            JobRecommendation.candidate_id,
+            Candidate.first_name,
+            Candidate.last_name,
+            Candidate.current_title,
+            Candidate.years_of_experience,
+            JobRecommendation.score,
+            JobRecommendation.rank,
+            JobRecommendation.computed_at
+        )
+        .join(Candidate, Candidate.id == JobRecommendation.candidate_id)
+        .where(JobRecommendation.job_id == job_id)
+        .order_by(JobRecommendation.rank)
+        .limit(limit)
+    )).all()
+    if not rows and not await db.scalar(select(Job.id).where(Job.id == job_id)):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return BaseResponse(
+        data=[RecommendedCandidate(**row._mapping) for row in rows],
+        message="Recommended candidates retrieved successfully",
+        code="RECOMMENDATIONS_RETRIEVED"
+    )
+
+@router.get("/candidates/{candidate_id}", response_model=BaseResponse[List[RecommendedJob]])
+async def get_candidate_recommendations(
+    candidate_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    rows = (await db.execute(
+        select(
+            JobRecommendation.job_id,
+            Job.title,
+            Job.company_id,
+            Job.location,
+            Job.remote_work_type,
+            JobRecommendation.score,
+            JobRecommendation.rank,
+            JobRecommendation.computed_at
+        )
+        .join(Job, Job.id == JobRecommendation.job_id)
+        .where(JobRecommendation.candidate_id == candidate_id)
+        .order_by(JobRecommendation.score.desc(), JobRecommendation.job_id)
+        .limit(limit)
+    )).all()
+    if not rows and not await db.scalar(select(Candidate.id).where(Candidate.id == candidate_id)):
+        raise HTTPException(status_code=404, detail="Candidate not found")
+    
+    return BaseResponse(
+        data=[RecommendedJob(**row._mapping) for row in rows],
+        message="Recommended jobs retrieved successfully",
+        code="RECOMMENDATIONS_RETRIEVED"
+    )
+
+@router.get("/jobs/{job_id}/skills", response_model=BaseResponse[List[str]])
+async def get_job_skill_suggestions(
+    job_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Skills the job's description mentions that it doesn't list yet"""
+    job = await db.scalar(select(Job).where(Job.id == job_id))
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return BaseResponse(
+        data=await suggest_job_skills(db, job),
+        message="Skill suggestions retrieved successfully",
+        code="SKILL_SUGGESTIONS_RETRIEVED"
+    )
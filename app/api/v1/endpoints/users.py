@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from app.core.database import get_db
-from app.core.security import get_current_active_user
+from app.core.database import get_async_db
+from app.core.pagination import paginate
+from app.core.security import get_current_active_user, principal_cache
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserUpdate
 from app.schemas.common import BaseResponse, PaginatedResponse
@@ -14,26 +16,23 @@ router = APIRouter()
 async def get_users(
     page: int = 1,
     size: int = 20,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page; switches to keyset pagination"),
+    include_total: bool = Query(True, description="Include a (cached) total_count"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check if user has permission to view users
     if not current_user.is_superuser:
         raise HTTPException(status_code=403, detail="Not enough permissions")
     
-    offset = (page - 1) * size
-    users = db.query(User).offset(offset).limit(size).all()
-    total_count = db.query(User).count()
-    total_pages = (total_count + size - 1) // size
-    
-    from app.schemas.common import PaginationMeta
-    pagination = PaginationMeta(
-        page_index=page,
-        page_size=size,
-        total_count=total_count,
-        total_pages=total_pages,
-        has_previous=page > 1,
-        has_next=page < total_pages
+    users, pagination = await paginate(
+        db,
+        select(User),
+        User,
+        page=page,
+        size=size,
+        cursor=cursor,
+        include_total=include_total
     )
     
     return PaginatedResponse(
@@ -47,18 +46,22 @@ async def get_users(
 async def update_current_user(
     user_update: UserUpdate,
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     update_data = user_update.dict(exclude_unset=True)
     
+    # current_user may be a detached principal_cache snapshot, so write
+    # through a row owned by this session
+    user = await db.get(User, current_user.id)
     for field, value in update_data.items():
-        setattr(current_user, field, value)
+        setattr(user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(user)
+    await principal_cache.invalidate(user.email)
     
     return BaseResponse(
-        data=UserSchema.from_orm(current_user),
+        data=UserSchema.from_orm(user),
         message="User profile updated successfully",
         code="PROFILE_UPDATED"
     )
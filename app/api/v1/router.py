@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users, candidates, companies, health
+from app.api.v1.endpoints import auth, users, candidates, companies, health, recommendations, interviews
 
 api_router = APIRouter()
 
@@ -9,3 +9,5 @@ api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(users.router, prefix="/users", tags=["Users"])
 api_router.include_router(companies.router, prefix="/companies", tags=["Companies"])
 api_router.include_router(candidates.router, prefix="/candidates", tags=["Candidates"])
+api_router.include_router(recommendations.router, prefix="/recommendations", tags=["Recommendations"])
+api_router.include_router(interviews.router, prefix="/interviews", tags=["Interviews"])
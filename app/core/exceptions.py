@@ -27,6 +27,11 @@ class ValidationError(InterviewOrchestratorException):
         self.field = field
         super().__init__(message, "VALIDATION_ERROR")
 
+class ConflictError(InterviewOrchestratorException):
+    def __init__(self, message: str, conflicts: dict = None):
+        self.conflicts = conflicts or {}
+        super().__init__(message, "CONFLICT")
+
 class AuthenticationError(InterviewOrchestratorException):
     def __init__(self, message: str = "Authentication failed"):
         super().__init__(message, "AUTHENTICATION_ERROR")
@@ -61,8 +66,12 @@ def setup_exception_handlers(app: FastAPI):
         status_map = {
             "NOT_FOUND": 404,
             "VALIDATION_ERROR": 422,
+            "CONFLICT": 409,
             "AUTHENTICATION_ERROR": 401,
             "AUTHORIZATION_ERROR": 403,
+            "AI_SERVICE_ERROR": 502,
+            "AI_SERVICE_BUSY": 503,
+            "CODE_RUNNER_UNAVAILABLE": 503,
         }
         status_code = status_map.get(exc.code, 500)
         return create_error_response(exc.message, exc.code, status_code)
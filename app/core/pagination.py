@@ -0,0 +1,114 @@
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+import base64
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.schemas.common import PaginationMeta
+
+# Totals are served from a short-lived cache so deep pages don't pay for a
+# COUNT(*) over the whole filtered table on every request
+count_cache = TTLCache(maxsize=4096, ttl=settings.COUNT_CACHE_TTL_SECONDS)
+
+def encode_cursor(created_at: datetime, id: int, direction: str) -> str:
+    raw = json.dumps([created_at.isoformat(), id, direction]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id, direction = json.loads(raw)
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return datetime.fromisoformat(created_at), int(id), direction
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+async def cached_count(db: AsyncSession, query: Select) -> int:
+    compiled = query.compile()
+    key = (str(compiled), tuple(sorted((k, str(v)) for k, v in compiled.params.items())))
+    total_count = count_cache.get(key)
+    if total_count is None:
+        total_count = await db.scalar(select(func.count()).select_from(query.subquery()))
+        count_cache.set(key, total_count)
+    return total_count
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    model: Any,
+    page: int = 1,
+    size: int = 20,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    order_by: Optional[List[Any]] = None,
+) -> Tuple[List[Any], PaginationMeta]:
+    """Page ``query`` newest first on ``(created_at, id)``.
+
+    Without a cursor this is classic page/size pagination. With a cursor it
+    seeks past the boundary row instead of OFFSET-ing, so page cost stays
+    flat with depth. One extra row is fetched to detect a following page.
+    A custom ``order_by`` (e.g. search rank) only supports page/size.
+    """
+    if cursor is not None and order_by is not None:
+        raise HTTPException(
+            status_code=400, detail="Cursor pagination is not available for ranked results"
+        )
+    total_count = await cached_count(db, query) if include_total else None
+    total_pages = (total_count + size - 1) // size if total_count is not None else None
+    sort_key = tuple_(model.created_at, model.id)
+
+    if cursor is None:
+        rows = (
+            await db.scalars(
+                query.order_by(*(order_by or [model.created_at.desc(), model.id.desc()]))
+                .offset((page - 1) * size)
+                .limit(size + 1)
+            )
+        ).all()
+        items = list(rows[:size])
+        has_previous = page > 1
+        has_next = len(rows) > size
+        page_index = page
+    else:
+        created_at, id, direction = decode_cursor(cursor)
+        if direction == "next":
+            rows = (
+                await db.scalars(
+                    query.where(sort_key < tuple_(created_at, id))
+                    .order_by(model.created_at.desc(), model.id.desc())
+                    .limit(size + 1)
+                )
+            ).all()
+            items = list(rows[:size])
+            has_previous, has_next = True, len(rows) > size
+        else:
+            rows = (
+                await db.scalars(
+                    query.where(sort_key > tuple_(created_at, id))
+                    .order_by(model.created_at.asc(), model.id.asc())
+                    .limit(size + 1)
+                )
+            ).all()
+            items = list(reversed(rows[:size]))
+            has_previous, has_next = len(rows) > size, True
+        page_index = None
+
+    pagination = PaginationMeta(
+        page_index=page_index,
+        page_size=size,
+        total_count=total_count,
+        total_pages=total_pages,
+        has_previous=has_previous,
+        has_next=has_next,
+        next_cursor=encode_cursor(items[-1].created_at, items[-1].id, "next")
+        if items and has_next and order_by is None else None,
+        prev_cursor=encode_cursor(items[0].created_at, items[0].id, "prev")
+        if items and has_previous and order_by is None else None,
+    )
+    return items, pagination
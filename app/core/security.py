@@ -1,15 +1,28 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Callable, Dict, Union, Optional
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
 from jose import jwt, JWTError
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, WebSocketException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import DateTime, event, inspect, select
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
+from app.core.cache import TTLCache, get_redis
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import AsyncSessionLocal, get_async_db
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -35,6 +48,93 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+class PasswordHashingPool:
+    """Bounded thread pool that keeps bcrypt work off the event loop.
+
+    bcrypt releases the GIL, so hashing on worker threads lets the loop keep
+    serving other requests. Once ``max_workers + max_queue`` jobs are in
+    flight new jobs are rejected with a 503 instead of queueing unbounded.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    def _record_wait(self, wait: float):
+        with self._lock:
+            self._completed += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication service is busy, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+
+        enqueued_at = time.perf_counter()
+
+        def task():
+            self._record_wait(time.perf_counter() - enqueued_at)
+            return func(*args)
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), task)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._pending,
+                "queued": max(0, self._pending - self.max_workers),
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_queue_wait_ms": round(
+                    self._total_wait / self._completed * 1000, 3
+                ) if self._completed else 0.0,
+                "max_queue_wait_ms": round(self._max_wait * 1000, 3),
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+password_hashing_pool = PasswordHashingPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hashing_pool.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hashing_pool.run(get_password_hash, password)
+
 def verify_token(token: str) -> Optional[str]:
     try:
         payload = jwt.decode(
@@ -47,29 +147,143 @@ def verify_token(token: str) -> Optional[str]:
     except JWTError:
         return None
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    username = verify_token(credentials.credentials)
+class PrincipalCache:
+    """Cache of authenticated users keyed by token subject (email).
+
+    A local TTL/LRU tier answers the hot path with no I/O; when REDIS_URL is
+    set a shared Redis tier sits behind it so workers warm each other.
+    Entries are column snapshots (never the password hash) and every hit
+    builds a fresh detached ``User``, so requests never share ORM state.
+    """
+
+    key_prefix = "principal:"
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def snapshot(user: User) -> Dict[str, Any]:
+        return {
+            attr.key: getattr(user, attr.key)
+            for attr in inspect(User).column_attrs
+            if attr.key != "hashed_password"
+        }
+
+    @staticmethod
+    def to_user(snapshot: Dict[str, Any]) -> User:
+        user = User(**snapshot)
+        make_transient_to_detached(user)
+        return user
+
+    @staticmethod
+    def dumps(snapshot: Dict[str, Any]) -> str:
+        return json.dumps(snapshot, default=str)
+
+    @staticmethod
+    def loads(raw: str) -> Dict[str, Any]:
+        snapshot = json.loads(raw)
+        for attr in inspect(User).column_attrs:
+            value = snapshot.get(attr.key)
+            if value is None:
+                continue
+            column_type = attr.columns[0].type
+            if isinstance(column_type, DateTime):
+                snapshot[attr.key] = datetime.fromisoformat(value)
+            elif isinstance(column_type, UUID):
+                snapshot[attr.key] = uuid.UUID(value)
+        return snapshot
+
+    async def get(self, subject: str) -> Optional[User]:
+        snapshot = self.local.get(subject)
+        if snapshot is None:
+            redis = get_redis()
+            if redis is None:
+                return None
+            try:
+                raw = await redis.get(self.key_prefix + subject)
+            except Exception as e:
+                logger.warning(f"Principal cache read failed: {str(e)}")
+                return None
+            if raw is None:
+                return None
+            snapshot = self.loads(raw)
+            self.local.set(subject, snapshot)
+        return self.to_user(snapshot)
+
+    async def set(self, subject: str, user: User):
+        snapshot = self.snapshot(user)
+        self.local.set(subject, snapshot)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.set(self.key_prefix + subject, self.dumps(snapshot), ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Principal cache write failed: {str(e)}")
+
+    async def invalidate(self, subject: str):
+        self.local.delete(subject)
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.delete(self.key_prefix + subject)
+            except Exception as e:
+                logger.warning(f"Principal cache invalidation failed: {str(e)}")
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+@event.listens_for(User, "after_update")
+def _evict_updated_principal(mapper, connection, target):
+    # Safety net for writers that skip principal_cache.invalidate(); only the
+    # local tier can be cleared synchronously, Redis entries age out via TTL
+    principal_cache.local.delete(target.email)
+
+async def authenticate_token(token: str, db: AsyncSession) -> Optional[User]:
+    """User named by a bearer token (principal cache first), or None if either is invalid"""
+    username = verify_token(token)
     if username is None:
-        raise credentials_exception
+        return None
     
-    user = db.query(User).filter(User.email == username).first()
+    user = await principal_cache.get(username)
     if user is None:
-        raise credentials_exception
+        user = await db.scalar(select(User).where(User.email == username))
+        if user is None:
+            return None
+        await principal_cache.set(username, user)
     
     return user
 
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    user = await authenticate_token(credentials.credentials, db)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+async def get_current_websocket_user(token: Optional[str] = Query(None)) -> User:
+    """Active user for a WebSocket, whose token comes as ``?token=`` since
+    browsers cannot set headers on one. Uses a short-lived session of its own
+    rather than holding one for the life of the connection."""
+    user = None
+    if token:
+        async with AsyncSessionLocal() as db:
+            user = await authenticate_token(token, db)
+    if user is None or not user.is_active:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials")
+    return user
@@ -1,5 +1,16 @@
+import logging
+
 from fastapi import FastAPI
 from app.core.config import settings
+from app.services.ai_service import ai_client
+from app.services.coding_service import code_runner
+from app.services.embedding_service import embedding_worker
+from app.services.interview_session_service import interview_session_manager
+from app.services.recommendation_service import recommendation_worker
+from app.services.similarity_service import candidate_embedding_index
+from app.utils.code_runner import CodeRunnerError
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -7,6 +18,32 @@ app = FastAPI(
     description="AI-Powered Interview Orchestrator - Backend Microservice",
 )
 
+@app.on_event("startup")
+async def start_background_workers():
+    if settings.RECOMMENDATION_WORKER_ENABLED:
+        recommendation_worker.start()
+    if settings.EMBEDDING_WORKER_ENABLED:
+        embedding_worker.start()
+    interview_session_manager.start()
+    if settings.EMBEDDING_INDEX_PREWARM:
+        candidate_embedding_index.start()
+    if settings.CODE_RUNNER_PREWARM:
+        try:
+            await code_runner.start()
+        except CodeRunnerError as e:
+            # Everything else still serves; code runs get a 503 and
+            # /health/code-runner reports why
+            logger.error(f"Code runner unavailable: {str(e)}")
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await recommendation_worker.stop()
+    await embedding_worker.stop()
+    await interview_session_manager.stop()
+    await candidate_embedding_index.stop()
+    await code_runner.close()
+    await ai_client.close()
+
 @app.get("/health")
 async def health_check():
     return {
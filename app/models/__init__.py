@@ -1,4 +1,31 @@
 from .base import BaseModel as Base
 from .user import User
+from .company import Company, CompanyUser
+from .candidate import SkillCategory, SkillCategoryClosure, Skill, Candidate, CandidateSkill, CandidateMinHash, CandidateLSHBucket
+from .job import Job, JobApplication, JobRecommendation
+from .embedding import EmbeddingQueueItem
+from .interview import Interview, InterviewInterviewer, InterviewResponse, InterviewSession
+from .coding import SubmissionFingerprints
 
-__all__ = ["Base", "User"]
\ No newline at end of file
+__all__ = [
+    "Base",
+    "User",
+    "Company",
+    "CompanyUser",
+    "SkillCategory",
+    "SkillCategoryClosure",
+    "Skill",
+    "Candidate",
+    "CandidateSkill",
+    "CandidateMinHash",
+    "CandidateLSHBucket",
+    "Job",
+    "JobApplication",
+    "JobRecommendation",
+    "EmbeddingQueueItem",
+    "Interview",
+    "InterviewInterviewer",
+    "InterviewResponse",
+    "InterviewSession",
+    "SubmissionFingerprints",
+]
\ No newline at end of file
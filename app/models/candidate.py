@@ -1,9 +1,22 @@
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, Float, DateTime, Boolean
-from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy import Column, String, Text, Integer, SmallInteger, BigInteger, ForeignKey, Float, DateTime, Boolean, Index, Computed, LargeBinary, event, inspect, literal, select
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, TSVECTOR
 import uuid
+from app.core.database import Base
+from app.core.exceptions import ValidationError
 from .base import BaseModel
 
+# Weighted document for full-text search: identity (A) > role (B) > summary (C)
+# > resume (D). Names/emails use the 'simple' config so they aren't stemmed.
+CANDIDATE_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || "
+    "coalesce(last_name, '') || ' ' || coalesce(email, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(current_title, '') || ' ' || "
+    "coalesce(current_company, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(summary, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(resume_text, '')), 'D')"
+)
+
 class SkillCategory(BaseModel):
     __tablename__ = "skill_categories"
     
@@ -15,6 +28,57 @@ class SkillCategory(BaseModel):
     skills = relationship("Skill", back_populates="category")
     parent = relationship("SkillCategory", remote_side="SkillCategory.id")
 
+class SkillCategoryClosure(Base):
+    """Every (ancestor, descendant) pair in the category tree, including each
+    category with itself at depth 0. Maintained by the mapper events below."""
+    __tablename__ = "skill_category_closure"
+    __table_args__ = (
+        Index("ix_skill_category_closure_descendant", "descendant_id", "ancestor_id"),
+    )
+    
+    ancestor_id = Column(Integer, ForeignKey("skill_categories.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("skill_categories.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+# Closure maintenance. These run inside the flush on its connection, so the
+# closure always commits (or rolls back) together with the category change.
+_closure = SkillCategoryClosure.__table__
+
+@event.listens_for(SkillCategory, "after_insert")
+def _add_category_to_closure(mapper, connection, target):
+    # The new category's ancestors are its parent's, one level further away
+    connection.execute(_closure.insert().from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        select(_closure.c.ancestor_id, literal(target.id), _closure.c.depth + 1)
+        .where(_closure.c.descendant_id == target.parent_id)
+        .union_all(select(literal(target.id), literal(target.id), literal(0)))
+    ))
+
+@event.listens_for(SkillCategory, "after_update")
+def _move_category_in_closure(mapper, connection, target):
+    if not inspect(target).attrs.parent_id.history.has_changes():
+        return
+    if target.parent_id is not None and connection.scalar(
+        select(_closure.c.depth).where(_closure.c.ancestor_id == target.id, _closure.c.descendant_id == target.parent_id)
+    ) is not None:
+        raise ValidationError("A category cannot be moved under itself or its subcategories", field="parent_id")
+
+    # Detach the subtree from its old ancestors...
+    connection.execute(_closure.delete().where(
+        _closure.c.descendant_id.in_(select(_closure.c.descendant_id).where(_closure.c.ancestor_id == target.id)),
+        _closure.c.ancestor_id.in_(
+            select(_closure.c.ancestor_id).where(_closure.c.descendant_id == target.id, _closure.c.ancestor_id != target.id)
+        )
+    ))
+    # ...and attach it under every ancestor of the new parent
+    if target.parent_id is not None:
+        ancestors, subtree = _closure.alias("ancestors"), _closure.alias("subtree")
+        connection.execute(_closure.insert().from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(ancestors.c.ancestor_id, subtree.c.descendant_id, ancestors.c.depth + subtree.c.depth + 1)
+            .where(ancestors.c.descendant_id == target.parent_id, subtree.c.ancestor_id == target.id)
+        ))
+
 class Skill(BaseModel):
     __tablename__ = "skills"
     
@@ -29,6 +93,29 @@ class Skill(BaseModel):
 
 class Candidate(BaseModel):
     __tablename__ = "candidates"
+    __table_args__ = (
+        Index("ix_candidates_created_at_id", "created_at", "id"),  # Keyset pagination
+        Index("ix_candidates_updated_at", "updated_at"),  # Incremental embedding index refresh
+        Index("ix_candidates_search_vector", "search_vector", postgresql_using="gin"),
+        # Trigram indexes let substring ILIKE on names/emails use an index (pg_trgm)
+        Index(
+            "ix_candidates_first_name_trgm", "first_name",
+            postgresql_using="gin", postgresql_ops={"first_name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_candidates_last_name_trgm", "last_name",
+            postgresql_using="gin", postgresql_ops={"last_name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_candidates_email_trgm", "email",
+            postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}
+        ),
+        # Structured search (POST /candidates/search)
+        Index("ix_candidates_years_of_experience", "years_of_experience"),
+        Index("ix_candidates_expected_salary", "expected_salary_min", "expected_salary_max"),
+        Index("ix_candidates_preferred_locations", "preferred_locations", postgresql_using="gin"),
+        Index("ix_candidates_availability_remote", "availability_status", "remote_work_preference"),
+    )
     
     uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
     
@@ -52,9 +139,12 @@ class Candidate(BaseModel):
     
     # Resume and Profile
     resume_url = Column(String(500), nullable=True)
-    resume_text = Column(Text, nullable=True)  # Extracted text from resume
+    resume_text = deferred(Column(Text, nullable=True))  # Extracted text from resume; detail views only
     summary = Column(Text, nullable=True)
     
+    # Search (maintained by Postgres as a stored generated column)
+    search_vector = deferred(Column(TSVECTOR, Computed(CANDIDATE_SEARCH_DOCUMENT, persisted=True)))
+    
     # Status and Scoring
     profile_completion_score = Column(Float, default=0.0)
     availability_status = Column(String(50), default="available")  # available, interviewing, hired, not_looking
@@ -65,8 +155,9 @@ class Candidate(BaseModel):
     data_retention_consent = Column(Boolean, default=True)
     
     # AI/ML Features
-    embedding_vector = Column(Text, nullable=True)  # Store as JSON string
+    embedding_vector = deferred(Column(LargeBinary, nullable=True))  # Packed float32, see utils.ai_helpers; matching paths only
     last_embedding_update = Column(DateTime, nullable=True)
+    embedding_hash = Column(String(64), nullable=True)  # Hash of the embedded text and model; unchanged text is not re-embedded
     
     # Relationships
     skills = relationship("CandidateSkill", back_populates="candidate")
@@ -74,6 +165,10 @@ class Candidate(BaseModel):
 
 class CandidateSkill(BaseModel):
     __tablename__ = "candidate_skills"
+    __table_args__ = (
+        Index("ix_candidate_skills_candidate_id", "candidate_id"),
+        Index("ix_candidate_skills_skill_id_candidate_id", "skill_id", "candidate_id"),
+    )
     
     candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False)
     skill_id = Column(Integer, ForeignKey("skills.id"), nullable=False)
@@ -86,4 +181,28 @@ class CandidateSkill(BaseModel):
     
     # Relationships
     candidate = relationship("Candidate", back_populates="skills")
-    skill = relationship("Skill", back_populates="candidate_skills")
\ No newline at end of file
+    skill = relationship("Skill", back_populates="candidate_skills")
+
+class CandidateMinHash(Base):
+    """MinHash signatures for near-duplicate detection (see services.similarity_service)"""
+    __tablename__ = "candidate_minhashes"
+    __table_args__ = (
+        Index("ix_candidate_minhashes_cluster_id", "cluster_id"),
+    )
+    
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True)
+    profile_signature = Column(LargeBinary, nullable=True)  # Name + phone/profile URLs; None without a phone or URL
+    resume_signature = Column(LargeBinary, nullable=True)  # Resume word shingles
+    cluster_id = Column(Integer, nullable=False)  # Smallest candidate id among its duplicates (itself if none)
+    computed_at = Column(DateTime, nullable=False)
+
+class CandidateLSHBucket(Base):
+    """LSH band buckets of the signatures above; candidates sharing a bucket are duplicate suspects"""
+    __tablename__ = "candidate_lsh_buckets"
+    __table_args__ = (
+        Index("ix_candidate_lsh_buckets_candidate_id", "candidate_id"),
+    )
+    
+    band = Column(SmallInteger, primary_key=True)
+    bucket = Column(BigInteger, primary_key=True)
+    candidate_id = Column(Integer, ForeignKey("candidates.id", ondelete="CASCADE"), primary_key=True)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Integer, DateTime, Index, LargeBinary
+from app.core.database import Base
+
+class SubmissionFingerprints(Base):
+    """Winnowing fingerprints of a coding submission (see services.similarity_service.PlagiarismDetector).
+
+    Every process rebuilds its per-problem plagiarism index from these rows,
+    so checks cover all earlier submissions, including those from before a
+    restart or made through another process.
+    """
+    __tablename__ = "submission_fingerprints"
+    __table_args__ = (
+        Index("ix_submission_fingerprints_problem_key_created_at", "problem_key", "created_at"),  # Incremental loads
+    )
+    
+    problem_key = Column(String(100), primary_key=True)  # str() of the problem id
+    submission_id = Column(Integer, primary_key=True)
+    fingerprints = Column(LargeBinary, nullable=False)  # Packed uint64 fingerprint hashes
+    lines = Column(LargeBinary, nullable=False)  # Packed uint32 first source line of each fingerprint
+    created_at = Column(DateTime, nullable=False)
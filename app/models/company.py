@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -6,6 +6,9 @@ from .base import BaseModel
 
 class Company(BaseModel):
     __tablename__ = "companies"
+    __table_args__ = (
+        Index("ix_companies_created_at_id", "created_at", "id"),  # Keyset pagination
+    )
     
     uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
     name = Column(String(255), nullable=False)
@@ -28,6 +31,9 @@ class Company(BaseModel):
 
 class CompanyUser(BaseModel):
     __tablename__ = "company_users"
+    __table_args__ = (
+        Index("ix_company_users_user_id_company_id", "user_id", "company_id"),
+    )
     
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -38,5 +44,5 @@ class CompanyUser(BaseModel):
     
     # Relationships
     company = relationship("Company", back_populates="users")
-    user = relationship("User", back_populates="company_memberships")
+    user = relationship("User", back_populates="company_memberships", foreign_keys=[user_id])
     inviter = relationship("User", foreign_keys=[invited_by])
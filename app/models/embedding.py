@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, Text, Integer, DateTime, Index
+from sqlalchemy.dialects.postgresql import Insert, insert as pg_insert
+from app.core.database import Base
+
+class EmbeddingQueueItem(Base):
+    """Durable work queue of candidates/jobs whose embedding may be stale (see services.embedding_service).
+
+    Rows are written in the same transaction as the change that caused them,
+    so a crash never loses one; the worker deletes them once handled.
+    """
+    __tablename__ = "embedding_queue"
+    __table_args__ = (
+        Index("ix_embedding_queue_available_at", "available_at"),
+    )
+    
+    entity_type = Column(String(20), primary_key=True)  # candidate, job
+    entity_id = Column(Integer, primary_key=True)
+    enqueued_at = Column(DateTime, nullable=False)
+    available_at = Column(DateTime, nullable=False)  # Pushed back after failed attempts
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(Text, nullable=True)
+
+def embedding_queue_upsert() -> Insert:
+    """INSERT into embedding_queue; an entity that is already queued becomes due again right away"""
+    stmt = pg_insert(EmbeddingQueueItem.__table__)
+    return stmt.on_conflict_do_update(
+        index_elements=["entity_type", "entity_id"],
+        set_={"available_at": stmt.excluded.available_at, "attempts": 0}
+    )
@@ -0,0 +1,101 @@
+from sqlalchemy import Column, String, Text, Integer, BigInteger, ForeignKey, Float, DateTime, Boolean, Index, text
+from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+import uuid
+from app.core.database import Base
+from .base import BaseModel
+
+class Interview(BaseModel):
+    __tablename__ = "interviews"
+    __table_args__ = (
+        Index("ix_interviews_company_id_scheduled_at", "company_id", "scheduled_at"),
+        Index("ix_interviews_company_id_updated_at", "company_id", "updated_at"),  # Scheduling index sync
+    )
+    
+    uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=True)
+    
+    title = Column(String(200), nullable=False)
+    interview_type = Column(String(50), default="technical")  # screening, technical, behavioral, coding
+    status = Column(String(20), default="scheduled")  # scheduled, in_progress, completed, cancelled
+    scheduled_at = Column(DateTime, nullable=True)
+    duration_minutes = Column(Integer, default=60)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    company = relationship("Company")
+    candidate = relationship("Candidate")
+    job = relationship("Job")
+    responses = relationship("InterviewResponse", back_populates="interview", order_by="InterviewResponse.id")
+    interviewers = relationship("InterviewInterviewer", back_populates="interview", cascade="all, delete-orphan")
+    
+    @property
+    def interviewer_ids(self):
+        return sorted(row.user_id for row in self.interviewers if row.active)
+
+class InterviewInterviewer(Base):
+    """An interviewer booked on an interview.
+
+    starts_at/ends_at mirror the interview's slot so a double-booking check
+    is one index range scan per interviewer; rows of cancelled interviews
+    are kept with active=False.
+    """
+    __tablename__ = "interview_interviewers"
+    __table_args__ = (
+        Index(
+            "ix_interview_interviewers_user_id_starts_at", "user_id", "starts_at",
+            postgresql_where=text("active")
+        ),
+    )
+    
+    interview_id = Column(Integer, ForeignKey("interviews.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    starts_at = Column(DateTime, nullable=False)
+    ends_at = Column(DateTime, nullable=False)
+    active = Column(Boolean, nullable=False, default=True)
+    
+    # Relationships
+    interview = relationship("Interview", back_populates="interviewers")
+
+class InterviewResponse(BaseModel):
+    """One answered question and its AI evaluation"""
+    __tablename__ = "interview_responses"
+    __table_args__ = (
+        # A live-session answer is saved once, however often its flush is retried
+        Index("uq_interview_responses_interview_id_session_seq", "interview_id", "session_seq", unique=True),
+    )
+    
+    interview_id = Column(Integer, ForeignKey("interviews.id", ondelete="CASCADE"), nullable=False, index=True)
+    question = Column(Text, nullable=False)
+    answer = Column(Text, nullable=False)
+    rubric = Column(Text, nullable=True)
+    session_seq = Column(BigInteger, nullable=True)  # Seq of the live-session event that submitted it
+    
+    # Evaluation
+    score = Column(Float, nullable=True)  # 0-10, None when the model's reply had no score
+    feedback = Column(Text, nullable=True)
+    follow_up_question = Column(Text, nullable=True)
+    model = Column(String(100), nullable=True)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    evaluated_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    interview = relationship("Interview", back_populates="responses")
+
+class InterviewSession(Base):
+    """Last flushed live state of an interview (see services.interview_session_service).
+
+    The session engine keeps live state in memory and writes it here in
+    batches; ``seq`` is the last client event the state includes, so an
+    older snapshot never overwrites a newer one.
+    """
+    __tablename__ = "interview_sessions"
+    
+    interview_id = Column(Integer, ForeignKey("interviews.id", ondelete="CASCADE"), primary_key=True)
+    seq = Column(BigInteger, nullable=False, default=0)
+    state = Column(JSONB, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
@@ -1,8 +1,13 @@
-from sqlalchemy import Column, String, Text, Integer, ForeignKey, Float, DateTime, Boolean, JSON
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from sqlalchemy import Column, String, Text, Integer, ForeignKey, Float, DateTime, Boolean, JSON, LargeBinary, Index, UniqueConstraint, event, inspect
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 import uuid
 from .base import BaseModel
+from .embedding import embedding_queue_upsert
+
+# Columns that make up a job's embedding text (services.embedding_service.job_embedding_text)
+JOB_EMBEDDING_FIELDS = ("title", "description", "required_skills", "preferred_skills")
 
 class Job(BaseModel):
     __tablename__ = "jobs"
@@ -40,11 +45,30 @@ class Job(BaseModel):
     expires_at = Column(DateTime, nullable=True)
     
     # AI/ML Features
-    job_embedding = Column(Text, nullable=True)  # Store as JSON string
+    job_embedding = deferred(Column(LargeBinary, nullable=True))  # Packed float32, see utils.ai_helpers; matching paths only
+    embedding_hash = Column(String(64), nullable=True)  # Hash of the embedded text and model; unchanged text is not re-embedded
     
     # Relationships
     company = relationship("Company", back_populates="jobs")
     applications = relationship("JobApplication", back_populates="job")
+    recommendations = relationship("JobRecommendation", back_populates="job")
+
+def _queue_job_embedding(connection, job_id: int):
+    # Same transaction as the write, so the embedding worker can't miss it
+    now = datetime.utcnow()
+    connection.execute(embedding_queue_upsert(), [
+        {"entity_type": "job", "entity_id": job_id, "enqueued_at": now, "available_at": now, "attempts": 0}
+    ])
+
+@event.listens_for(Job, "after_insert")
+def _queue_new_job_embedding(mapper, connection, target):
+    _queue_job_embedding(connection, target.id)
+
+@event.listens_for(Job, "after_update")
+def _queue_edited_job_embedding(mapper, connection, target):
+    attrs = inspect(target).attrs
+    if any(getattr(attrs, field).history.has_changes() for field in JOB_EMBEDDING_FIELDS):
+        _queue_job_embedding(connection, target.id)
 
 class JobApplication(BaseModel):
     __tablename__ = "job_applications"
@@ -68,3 +92,22 @@ class JobApplication(BaseModel):
     # Relationships
     job = relationship("Job", back_populates="applications")
     candidate = relationship("Candidate", back_populates="applications")
+
+class JobRecommendation(BaseModel):
+    """Materialized top-K candidates per job (see services.recommendation_service)"""
+    __tablename__ = "job_recommendations"
+    __table_args__ = (
+        UniqueConstraint("job_id", "candidate_id", name="uq_job_recommendations_job_candidate"),
+        Index("ix_job_recommendations_job_rank", "job_id", "rank"),  # Ranked candidates for a job
+        Index("ix_job_recommendations_candidate_score", "candidate_id", "score"),  # Jobs for a candidate
+    )
+    
+    job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
+    candidate_id = Column(Integer, ForeignKey("candidates.id"), nullable=False)
+    score = Column(Float, nullable=False)  # 0-100, see utils.similarity_scoring
+    rank = Column(Integer, nullable=False)  # 1-based within the job
+    computed_at = Column(DateTime, nullable=False)
+    
+    # Relationships
+    job = relationship("Job", back_populates="recommendations")
+    candidate = relationship("Candidate")
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, String, Boolean
+from sqlalchemy import Column, String, Boolean, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from .base import BaseModel
 
 class User(BaseModel):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),  # Keyset pagination
+    )
     
     uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
     email = Column(String(255), unique=True, index=True, nullable=False)
@@ -12,4 +16,9 @@ class User(BaseModel):
     last_name = Column(String(100), nullable=False)
     hashed_password = Column(String(255), nullable=False)
     is_verified = Column(Boolean, default=False)
-    is_superuser = Column(Boolean, default=False)
\ No newline at end of file
+    is_superuser = Column(Boolean, default=False)
+    
+    # Relationships
+    company_memberships = relationship(
+        "CompanyUser", back_populates="user", foreign_keys="CompanyUser.user_id"
+    )
\ No newline at end of file
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
-from .common import BaseEntity
+from uuid import UUID
+from .common import BaseEntity, PaginatedResponse
 
 class SkillBase(BaseModel):
     name: str
@@ -93,21 +94,25 @@ class CandidateUpdate(BaseModel):
     availability_status: Optional[str] = None
 
 class CandidateInDB(CandidateBase, BaseEntity):
-    uuid: str
+    uuid: UUID
     resume_url: Optional[str] = None
-    resume_text: Optional[str] = None
     profile_completion_score: float
     availability_status: str
     preferred_contact_method: str
     consent_to_contact: bool
     data_retention_consent: bool
 
-class Candidate(CandidateInDB):
+class CandidateSummary(CandidateInDB):
+    """List/search view; resume_text is a deferred column and is left out"""
     skills: List[CandidateSkill] = []
 
+class Candidate(CandidateSummary):
+    resume_text: Optional[str] = None
+
 class CandidateSearch(BaseModel):
     query: Optional[str] = None
     skills: Optional[List[str]] = None
+    skill_categories: Optional[List[int]] = None  # Any skill under any of these categories, subcategories included
     min_experience: Optional[float] = None
     max_experience: Optional[float] = None
     locations: Optional[List[str]] = None
@@ -115,3 +120,35 @@ class CandidateSearch(BaseModel):
     availability_status: Optional[str] = None
     min_salary: Optional[int] = None
     max_salary: Optional[int] = None
+
+class CandidateSearchFacets(BaseModel):
+    availability_status: Dict[str, int] = {}
+    remote_work_preference: Dict[str, int] = {}
+    skills: Dict[str, int] = {}  # Top skills among matches
+
+class CandidateSearchResponse(PaginatedResponse[CandidateSummary]):
+    facets: CandidateSearchFacets
+
+class CandidateImportRowError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    errors: List[dict] = []
+
+class CandidateImportResult(BaseModel):
+    total_rows: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0  # Existing emails with on_conflict=skip, or superseded in-file duplicates
+    failed: int = 0
+    errors: List[CandidateImportRowError] = []
+    errors_truncated: bool = False
+
+class DuplicateCandidate(BaseModel):
+    candidate_id: int
+    first_name: str
+    last_name: str
+    email: str
+    cluster_id: Optional[int] = None
+    similarity: float
+    profile_similarity: float  # Estimated Jaccard of name + phone/profile URL shingles
+    resume_similarity: float  # Estimated Jaccard of resume word 4-grams
@@ -13,12 +13,14 @@ class BaseResponse(BaseModel, Generic[T]):
     code: str = "SUCCESS"
 
 class PaginationMeta(BaseModel):
-    page_index: int
+    page_index: Optional[int] = None  # None when paging by cursor
     page_size: int
-    total_count: int
-    total_pages: int
+    total_count: Optional[int] = None  # None when include_total=false
+    total_pages: Optional[int] = None
     has_previous: bool
     has_next: bool
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 class PaginatedResponse(BaseModel, Generic[T]):
     data: List[T]
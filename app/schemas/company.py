@@ -1,5 +1,6 @@
 from pydantic import BaseModel, validator
 from typing import Optional, List
+from datetime import datetime
 from .common import BaseEntity
 from .user import User
 
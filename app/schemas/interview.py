@@ -0,0 +1,78 @@
+from pydantic import BaseModel, validator
+from typing import List, Optional
+from datetime import datetime
+from uuid import UUID
+from .common import BaseEntity
+
+class InterviewBase(BaseModel):
+    title: str
+    candidate_id: int
+    job_id: Optional[int] = None
+    interview_type: str = "technical"
+    scheduled_at: Optional[datetime] = None
+    duration_minutes: int = 60
+
+class Interview(InterviewBase, BaseEntity):
+    uuid: UUID
+    company_id: int
+    status: str
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    interviewer_ids: List[int] = []
+
+# Bookings are at most 8 hours, which keeps the database clash check a bounded range scan
+MAX_DURATION_MINUTES = 480
+
+class InterviewCreate(InterviewBase):
+    company_id: int
+    scheduled_at: datetime
+    interviewer_ids: List[int] = []
+    
+    @validator('duration_minutes')
+    def validate_duration(cls, v):
+        if not 0 < v <= MAX_DURATION_MINUTES:
+            raise ValueError(f'Must be between 1 and {MAX_DURATION_MINUTES} minutes')
+        return v
+
+class InterviewReschedule(BaseModel):
+    scheduled_at: datetime
+    duration_minutes: Optional[int] = None
+    interviewer_ids: Optional[List[int]] = None  # None keeps the current interviewers
+    
+    @validator('duration_minutes')
+    def validate_duration(cls, v):
+        if v is not None and not 0 < v <= MAX_DURATION_MINUTES:
+            raise ValueError(f'Must be between 1 and {MAX_DURATION_MINUTES} minutes')
+        return v
+
+class AvailabilityWindow(BaseModel):
+    start: datetime
+    end: datetime
+
+class InterviewerAvailability(BaseModel):
+    windows: List[AvailabilityWindow]  # When all interviewers are free for the duration
+    slots: List[datetime]  # Start times inside the windows, on the slot grid
+
+class AnswerEvaluationRequest(BaseModel):
+    question: str
+    answer: str
+    rubric: Optional[str] = None
+    
+    @validator('question', 'answer')
+    def validate_not_blank(cls, v):
+        if not v.strip():
+            raise ValueError('Must not be blank')
+        return v
+
+class InterviewResponse(BaseEntity):
+    interview_id: int
+    question: str
+    answer: str
+    rubric: Optional[str] = None
+    score: Optional[float] = None
+    feedback: Optional[str] = None
+    follow_up_question: Optional[str] = None
+    model: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    evaluated_at: Optional[datetime] = None
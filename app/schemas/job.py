@@ -0,0 +1,23 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+class RecommendedCandidate(BaseModel):
+    candidate_id: int
+    first_name: str
+    last_name: str
+    current_title: Optional[str] = None
+    years_of_experience: Optional[float] = None
+    score: float
+    rank: int
+    computed_at: datetime
+
+class RecommendedJob(BaseModel):
+    job_id: int
+    title: str
+    company_id: int
+    location: Optional[str] = None
+    remote_work_type: Optional[str] = None
+    score: float
+    rank: int  # The candidate's rank among the job's recommendations
+    computed_at: datetime
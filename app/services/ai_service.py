@@ -0,0 +1,909 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Set, Tuple, Union
+
+import httpx
+import numpy as np
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.exceptions import InterviewOrchestratorException
+from app.utils.ai_helpers import hash_embedding, normalize_rows
+
+logger = logging.getLogger(__name__)
+
+# Rate limits and transient server errors; anything else is the request's fault
+RETRYABLE_STATUS_CODES = (408, 409, 429, 500, 502, 503, 504)
+
+class AIServiceError(InterviewOrchestratorException):
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        self.retryable = retryable
+        self.retry_after = retry_after
+        super().__init__(message, "AI_SERVICE_ERROR")
+
+class AIServiceBusy(AIServiceError):
+    def __init__(self, message: str = "AI service is busy, please retry"):
+        super().__init__(message)
+        self.code = "AI_SERVICE_BUSY"
+
+class Completion:
+    def __init__(
+        self,
+        text: str,
+        model: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        cached: Optional[str] = None
+    ):
+        self.text = text
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cached = cached  # None, "exact" or "semantic"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "text": self.text,
+            "model": self.model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached": self.cached,
+        }
+
+class AIProvider:
+    """One model backend. Raises AIServiceError, with ``retryable`` set for
+    failures worth another attempt.
+    """
+    name = "base"
+    # Whether embeddings capture meaning well enough to reuse a cached
+    # completion for a similar prompt (the semantic cache tier)
+    semantic_embeddings = True
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int,
+        temperature: float
+    ) -> Completion:
+        raise NotImplementedError
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int,
+        temperature: float
+    ) -> AsyncIterator[Union[str, Completion]]:
+        """Text chunks as they are generated, then the final Completion.
+
+        Providers without streaming send the whole text as one chunk.
+        """
+        completion = await self.complete(messages, model, max_tokens, temperature)
+        yield completion.text
+        yield completion
+
+    async def embed(self, texts: List[str], model: str) -> List[List[float]]:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+class StubProvider(AIProvider):
+    """Deterministic offline provider for development and load tests.
+
+    Completions echo a digest of the request, embeddings are feature-hashed
+    bags of words (similar texts get similar vectors). ``latency`` and
+    ``failure_rate`` (retryable errors, seeded) simulate a remote API;
+    replies take ``latency`` for the first word and ``token_latency`` for
+    each one after it. Bag-of-words vectors can't tell reordered or negated
+    texts apart, so the semantic cache tier is off for this provider.
+    """
+    name = "stub"
+    semantic_embeddings = False
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        embedding_dim: int = 256,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        token_latency: float = 0.0
+    ):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.embedding_dim = embedding_dim
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.calls = {"complete": 0, "stream": 0, "embed": 0}
+
+    async def simulate(self, kind: str):
+        self.calls[kind] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            raise AIServiceError("Stub provider simulated failure", retryable=True)
+
+    @staticmethod
+    def reply(messages: List[Dict[str, str]], model: str, max_tokens: int) -> Completion:
+        digest = hashlib.sha256(json.dumps([model, messages], sort_keys=True).encode()).hexdigest()[:12]
+        prompt = messages[-1]["content"] if messages else ""
+        words = prompt.split()
+        text = " ".join([f"[stub {digest}]", *words[:max(0, max_tokens - 2)]])
+        return Completion(
+            text,
+            model,
+            prompt_tokens=sum(len(message["content"].split()) for message in messages),
+            completion_tokens=len(text.split())
+        )
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int,
+        temperature: float
+    ) -> Completion:
+        await self.simulate("complete")
+        completion = self.reply(messages, model, max_tokens)
+        if self.token_latency:
+            # A blocking call only returns once the last word is generated
+            await asyncio.sleep(self.token_latency * (len(completion.text.split(" ")) - 1))
+        return completion
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int,
+        temperature: float
+    ) -> AsyncIterator[Union[str, Completion]]:
+        await self.simulate("stream")
+        completion = self.reply(messages, model, max_tokens)
+        for position, word in enumerate(completion.text.split(" ")):
+            if position and self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            yield word if not position else " " + word
+        yield completion
+
+    async def embed(self, texts: List[str], model: str) -> List[List[float]]:
+        await self.simulate("embed")
+        return [hash_embedding(text, self.embedding_dim).tolist() for text in texts]
+
+class OpenAIProvider(AIProvider):
+    """OpenAI-compatible HTTP API over one pooled keep-alive httpx client"""
+    name = "openai"
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.openai.com/v1",
+        timeout: float = 30.0,
+        max_connections: int = 32
+    ):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.client: Optional[httpx.AsyncClient] = None
+
+    def get_client(self) -> httpx.AsyncClient:
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                timeout=httpx.Timeout(self.timeout, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self.client
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = await self.get_client().post(path, json=payload)
+        except httpx.TransportError as e:
+            raise AIServiceError(f"AI provider unreachable: {e!r}", retryable=True)
+        if response.status_code >= 400:
+            raise self.response_error(response)
+        return response.json()
+
+    @staticmethod
+    def response_error(response: httpx.Response) -> AIServiceError:
+        retry_after = response.headers.get("retry-after")
+        return AIServiceError(
+            f"AI provider returned {response.status_code}: {response.text[:200]}",
+            retryable=response.status_code in RETRYABLE_STATUS_CODES,
+            retry_after=float(retry_after) if retry_after and retry_after.replace(".", "", 1).isdigit() else None
+        )
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int,
+        temperature: float
+    ) -> Completion:
+        data = await self.post("/chat/completions", {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        })
+        usage = data.get("usage") or {}
+        return Completion(
+            data["choices"][0]["message"]["content"] or "",
+            data.get("model", model),
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0)
+        )
+
+    async def stream(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int,
+        temperature: float
+    ) -> AsyncIterator[Union[str, Completion]]:
+        payload = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        parts: List[str] = []
+        usage: Dict[str, Any] = {}
+        try:
+            async with self.get_client().stream("POST", "/chat/completions", json=payload) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    raise self.response_error(response)
+                # Server-sent events: one JSON chunk per "data:" line, then [DONE]
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    chunk = json.loads(data)
+                    model = chunk.get("model") or model
+                    usage = chunk.get("usage") or usage
+                    for choice in chunk.get("choices") or []:
+                        delta = (choice.get("delta") or {}).get("content")
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+        except httpx.TransportError as e:
+            raise AIServiceError(f"AI provider unreachable: {e!r}", retryable=True)
+        yield Completion(
+            "".join(parts),
+            model,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0)
+        )
+
+    async def embed(self, texts: List[str], model: str) -> List[List[float]]:
+        data = await self.post("/embeddings", {"model": model, "input": texts})
+        return [item["embedding"] for item in sorted(data["data"], key=lambda item: item["index"])]
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+class SemanticIndex:
+    """Normalized embeddings of one scope's cached prompts, LRU-bounded"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.keys: List[str] = []
+        self.matrix: Optional[np.ndarray] = None  # Stacked vectors, rebuilt after changes
+
+    def add(self, key: str, vector: np.ndarray):
+        self.vectors[key] = vector
+        self.vectors.move_to_end(key)
+        while len(self.vectors) > self.maxsize:
+            self.vectors.popitem(last=False)
+        self.matrix = None
+
+    def remove(self, key: str):
+        if self.vectors.pop(key, None) is not None:
+            self.matrix = None
+
+    def nearest(self, vector: np.ndarray) -> Optional[Tuple[str, float]]:
+        if not self.vectors:
+            return None
+        if self.matrix is None or self.matrix.shape[1] != len(vector):
+            self.keys = list(self.vectors)
+            self.matrix = np.stack(list(self.vectors.values()))
+            if self.matrix.shape[1] != len(vector):
+                return None
+        scores = self.matrix @ vector
+        best = int(np.argmax(scores))
+        return self.keys[best], float(scores[best])
+
+class SemanticResponseCache:
+    """Completions cached per scope (company), in two tiers.
+
+    The exact tier is keyed by a hash of the full request. The optional
+    semantic tier answers a request whose varying part (e.g. a job
+    description) embeds within ``similarity_threshold`` cosine similarity
+    of a cached one with the same namespace (e.g. the job title), so
+    near-identical templates get the same questions. Grading never uses it:
+    answers that embed alike can still deserve different scores. Responses live in one
+    LRU/TTL-bounded cache; each scope's semantic index holds at most
+    ``semantic_maxsize`` vectors and at most ``max_scopes`` indexes are kept.
+    Scopes never see each other's entries.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10000,
+        ttl: float = 86400,
+        similarity_threshold: float = 0.95,
+        semantic_maxsize: int = 2000,
+        max_scopes: int = 1000
+    ):
+        self.responses = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.similarity_threshold = similarity_threshold
+        self.semantic_maxsize = semantic_maxsize
+        self.max_scopes = max_scopes
+        self.indexes: "OrderedDict[Tuple, SemanticIndex]" = OrderedDict()
+        self.counters = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+    def get_exact(self, scope: Hashable, key: str) -> Optional[Dict[str, Any]]:
+        return self.responses.get((scope, key))
+
+    def get_similar(
+        self,
+        scope: Hashable,
+        namespace: Tuple,
+        vector: np.ndarray
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        index = self.indexes.get((scope, namespace))
+        nearest = index.nearest(vector) if index is not None else None
+        if nearest is None or nearest[1] < self.similarity_threshold:
+            return None
+        value = self.responses.get((scope, nearest[0]))
+        if value is None:
+            # Evicted or expired from the response tier
+            index.remove(nearest[0])
+            return None
+        self.indexes.move_to_end((scope, namespace))
+        return value, nearest[1]
+
+    def set(
+        self,
+        scope: Hashable,
+        key: str,
+        value: Dict[str, Any],
+        namespace: Optional[Tuple] = None,
+        vector: Optional[np.ndarray] = None
+    ):
+        self.responses.set((scope, key), value)
+        if vector is None:
+            return
+        index = self.indexes.get((scope, namespace))
+        if index is None:
+            index = self.indexes[(scope, namespace)] = SemanticIndex(self.semantic_maxsize)
+            while len(self.indexes) > self.max_scopes:
+                self.indexes.popitem(last=False)
+        self.indexes.move_to_end((scope, namespace))
+        index.add(key, vector)
+
+    def record(self, outcome: str):
+        self.counters[outcome] += 1
+
+    def clear(self):
+        self.responses.clear()
+        self.indexes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = sum(self.counters.values())
+        hits = self.counters["exact_hits"] + self.counters["semantic_hits"]
+        return {
+            **self.counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "semantic_hit_rate": round(self.counters["semantic_hits"] / lookups, 4) if lookups else 0.0,
+            "responses": self.responses.stats(),
+            "semantic_scopes": len(self.indexes),
+            "semantic_vectors": sum(len(index.vectors) for index in self.indexes.values()),
+        }
+
+class AIClient:
+    """Provider-agnostic async client.
+
+    - At most ``max_concurrency`` provider calls run at once; up to
+      ``max_queue`` more wait, beyond that calls raise AIServiceBusy.
+    - Identical in-flight completions share one provider call.
+    - Embedding requests are micro-batched: texts queued within
+      ``embedding_batch_wait`` seconds go out together, up to
+      ``embedding_batch_size`` per call, duplicates sent once.
+    - Retryable failures are retried with full-jitter exponential
+      backoff (or the provider's Retry-After), outside the concurrency slot.
+    - With a ``cache``, completions are served from a SemanticResponseCache
+      first.
+    - ``stream()`` relays a completion's text as it is generated; streams
+      are not coalesced and are only retried before their first chunk.
+    """
+
+    def __init__(
+        self,
+        provider: AIProvider,
+        default_model: str = "gpt-4o-mini",
+        embedding_model: str = "text-embedding-3-small",
+        max_concurrency: int = 16,
+        max_queue: int = 256,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        embedding_batch_size: int = 64,
+        embedding_batch_wait: float = 0.01,
+        cache: Optional[SemanticResponseCache] = None
+    ):
+        self.provider = provider
+        self.cache = cache
+        self.default_model = default_model
+        self.embedding_model = embedding_model
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.embedding_batch_size = embedding_batch_size
+        self.embedding_batch_wait = embedding_batch_wait
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.waiting = 0
+        self.active = 0
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        # Per embedding model: text -> future for the batch being collected
+        self.pending_embeddings: Dict[str, Dict[str, asyncio.Future]] = {}
+        self.flush_timers: Dict[str, asyncio.TimerHandle] = {}
+        self.batch_tasks: Set[asyncio.Task] = set()
+        self.counters = {
+            "calls": 0,
+            "completions": 0,
+            "streams": 0,
+            "coalesced": 0,
+            "embedded_texts": 0,
+            "embedding_batches": 0,
+            "retries": 0,
+            "failures": 0,
+            "rejected": 0,
+        }
+        self.total_call_time = 0.0
+
+    async def acquire(self) -> float:
+        """Wait for a concurrency slot (or raise AIServiceBusy); returns the start time"""
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.semaphore.locked() and self.waiting >= self.max_queue:
+            self.counters["rejected"] += 1
+            raise AIServiceBusy()
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.counters["calls"] += 1
+        return time.perf_counter()
+
+    def release(self, started: float):
+        self.total_call_time += time.perf_counter() - started
+        self.active -= 1
+        self.semaphore.release()
+
+    def backoff(self, error: AIServiceError, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a failed attempt, or None if it is final"""
+        if not error.retryable or attempt == self.max_retries:
+            self.counters["failures"] += 1
+            return None
+        delay = error.retry_after
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        logger.warning(f"AI provider call failed ({error.message}), retrying in {delay:.2f}s")
+        return delay
+
+    async def call(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        """Run one provider request under the concurrency limit, with retries"""
+        for attempt in range(self.max_retries + 1):
+            started = await self.acquire()
+            try:
+                return await request()
+            except AIServiceError as e:
+                delay = self.backoff(e, attempt)
+                if delay is None:
+                    raise
+            finally:
+                self.release(started)
+            self.counters["retries"] += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def completion_key(messages: List[Dict[str, str]], model: str, max_tokens: int, temperature: float) -> str:
+        return hashlib.sha256(json.dumps([messages, model, max_tokens, temperature], sort_keys=True).encode()).hexdigest()
+
+    async def complete(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        system: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: int = 512,
+        temperature: float = 0.0,
+        cache_scope: Optional[Union[int, str]] = None,
+        use_cache: bool = True,
+        semantic_text: Optional[str] = None,
+        semantic_namespace: str = ""
+    ) -> Completion:
+        """Chat completion for a prompt (or a full message list).
+
+        Cached responses are only shared within ``cache_scope`` (a company
+        id; None is the global scope). Passing ``semantic_text`` (the part
+        of the prompt that varies, e.g. a job description) also accepts a
+        cached response for a similar text under the same
+        ``semantic_namespace`` (e.g. the job title), if the provider's
+        embeddings support it.
+        """
+        messages = self.build_messages(prompt, messages, system)
+        model = model or self.default_model
+        self.counters["completions"] += 1
+        key = self.completion_key(messages, model, max_tokens, temperature)
+        if self.cache is None or not use_cache:
+            return await self.request_completion(key, messages, model, max_tokens, temperature)
+
+        cached, namespace, vector = await self.lookup(cache_scope, key, model, semantic_text, semantic_namespace)
+        if cached is not None:
+            return cached
+        completion = await self.request_completion(key, messages, model, max_tokens, temperature)
+        self.remember(cache_scope, key, completion, namespace, vector)
+        return completion
+
+    async def stream(
+        self,
+        prompt: Optional[str] = None,
+        messages: Optional[List[Dict[str, str]]] = None,
+        system: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: int = 512,
+        temperature: float = 0.0,
+        cache_scope: Optional[Union[int, str]] = None,
+        use_cache: bool = True,
+        semantic_text: Optional[str] = None,
+        semantic_namespace: str = ""
+    ) -> AsyncIterator[Union[str, Completion]]:
+        """Like complete(), but yields text chunks as they arrive, then the final Completion.
+
+        A cached response arrives as a single chunk. Failures before the
+        first chunk are retried like complete(); after it they are raised,
+        since the caller has already relayed part of the text. The
+        concurrency slot is held until the stream ends or is closed.
+        """
+        messages = self.build_messages(prompt, messages, system)
+        model = model or self.default_model
+        self.counters["streams"] += 1
+        key = self.completion_key(messages, model, max_tokens, temperature)
+        caching = self.cache is not None and use_cache
+        if caching:
+            cached, namespace, vector = await self.lookup(cache_scope, key, model, semantic_text, semantic_namespace)
+            if cached is not None:
+                yield cached.text
+                yield cached
+                return
+
+        completion = None
+        for attempt in range(self.max_retries + 1):
+            started = await self.acquire()
+            chunks = self.provider.stream(messages, model, max_tokens, temperature)
+            relayed = False
+            try:
+                async for chunk in chunks:
+                    if isinstance(chunk, Completion):
+                        completion = chunk
+                    else:
+                        relayed = True
+                        yield chunk
+            except AIServiceError as e:
+                if relayed:
+                    self.counters["failures"] += 1
+                    raise
+                delay = self.backoff(e, attempt)
+                if delay is None:
+                    raise
+            else:
+                break
+            finally:
+                await chunks.aclose()
+                self.release(started)
+            self.counters["retries"] += 1
+            await asyncio.sleep(delay)
+
+        if caching:
+            self.remember(cache_scope, key, completion, namespace, vector)
+        yield completion
+
+    @staticmethod
+    def build_messages(
+        prompt: Optional[str],
+        messages: Optional[List[Dict[str, str]]],
+        system: Optional[str]
+    ) -> List[Dict[str, str]]:
+        if messages is None:
+            messages = [{"role": "user", "content": prompt or ""}]
+        if system:
+            messages = [{"role": "system", "content": system}, *messages]
+        return messages
+
+    async def lookup(
+        self,
+        scope: Optional[Union[int, str]],
+        key: str,
+        model: str,
+        semantic_text: Optional[str],
+        semantic_namespace: str
+    ) -> Tuple[Optional[Completion], Tuple, Optional[np.ndarray]]:
+        """Cached completion (or None), plus the semantic namespace and vector to store a miss under"""
+        cached = self.cache.get_exact(scope, key)
+        if cached is not None:
+            self.cache.record("exact_hits")
+            return Completion(**{**cached, "cached": "exact"}), None, None
+        vector, namespace = None, (model, semantic_namespace)
+        if semantic_text is not None and self.provider.semantic_embeddings:
+            vector = normalize_rows(await self.embed_one(semantic_text))
+            similar = self.cache.get_similar(scope, namespace, vector)
+            if similar is not None:
+                self.cache.record("semantic_hits")
+                return Completion(**{**similar[0], "cached": "semantic"}), None, None
+        self.cache.record("misses")
+        return None, namespace, vector
+
+    def remember(
+        self,
+        scope: Optional[Union[int, str]],
+        key: str,
+        completion: Completion,
+        namespace: Tuple,
+        vector: Optional[np.ndarray]
+    ):
+        value = completion.to_dict()
+        value.pop("cached")
+        self.cache.set(scope, key, value, namespace=namespace, vector=vector)
+
+    async def request_completion(
+        self,
+        key: str,
+        messages: List[Dict[str, str]],
+        model: str,
+        max_tokens: int,
+        temperature: float
+    ) -> Completion:
+        task = self.in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self.call(lambda: self.provider.complete(messages, model, max_tokens, temperature))
+            )
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self.forget(key, done))
+        else:
+            self.counters["coalesced"] += 1
+        # A caller giving up must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def forget(self, key: str, task: asyncio.Task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled():
+            task.exception()  # Retrieved here, in case every caller gave up
+
+    def queue_embedding(self, text: str, model: str) -> asyncio.Future:
+        batch = self.pending_embeddings.setdefault(model, {})
+        future = batch.get(text)
+        if future is not None:
+            self.counters["coalesced"] += 1
+            return future
+        future = batch[text] = asyncio.get_running_loop().create_future()
+        if len(batch) >= self.embedding_batch_size:
+            self.flush_embeddings(model)
+        elif model not in self.flush_timers:
+            self.flush_timers[model] = asyncio.get_running_loop().call_later(
+                self.embedding_batch_wait, self.flush_embeddings, model
+            )
+        return future
+
+    def flush_embeddings(self, model: str):
+        timer = self.flush_timers.pop(model, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self.pending_embeddings.pop(model, None)
+        if batch:
+            task = asyncio.ensure_future(self.send_embeddings(model, batch))
+            self.batch_tasks.add(task)
+            task.add_done_callback(self.batch_tasks.discard)
+
+    async def send_embeddings(self, model: str, batch: Dict[str, asyncio.Future]):
+        texts = list(batch)
+        try:
+            vectors = await self.call(lambda: self.provider.embed(texts, model))
+            if len(vectors) != len(texts):
+                # Can't tell which text a vector belongs to
+                raise AIServiceError(f"Embedding provider returned {len(vectors)} vectors for {len(texts)} texts")
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.counters["embedding_batches"] += 1
+        self.counters["embedded_texts"] += len(texts)
+        for text, vector in zip(texts, vectors):
+            if not batch[text].done():
+                batch[text].set_result(np.asarray(vector, dtype=np.float32))
+
+    async def embed(self, texts: Sequence[str], model: Optional[str] = None) -> np.ndarray:
+        """``(len(texts), dim)`` float32 embeddings, batched with other callers' texts"""
+        model = model or self.embedding_model
+        futures = [self.queue_embedding(text, model) for text in texts]
+        if not futures:
+            return np.zeros((0, 0), dtype=np.float32)
+        vectors = await asyncio.gather(*(asyncio.shield(future) for future in futures))
+        return np.stack(vectors)
+
+    async def embed_one(self, text: str, model: Optional[str] = None) -> np.ndarray:
+        return (await self.embed([text], model))[0]
+
+    async def close(self):
+        for model in list(self.pending_embeddings):
+            self.flush_embeddings(model)
+        if self.batch_tasks:
+            await asyncio.gather(*self.batch_tasks, return_exceptions=True)
+        await self.provider.close()
+
+    def stats(self) -> Dict[str, Any]:
+        calls = self.counters["calls"]
+        return {
+            "provider": self.provider.name,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_use": self.active,
+            "queued": self.waiting,
+            "in_flight_completions": len(self.in_flight),
+            "avg_call_ms": round(self.total_call_time / calls * 1000, 3) if calls else 0.0,
+            **self.counters,
+            "response_cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+def create_provider() -> AIProvider:
+    """Provider from settings; the offline stub only when AI_MODEL_PROVIDER is unset or "stub".
+
+    A real provider without its API key, or an unknown one, fails startup
+    instead of quietly serving stub answers.
+    """
+    provider = (settings.AI_MODEL_PROVIDER or "stub").lower()
+    if provider == "stub":
+        return StubProvider(
+            latency=settings.AI_STUB_LATENCY_MS / 1000,
+            token_latency=settings.AI_STUB_TOKEN_LATENCY_MS / 1000
+        )
+    if provider == "openai":
+        if not settings.OPENAI_API_KEY:
+            raise ValueError("AI_MODEL_PROVIDER=openai needs OPENAI_API_KEY")
+        return OpenAIProvider(
+            settings.OPENAI_API_KEY,
+            base_url=settings.AI_BASE_URL or "https://api.openai.com/v1",
+            timeout=settings.AI_REQUEST_TIMEOUT_SECONDS,
+            max_connections=settings.AI_MAX_CONCURRENCY
+        )
+    raise ValueError(f"Unsupported AI_MODEL_PROVIDER: {provider!r}")
+
+ai_client = AIClient(
+    create_provider(),
+    default_model=settings.DEFAULT_AI_MODEL or "gpt-4o-mini",
+    embedding_model=settings.AI_EMBEDDING_MODEL,
+    max_concurrency=settings.AI_MAX_CONCURRENCY,
+    max_queue=settings.AI_MAX_QUEUE,
+    max_retries=settings.AI_MAX_RETRIES,
+    embedding_batch_size=settings.AI_EMBEDDING_BATCH_SIZE,
+    embedding_batch_wait=settings.AI_EMBEDDING_BATCH_WAIT_MS / 1000,
+    cache=SemanticResponseCache(
+        maxsize=settings.AI_RESPONSE_CACHE_SIZE,
+        ttl=settings.AI_RESPONSE_CACHE_TTL_SECONDS,
+        similarity_threshold=settings.AI_SEMANTIC_CACHE_THRESHOLD,
+        semantic_maxsize=settings.AI_SEMANTIC_CACHE_SIZE_PER_SCOPE
+    )
+)
+
+QUESTION_GENERATION_PROMPT = (
+    "You write interview questions. Reply with one question per line, "
+    "without numbering or commentary."
+)
+ANSWER_EVALUATION_PROMPT = (
+    "You grade interview answers. Reply with a score from 1 to 10 on the first "
+    "line, then one short paragraph of feedback."
+)
+FOLLOW_UP_PROMPT = (
+    "You are interviewing a candidate. Given a question and their answer, reply "
+    "with one short follow-up question that probes the weakest part of the answer."
+)
+
+# "7", "7/10", "Score: 7.5" at the start of the first line
+SCORE_PATTERN = re.compile(r"^\W*(?:score\W*)?(\d+(?:\.\d+)?)\s*(?:/\s*10)?\b", re.IGNORECASE)
+
+async def generate_interview_questions(
+    job_title: str,
+    job_description: str = "",
+    skills: Sequence[str] = (),
+    count: int = 5,
+    difficulty: str = "medium",
+    company_id: Optional[int] = None
+) -> List[str]:
+    """Interview questions for a job template; repeated or near-identical templates are served from the company's cache"""
+    prompt = (
+        f"Write {count} {difficulty} interview questions for a {job_title} role.\n"
+        f"Skills: {', '.join(sorted(skills)) or 'n/a'}\n"
+        f"Description: {job_description.strip() or 'n/a'}"
+    )
+    completion = await ai_client.complete(
+        prompt,
+        system=QUESTION_GENERATION_PROMPT,
+        temperature=0.7,
+        cache_scope=company_id,
+        semantic_text=f"{', '.join(sorted(skills))}\n{job_description.strip()}",
+        semantic_namespace=f"{job_title.strip().lower()}\x1f{count}\x1f{difficulty}"
+    )
+    questions = [line.strip().lstrip("-*0123456789.) ").strip() for line in completion.text.splitlines()]
+    return [question for question in questions if question][:count]
+
+def evaluation_request(
+    question: str,
+    answer: str,
+    rubric: Optional[str] = None,
+    company_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """complete()/stream() arguments for grading an answer.
+
+    Only the exact cache tier applies: a reworded, reordered or negated
+    answer is graded afresh.
+    """
+    return {
+        "prompt": f"Question: {question}\nRubric: {rubric or 'n/a'}\nAnswer: {answer.strip()}",
+        "system": ANSWER_EVALUATION_PROMPT,
+        "cache_scope": company_id,
+    }
+
+def follow_up_request(question: str, answer: str, company_id: Optional[int] = None) -> Dict[str, Any]:
+    """complete()/stream() arguments for a follow-up question to an answer"""
+    return {
+        "prompt": f"Question: {question}\nAnswer: {answer}",
+        "system": FOLLOW_UP_PROMPT,
+        "max_tokens": 128,
+        "temperature": 0.7,
+        "cache_scope": company_id,
+    }
+
+def parse_evaluation(text: str) -> Tuple[Optional[float], str]:
+    """(score, feedback) from an evaluation; score is None if the first line has no 0-10 score"""
+    first_line, _, rest = text.strip().partition("\n")
+    match = SCORE_PATTERN.match(first_line)
+    if match is None or float(match.group(1)) > 10:
+        return None, text.strip()
+    feedback = (first_line[match.end():].strip(" .:-") + "\n" + rest).strip()
+    return float(match.group(1)), feedback
+
+async def evaluate_answer(
+    question: str,
+    answer: str,
+    rubric: Optional[str] = None,
+    company_id: Optional[int] = None
+) -> Completion:
+    """Grade an answer; the same answer to the same question and rubric reuses the cached grade"""
+    return await ai_client.complete(**evaluation_request(question, answer, rubric, company_id))
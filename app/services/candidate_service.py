@@ -0,0 +1,298 @@
+from datetime import datetime
+from typing import Any, AsyncIterable, Dict, List, Set, Tuple
+import logging
+
+from pydantic import ValidationError
+from sqlalchemy import ARRAY, Float, Integer, Numeric, case, cast, delete, func, insert, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import ValidationError as CandidateValidationError
+from app.models.candidate import Candidate, CandidateSkill, Skill
+from app.schemas.candidate import (
+    CandidateCreate,
+    CandidateImportResult,
+    CandidateImportRowError
+)
+from app.services.embedding_service import CANDIDATE, enqueue_embeddings
+from app.services.similarity_service import candidate_deduplicator
+
+logger = logging.getLogger(__name__)
+
+PROFILE_COMPLETION_FIELDS = (
+    "first_name", "last_name", "email", "phone_number", "current_title", "current_company",
+    "years_of_experience", "summary", "linkedin_url", "github_url", "portfolio_url",
+    "expected_salary_min", "expected_salary_max", "preferred_locations", "remote_work_preference",
+)
+
+def calculate_profile_completion(candidate: Any) -> float:
+    """Calculate profile completion score based on filled fields"""
+    completed_fields = sum(1 for field in PROFILE_COMPLETION_FIELDS if getattr(candidate, field))
+    return round((completed_fields / len(PROFILE_COMPLETION_FIELDS)) * 100, 2)
+
+def profile_completion_sql(values: Dict[str, Any]):
+    """calculate_profile_completion as a SQL expression over ``values`` (field -> expression)"""
+    completed_fields = literal(0)
+    for field in PROFILE_COMPLETION_FIELDS:
+        value = values.get(field, Candidate.__table__.c[field])
+        column_type = Candidate.__table__.c[field].type
+        if isinstance(column_type, ARRAY):
+            filled = func.coalesce(func.cardinality(value), 0) > 0
+        elif isinstance(column_type, (Integer, Numeric)):
+            filled = func.coalesce(value, 0) != 0
+        else:
+            filled = func.coalesce(value, "") != ""
+        completed_fields = completed_fields + case((filled, 1), else_=0)
+    return cast(func.round(cast(completed_fields * 100.0 / len(PROFILE_COMPLETION_FIELDS), Numeric), 2), Float)
+
+async def create_candidate(db: AsyncSession, candidate_data: CandidateCreate) -> Candidate:
+    """Create a candidate and its skills in a single transaction.
+
+    The completion score is computed before the INSERT, the candidate and
+    its skills go out in one flush (the skills as one multi-row INSERT) and
+    the session commits once, so a failure leaves nothing behind. The
+    returned candidate has ``skills -> skill`` populated in memory and can
+    be serialized without another round trip. The near-duplicate index
+    (``similarity_service.candidate_deduplicator``) is updated and an
+    embedding is queued in the same transaction.
+    """
+    skills_by_id = {}
+    if candidate_data.skills:
+        requested_ids = {skill.skill_id for skill in candidate_data.skills}
+        skills_by_id = {
+            skill.id: skill
+            for skill in await db.scalars(select(Skill).where(Skill.id.in_(requested_ids)))
+        }
+        unknown_ids = requested_ids - set(skills_by_id)
+        if unknown_ids:
+            raise CandidateValidationError(
+                f"Unknown skill_id(s): {', '.join(map(str, sorted(unknown_ids)))}", field="skills"
+            )
+
+    candidate = Candidate(
+        **candidate_data.dict(exclude={"skills"}),
+        resume_text=None,
+        profile_completion_score=calculate_profile_completion(candidate_data)
+    )
+    candidate.skills = [
+        CandidateSkill(skill=skills_by_id[skill_data.skill_id], **skill_data.dict())
+        for skill_data in candidate_data.skills or []
+    ]
+    db.add(candidate)
+
+    try:
+        # Flushed first: the duplicate index is keyed by the new id
+        await db.flush()
+        await candidate_deduplicator.index_rows(db, [candidate], replace=False)
+        await enqueue_embeddings(db, CANDIDATE, [candidate.id])
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        # The unique email index replaces a separate existence query
+        if "email" in str(e.orig):
+            raise CandidateValidationError("Candidate email already exists", field="email")
+        raise
+    return candidate
+
+def csv_row_to_candidate(record: Dict[str, str]) -> Dict[str, Any]:
+    """Map a flat CSV row onto CandidateCreate input.
+
+    Blank cells are treated as missing. ``preferred_locations`` is
+    ``;``-separated and ``skills`` is ``skill_id:proficiency[:years]``
+    entries separated by ``;``.
+    """
+    data: Dict[str, Any] = {}
+    for column, value in record.items():
+        value = (value or "").strip()
+        if not column or not value:
+            continue
+        if column == "preferred_locations":
+            data[column] = [location.strip() for location in value.split(";") if location.strip()]
+        elif column == "skills":
+            skills = []
+            for entry in filter(None, (part.strip() for part in value.split(";"))):
+                parts = [part.strip() for part in entry.split(":")]
+                skill = {"skill_id": parts[0], "proficiency_level": parts[1] if len(parts) > 1 else ""}
+                if len(parts) > 2:
+                    skill["years_of_experience"] = parts[2]
+                skills.append(skill)
+            data[column] = skills
+        else:
+            data[column] = value
+    return data
+
+def validation_errors(exc: ValidationError) -> List[dict]:
+    return [
+        {
+            "field": ".".join(str(part) for part in error["loc"]) or None,
+            "message": error["msg"],
+            "code": error["type"]
+        }
+        for error in exc.errors()
+    ]
+
+class CandidateImporter:
+    """Chunked bulk upsert of candidates and their skills.
+
+    Rows are validated with CandidateCreate as they stream in and flushed
+    every ``chunk_size`` valid rows: one multi-row ``INSERT .. ON CONFLICT
+    (email)`` for candidates, then one for their skills, then the chunk's
+    near-duplicate index entries and embedding queue rows, committed per
+    chunk. Memory is bounded
+    by the chunk and the (capped) error list.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        chunk_size: int = 1000,
+        on_conflict: str = "update",
+        max_errors: int = 1000
+    ):
+        self.db = db
+        self.chunk_size = chunk_size
+        self.on_conflict = on_conflict
+        self.max_errors = max_errors
+        self.result = CandidateImportResult()
+        self.skill_ids: Set[int] = set()
+        self.chunk: Dict[str, Tuple[int, CandidateCreate]] = {}
+
+    def add_error(self, row: int, errors: List[dict], email: str = None):
+        self.result.failed += 1
+        if len(self.result.errors) < self.max_errors:
+            self.result.errors.append(CandidateImportRowError(row=row, email=email, errors=errors))
+        else:
+            self.result.errors_truncated = True
+
+    async def run(self, records: AsyncIterable[Tuple[int, Any]], from_csv: bool = False) -> CandidateImportResult:
+        # The skills table is small; validating ids up front keeps one bad
+        # foreign key from failing a whole chunk
+        self.skill_ids = set((await self.db.scalars(select(Skill.id))).all())
+
+        async for row, record in records:
+            self.result.total_rows += 1
+            if isinstance(record, Exception):
+                code = "invalid_csv" if from_csv else "invalid_json"
+                self.add_error(row, [{"field": None, "message": str(record), "code": code}])
+                continue
+            if not isinstance(record, dict):
+                self.add_error(row, [{"field": None, "message": "Row must be an object", "code": "invalid_row"}])
+                continue
+            try:
+                candidate = CandidateCreate(**(csv_row_to_candidate(record) if from_csv else record))
+            except ValidationError as e:
+                self.add_error(row, validation_errors(e), record.get("email"))
+                continue
+
+            unknown_skills = {skill.skill_id for skill in candidate.skills or []} - self.skill_ids
+            if unknown_skills:
+                self.add_error(row, [{
+                    "field": "skills",
+                    "message": f"Unknown skill_id(s): {', '.join(map(str, sorted(unknown_skills)))}",
+                    "code": "unknown_skill"
+                }], candidate.email)
+                continue
+
+            # Later rows for the same email win
+            if candidate.email in self.chunk:
+                self.result.skipped += 1
+            self.chunk[candidate.email] = (row, candidate)
+            if len(self.chunk) >= self.chunk_size:
+                await self.flush()
+
+        if self.chunk:
+            await self.flush()
+        return self.result
+
+    async def flush(self):
+        chunk, self.chunk = self.chunk, {}
+        try:
+            await self.write_chunk(chunk)
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"Candidate import chunk failed: {str(e)}")
+            for row, candidate in chunk.values():
+                self.add_error(row, [{"field": None, "message": "Database error", "code": "database_error"}], candidate.email)
+
+    async def write_chunk(self, chunk: Dict[str, Tuple[int, CandidateCreate]]):
+        now = datetime.utcnow()
+        rows = []
+        for _, candidate in chunk.values():
+            values = candidate.dict(exclude={"skills"})
+            values["profile_completion_score"] = calculate_profile_completion(candidate)
+            values["updated_at"] = now
+            rows.append(values)
+
+        stmt = pg_insert(Candidate.__table__)
+        if self.on_conflict == "update":
+            # Blank cells never erase existing data
+            table = Candidate.__table__
+            update_columns = {
+                column: func.coalesce(stmt.excluded[column], table.c[column])
+                for column in rows[0]
+                if column not in ("email", "profile_completion_score", "updated_at")
+            }
+            # Scored from the merged row, not the partial import row
+            update_columns["profile_completion_score"] = profile_completion_sql(
+                {**update_columns, "email": stmt.excluded.email}
+            )
+            update_columns["updated_at"] = stmt.excluded.updated_at
+            stmt = stmt.on_conflict_do_update(index_elements=["email"], set_=update_columns)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["email"])
+
+        # xmax = 0 only for freshly inserted tuples
+        stmt = stmt.returning(
+            Candidate.__table__.c.id,
+            Candidate.__table__.c.email,
+            literal_column("(xmax = 0)").label("inserted")
+        )
+        returned = (await self.db.execute(stmt, rows)).all()
+
+        candidate_ids = {}
+        for candidate_id, email, inserted in returned:
+            candidate_ids[email] = candidate_id
+            if inserted:
+                self.result.created += 1
+            else:
+                self.result.updated += 1
+        self.result.skipped += len(chunk) - len(returned)
+
+        skill_rows = [
+            {
+                "candidate_id": candidate_ids[email],
+                "skill_id": skill.skill_id,
+                "proficiency_level": skill.proficiency_level,
+                "years_of_experience": skill.years_of_experience,
+                "is_primary": skill.is_primary,
+                "source": "import",
+                "updated_at": now
+            }
+            for email, (_, candidate) in chunk.items()
+            if email in candidate_ids
+            for skill in candidate.skills or []
+        ]
+        if skill_rows:
+            # A provided skill list replaces the candidate's existing skills
+            await self.db.execute(
+                delete(CandidateSkill.__table__).where(
+                    CandidateSkill.__table__.c.candidate_id.in_({row["candidate_id"] for row in skill_rows})
+                )
+            )
+            await self.db.execute(insert(CandidateSkill.__table__), skill_rows)
+
+        if candidate_ids:
+            await candidate_deduplicator.index_candidates(self.db, candidate_ids.values())
+            await enqueue_embeddings(self.db, CANDIDATE, candidate_ids.values())
+
+async def import_candidates(
+    db: AsyncSession,
+    records: AsyncIterable[Tuple[int, Any]],
+    from_csv: bool = False,
+    chunk_size: int = 1000,
+    on_conflict: str = "update"
+) -> CandidateImportResult:
+    importer = CandidateImporter(db, chunk_size=chunk_size, on_conflict=on_conflict)
+    return await importer.run(records, from_csv=from_csv)
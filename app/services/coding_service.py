@@ -0,0 +1,211 @@
+import hashlib
+import io
+import tokenize
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.exceptions import InterviewOrchestratorException, ValidationError
+from app.utils.code_runner import CodeRunner, CodeRunnerUnavailable, ExecutionResult, ResourceLimits
+
+class CodeRunnerUnavailableError(InterviewOrchestratorException):
+    """Submissions can't be run on this host; answered with a 503"""
+    def __init__(self, message: str):
+        super().__init__(message, "CODE_RUNNER_UNAVAILABLE")
+
+code_runner = CodeRunner(
+    size=settings.CODE_RUNNER_WORKERS,
+    max_queue=settings.CODE_RUNNER_MAX_QUEUE,
+    limits=ResourceLimits(
+        cpu_seconds=settings.CODE_RUNNER_CPU_SECONDS,
+        wall_seconds=settings.CODE_RUNNER_WALL_SECONDS,
+        memory_mb=settings.CODE_RUNNER_MEMORY_MB,
+        output_bytes=settings.CODE_RUNNER_OUTPUT_BYTES
+    ),
+    workdir_root=settings.CODE_RUNNER_WORKDIR,
+    sandbox_uid=settings.CODE_RUNNER_UID,
+    sandbox_gid=settings.CODE_RUNNER_GID
+)
+
+# Outcomes that depend only on the code and the input. Timeouts and
+# internal errors can be caused by load, so they are always rerun.
+CACHEABLE_STATUSES = ("ok", "runtime_error", "memory_limit", "output_limit")
+
+LAYOUT_TOKENS = (tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER)
+
+class GradingCase:
+    def __init__(self, input: str, expected_output: str):
+        self.input = input
+        self.expected_output = expected_output
+
+    @property
+    def fingerprint(self) -> str:
+        return hashlib.sha256(f"{self.input}\0{self.expected_output}".encode()).hexdigest()
+
+class CaseResult:
+    def __init__(self, index: int, result: ExecutionResult, passed: bool, cached: bool = False):
+        self.index = index
+        self.result = result
+        self.passed = passed
+        self.cached = cached
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"index": self.index, "passed": self.passed, "cached": self.cached, **self.result.to_dict()}
+
+def normalize_source(language: str, code: str) -> str:
+    """Canonical form of a submission for cache keys.
+
+    Python source is reduced to its token stream, so comments, blank lines,
+    spacing between tokens and the indentation width don't matter; string
+    literals are kept as written. Other languages (and code that does
+    not tokenize) only get their line endings normalized.
+    """
+    code = code.replace("\r\n", "\n")
+    if language != "python":
+        return code
+    try:
+        tokens = [
+            # Only the structure of newlines and indentation matters, not their text
+            f"<{tokenize.tok_name[token.type]}>" if token.type in LAYOUT_TOKENS else token.string
+            for token in tokenize.generate_tokens(io.StringIO(code).readline)
+            if token.type not in (tokenize.COMMENT, tokenize.NL)
+        ]
+    except (tokenize.TokenError, IndentationError, SyntaxError):
+        return code
+    return "\x1f".join(tokens)
+
+def source_hash(language: str, code: str) -> str:
+    return hashlib.sha256(normalize_source(language, code).encode()).hexdigest()
+
+def normalize_output(text: str) -> str:
+    """Ignore trailing whitespace on each line and trailing blank lines"""
+    return "\n".join(line.rstrip() for line in text.replace("\r\n", "\n").rstrip().split("\n"))
+
+def outputs_match(actual: str, expected: str) -> bool:
+    return normalize_output(actual) == normalize_output(expected)
+
+def is_passing(result: ExecutionResult, test_case: GradingCase) -> bool:
+    return result.ok and outputs_match(result.stdout, test_case.expected_output)
+
+class GradingResultCache:
+    """Per-test-case results, keyed by (problem, language, normalized source
+    hash, test case fingerprint, limits).
+
+    Re-submitting the same solution (modulo comments and formatting) reuses
+    every result; after a test-suite edit only the edited or added cases
+    have new fingerprints and run again.
+    """
+
+    def __init__(self, maxsize: int = 20000, ttl: float = 86400):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @staticmethod
+    def key(
+        problem_id: Optional[Union[int, str]],
+        language: str,
+        digest: str,
+        test_case: GradingCase,
+        limits: ResourceLimits
+    ) -> Tuple:
+        return (problem_id, language, digest, test_case.fingerprint, tuple(sorted(limits.to_dict().items())))
+
+    def get(self, key: Tuple) -> Optional[ExecutionResult]:
+        data = self.cache.get(key)
+        return ExecutionResult.from_dict(data) if data is not None else None
+
+    def set(self, key: Tuple, result: ExecutionResult):
+        if result.status in CACHEABLE_STATUSES:
+            self.cache.set(key, result.to_dict())
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return self.cache.stats()
+
+grading_result_cache = GradingResultCache(
+    maxsize=settings.CODING_RESULT_CACHE_SIZE,
+    ttl=settings.CODING_RESULT_CACHE_TTL_SECONDS
+)
+
+def check_language(language: str):
+    if language not in code_runner.pools:
+        raise ValidationError(f"Unsupported language: {language}", field="language")
+
+async def run_code(
+    language: str,
+    code: str,
+    stdin: str = "",
+    limits: Optional[ResourceLimits] = None
+) -> ExecutionResult:
+    """Run a submission on the shared worker pools.
+
+    Raises CodeRunnerBusy when the language's run queue is full, and
+    CodeRunnerUnavailableError when its workers can't be started.
+    """
+    check_language(language)
+    try:
+        return await code_runner.run(language, code, stdin, limits)
+    except CodeRunnerUnavailable as e:
+        raise CodeRunnerUnavailableError(str(e))
+
+async def iter_grading(
+    language: str,
+    code: str,
+    test_cases: Sequence[GradingCase],
+    problem_id: Optional[Union[int, str]] = None,
+    limits: Optional[ResourceLimits] = None,
+    use_cache: bool = True
+) -> AsyncIterator[CaseResult]:
+    """Grade a submission, yielding each test case's result as soon as it is known.
+
+    Cached cases come first; the rest run as one batch on a single worker
+    and stream in input order. Raises CodeRunnerBusy when the queue is full,
+    and CodeRunnerUnavailableError when the workers can't be started.
+    """
+    check_language(language)
+    limits = limits or code_runner.pool(language).limits
+    digest = source_hash(language, code)
+    keys = [grading_result_cache.key(problem_id, language, digest, test_case, limits) for test_case in test_cases]
+
+    pending = []
+    for index, test_case in enumerate(test_cases):
+        cached = grading_result_cache.get(keys[index]) if use_cache else None
+        if cached is None:
+            pending.append(index)
+        else:
+            yield CaseResult(index, cached, is_passing(cached, test_case), cached=True)
+
+    if pending:
+        batch = code_runner.run_batch(language, code, [test_cases[index].input for index in pending], limits)
+        try:
+            async for position, result in batch:
+                index = pending[position]
+                grading_result_cache.set(keys[index], result)
+                yield CaseResult(index, result, is_passing(result, test_cases[index]))
+        except CodeRunnerUnavailable as e:
+            raise CodeRunnerUnavailableError(str(e))
+        finally:
+            # Hands the worker back (or replaces it) if we stop early
+            await batch.aclose()
+
+async def grade_submission(
+    language: str,
+    code: str,
+    test_cases: Sequence[GradingCase],
+    problem_id: Optional[Union[int, str]] = None,
+    limits: Optional[ResourceLimits] = None,
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """Grade every test case; results are returned in test case order"""
+    results: List[CaseResult] = [
+        case_result
+        async for case_result in iter_grading(language, code, test_cases, problem_id, limits, use_cache)
+    ]
+    results.sort(key=lambda case_result: case_result.index)
+    return {
+        "passed": sum(case_result.passed for case_result in results),
+        "total": len(results),
+        "cached": sum(case_result.cached for case_result in results),
+        "results": [case_result.to_dict() for case_result in results],
+    }
@@ -0,0 +1,375 @@
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, delete, func, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.candidate import Candidate, CandidateSkill, Skill
+from app.models.embedding import EmbeddingQueueItem, embedding_queue_upsert
+from app.models.job import Job
+from app.services.ai_service import ai_client
+from app.utils.ai_helpers import encode_embedding, hash_embedding
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE = "candidate"
+JOB = "job"
+
+# Candidate fields that feed the embedding text (besides resume_text and skills)
+CANDIDATE_EMBEDDING_FIELDS = {"current_title", "summary"}
+
+# Roughly the first 2k tokens; longer resumes rarely change the vector
+MAX_EMBEDDING_TEXT_CHARS = 8000
+
+def candidate_embedding_text(
+    current_title: Optional[str],
+    summary: Optional[str],
+    resume_text: Optional[str],
+    skill_names: Iterable[str]
+) -> str:
+    parts = [current_title, summary, ", ".join(sorted(skill_names)), resume_text]
+    return "\n".join(part.strip() for part in parts if part and part.strip())[:MAX_EMBEDDING_TEXT_CHARS]
+
+def job_embedding_text(
+    title: Optional[str],
+    description: Optional[str],
+    required_skills: Optional[Sequence[str]],
+    preferred_skills: Optional[Sequence[str]]
+) -> str:
+    parts = [title, ", ".join(required_skills or []), ", ".join(preferred_skills or []), description]
+    return "\n".join(part.strip() for part in parts if part and part.strip())[:MAX_EMBEDDING_TEXT_CHARS]
+
+def content_hash(embedder_name: str, text: str) -> str:
+    """Changes with the text or the model, so switching models re-embeds everything"""
+    return hashlib.sha256(f"{embedder_name}\x1f{text}".encode()).hexdigest()
+
+class HashingEmbedder:
+    """In-process fallback: feature-hashed bag of words (utils.ai_helpers.hash_embedding).
+
+    Needs no network or model. Much weaker than a learned embedding, but
+    texts sharing vocabulary (skills, titles) still end up close.
+    """
+
+    def __init__(self, dim: int = 384, batch_size: int = 256):
+        self.dim = dim
+        self.batch_size = batch_size
+        self.name = f"hashing-{dim}"
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        return np.stack([hash_embedding(text, self.dim) for text in texts])
+
+class ProviderEmbedder:
+    """Embeddings from the configured AI provider, through the shared ai_client"""
+
+    def __init__(self, client=ai_client, batch_size: int = 64):
+        self.client = client
+        self.batch_size = batch_size
+        self.name = f"{client.provider.name}:{client.embedding_model}"
+
+    async def embed(self, texts: List[str]) -> np.ndarray:
+        return await self.client.embed(texts)
+
+def create_embedder():
+    """EMBEDDING_BACKEND=auto uses the provider when one is configured, else the hashing fallback"""
+    backend = settings.EMBEDDING_BACKEND
+    if backend == "provider" or (backend == "auto" and ai_client.provider.name != "stub"):
+        return ProviderEmbedder(ai_client, batch_size=settings.AI_EMBEDDING_BATCH_SIZE)
+    return HashingEmbedder(dim=settings.EMBEDDING_HASHING_DIM)
+
+async def enqueue_embeddings(db: AsyncSession, entity_type: str, entity_ids: Iterable[int]):
+    """Queue entities for an embedding check; the caller commits (with the change itself)"""
+    now = datetime.utcnow()
+    rows = [
+        {"entity_type": entity_type, "entity_id": entity_id, "enqueued_at": now, "available_at": now, "attempts": 0}
+        for entity_id in set(entity_ids)
+    ]
+    if not rows:
+        return
+    await db.execute(embedding_queue_upsert(), rows)
+
+class EmbeddingPipeline:
+    """Keeps ``Candidate.embedding_vector`` and ``Job.job_embedding`` in step
+    with their text.
+
+    Work comes from ``embedding_queue``. A batch of up to the embedder's
+    batch size is claimed with ``FOR UPDATE SKIP LOCKED`` (so several
+    workers can share the queue), the entities' embedding text is rebuilt
+    and hashed, and only those whose hash differs from ``embedding_hash``
+    are sent to the embedder, in one call. Vectors, hashes and queue
+    deletions commit together; a failed batch stays queued with
+    exponential backoff.
+    """
+
+    def __init__(self, embedder, max_backoff_seconds: int = 3600):
+        self.embedder = embedder
+        self.max_backoff_seconds = max_backoff_seconds
+
+    async def enqueue_missing(self, db: AsyncSession) -> int:
+        """Queue active candidates and jobs that were never embedded (e.g. written by raw SQL)"""
+        queued = 0
+        for entity_type, model in ((CANDIDATE, Candidate), (JOB, Job)):
+            queued += await self.enqueue_where(db, entity_type, model, model.embedding_hash.is_(None))
+        await db.commit()
+        return queued
+
+    async def enqueue_all(self, db: AsyncSession) -> int:
+        """Queue every active candidate and job, e.g. after changing embedding models"""
+        queued = 0
+        for entity_type, model in ((CANDIDATE, Candidate), (JOB, Job)):
+            queued += await self.enqueue_where(db, entity_type, model)
+        await db.commit()
+        return queued
+
+    @staticmethod
+    async def enqueue_where(db: AsyncSession, entity_type: str, model, *conditions) -> int:
+        now = datetime.utcnow()
+        table = EmbeddingQueueItem.__table__
+        source = select(
+            literal(entity_type), model.id, literal(now), literal(now), literal(0)
+        ).where(model.is_active.is_(True), *conditions)
+        result = await db.execute(
+            pg_insert(table)
+            .from_select(["entity_type", "entity_id", "enqueued_at", "available_at", "attempts"], source)
+            .on_conflict_do_nothing(index_elements=["entity_type", "entity_id"])
+        )
+        return result.rowcount
+
+    @staticmethod
+    async def load_candidates(db: AsyncSession, ids: List[int]) -> Dict[int, Tuple[str, Optional[str]]]:
+        skills: Dict[int, List[str]] = {}
+        for candidate_id, name in await db.execute(
+            select(CandidateSkill.candidate_id, Skill.name)
+            .join(Skill, Skill.id == CandidateSkill.skill_id)
+            .where(CandidateSkill.candidate_id.in_(ids), CandidateSkill.is_active.is_(True))
+        ):
+            skills.setdefault(candidate_id, []).append(name)
+        rows = await db.execute(
+            select(
+                Candidate.id,
+                Candidate.current_title,
+                Candidate.summary,
+                Candidate.resume_text,
+                Candidate.embedding_hash
+            ).where(Candidate.id.in_(ids))
+        )
+        return {
+            row.id: (
+                candidate_embedding_text(row.current_title, row.summary, row.resume_text, skills.get(row.id, ())),
+                row.embedding_hash
+            )
+            for row in rows
+        }
+
+    @staticmethod
+    async def load_jobs(db: AsyncSession, ids: List[int]) -> Dict[int, Tuple[str, Optional[str]]]:
+        rows = await db.execute(
+            select(
+                Job.id,
+                Job.title,
+                Job.description,
+                Job.required_skills,
+                Job.preferred_skills,
+                Job.embedding_hash
+            ).where(Job.id.in_(ids))
+        )
+        return {
+            row.id: (
+                job_embedding_text(row.title, row.description, row.required_skills, row.preferred_skills),
+                row.embedding_hash
+            )
+            for row in rows
+        }
+
+    async def process_batch(self, db: AsyncSession) -> Dict[str, int]:
+        """Handle one claimed batch and commit; ``claimed`` is 0 when nothing is due"""
+        stats = {"claimed": 0, "embedded": 0, "unchanged": 0, "missing": 0, "failed": 0}
+        now = datetime.utcnow()
+        queue = EmbeddingQueueItem.__table__
+        claimed = (await db.execute(
+            select(queue.c.entity_type, queue.c.entity_id, queue.c.attempts)
+            .where(queue.c.available_at <= now)
+            .order_by(queue.c.available_at)
+            .limit(self.embedder.batch_size)
+            .with_for_update(skip_locked=True)
+        )).all()
+        if not claimed:
+            await db.commit()
+            return stats
+        stats["claimed"] = len(claimed)
+
+        ids: Dict[str, List[int]] = {CANDIDATE: [], JOB: []}
+        for entity_type, entity_id, _ in claimed:
+            ids.setdefault(entity_type, []).append(entity_id)
+        current = {
+            CANDIDATE: await self.load_candidates(db, ids[CANDIDATE]) if ids[CANDIDATE] else {},
+            JOB: await self.load_jobs(db, ids[JOB]) if ids[JOB] else {},
+        }
+
+        stale: List[Tuple[str, int, str, str]] = []
+        for entity_type, entity_id, _ in claimed:
+            entry = current.get(entity_type, {}).get(entity_id)
+            if entry is None:
+                stats["missing"] += 1
+                continue
+            text, stored_hash = entry
+            digest = content_hash(self.embedder.name, text)
+            if digest == stored_hash:
+                stats["unchanged"] += 1
+            else:
+                stale.append((entity_type, entity_id, text, digest))
+
+        try:
+            texts = [text for _, _, text, _ in stale if text]
+            vectors = iter(await self.embedder.embed(texts) if texts else [])
+        except Exception as e:
+            logger.error(f"Embedding batch failed: {str(e)}")
+            await self.postpone(db, claimed, str(e), now)
+            await db.commit()
+            stats["failed"] = len(claimed)
+            return stats
+
+        # Stamped after the provider call, which can take seconds, so the
+        # change isn't older than a refresh that ran meanwhile
+        embedded_at = datetime.utcnow()
+        values: Dict[str, List[dict]] = {CANDIDATE: [], JOB: []}
+        for entity_type, entity_id, text, digest in stale:
+            # Nothing to embed: the vector is cleared, not left describing old text
+            vector = encode_embedding(next(vectors)) if text else None
+            values[entity_type].append({"entity_id": entity_id, "vector": vector, "digest": digest})
+        # updated_at moves too, so the embedding index and recommendations pick the change up
+        if values[CANDIDATE]:
+            table = Candidate.__table__
+            await db.execute(
+                update(table).where(table.c.id == bindparam("entity_id")).values(
+                    embedding_vector=bindparam("vector"),
+                    embedding_hash=bindparam("digest"),
+                    last_embedding_update=embedded_at,
+                    updated_at=embedded_at
+                ),
+                values[CANDIDATE]
+            )
+        if values[JOB]:
+            table = Job.__table__
+            await db.execute(
+                update(table).where(table.c.id == bindparam("entity_id")).values(
+                    job_embedding=bindparam("vector"),
+                    embedding_hash=bindparam("digest"),
+                    updated_at=embedded_at
+                ),
+                values[JOB]
+            )
+        stats["embedded"] = len(stale)
+
+        await db.execute(delete(queue).where(
+            tuple_(queue.c.entity_type, queue.c.entity_id).in_([(row.entity_type, row.entity_id) for row in claimed])
+        ))
+        await db.commit()
+        return stats
+
+    async def postpone(self, db: AsyncSession, claimed: Sequence, error: str, now: datetime):
+        queue = EmbeddingQueueItem.__table__
+        await db.execute(
+            update(queue)
+            .where(queue.c.entity_type == bindparam("type"), queue.c.entity_id == bindparam("id"))
+            .values(attempts=bindparam("next_attempts"), available_at=bindparam("retry_at"), last_error=error[:500]),
+            [
+                {
+                    "type": row.entity_type,
+                    "id": row.entity_id,
+                    "next_attempts": row.attempts + 1,
+                    "retry_at": now + timedelta(seconds=min(self.max_backoff_seconds, 5 * 2 ** row.attempts))
+                }
+                for row in claimed
+            ]
+        )
+
+    async def drain(self, db: AsyncSession, max_batches: Optional[int] = None) -> Dict[str, int]:
+        """Process batches until nothing is due (or a batch fails)"""
+        totals = {"batches": 0, "claimed": 0, "embedded": 0, "unchanged": 0, "missing": 0, "failed": 0}
+        while max_batches is None or totals["batches"] < max_batches:
+            stats = await self.process_batch(db)
+            if not stats["claimed"]:
+                break
+            totals["batches"] += 1
+            for key, value in stats.items():
+                totals[key] += value
+            if stats["failed"]:
+                break
+        return totals
+
+    @staticmethod
+    async def queue_stats(db: AsyncSession) -> Dict[str, float]:
+        queue = EmbeddingQueueItem.__table__
+        now = datetime.utcnow()
+        depth, due, retrying, oldest = (await db.execute(
+            select(
+                func.count(),
+                func.count().filter(queue.c.available_at <= now),
+                func.count().filter(queue.c.attempts > 0),
+                func.min(queue.c.enqueued_at)
+            ).select_from(queue)
+        )).one()
+        return {
+            "depth": depth,
+            "due": due,
+            "retrying": retrying,
+            "oldest_age_seconds": round((now - oldest).total_seconds(), 1) if oldest else 0.0,
+        }
+
+class EmbeddingWorker:
+    """Drains the embedding queue every ``interval`` seconds in the background,
+    queueing never-embedded rows every ``sweep_interval`` seconds
+    """
+
+    def __init__(self, pipeline: EmbeddingPipeline, interval: int = 5, sweep_interval: int = 600):
+        self.pipeline = pipeline
+        self.interval = interval
+        self.sweep_interval = sweep_interval
+        self.swept_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def run(self):
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    if self.swept_at is None or time.monotonic() - self.swept_at >= self.sweep_interval:
+                        queued = await self.pipeline.enqueue_missing(db)
+                        self.swept_at = time.monotonic()
+                        if queued:
+                            logger.info(f"Queued {queued} never-embedded rows")
+                    stats = await self.pipeline.drain(db)
+                if stats["embedded"] or stats["failed"]:
+                    logger.info(f"Embedding pipeline: {stats}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Embedding pipeline failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+embedding_pipeline = EmbeddingPipeline(create_embedder())
+embedding_worker = EmbeddingWorker(
+    embedding_pipeline,
+    interval=settings.EMBEDDING_POLL_SECONDS,
+    sweep_interval=settings.EMBEDDING_SWEEP_SECONDS
+)
@@ -0,0 +1,424 @@
+import asyncio
+import heapq
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import ConflictError, NotFoundError, ValidationError
+from app.models.company import CompanyUser
+from app.models.interview import Interview, InterviewInterviewer, InterviewResponse
+from app.schemas.interview import MAX_DURATION_MINUTES, InterviewCreate, InterviewReschedule
+from app.services.ai_service import Completion, ai_client, evaluation_request, follow_up_request, parse_evaluation
+from app.utils.interval_tree import IntervalTree
+
+# Streaming generators persist in a session of their own: by the time a
+# streaming response body runs, the request's session has been closed.
+
+async def get_interview(db: AsyncSession, interview_id: int) -> Interview:
+    interview = await db.scalar(select(Interview).where(Interview.id == interview_id, Interview.is_active.is_(True)))
+    if interview is None:
+        raise NotFoundError("Interview", interview_id)
+    return interview
+
+async def get_interview_response(db: AsyncSession, interview_id: int, response_id: int) -> InterviewResponse:
+    response = await db.scalar(
+        select(InterviewResponse)
+        .where(InterviewResponse.id == response_id, InterviewResponse.interview_id == interview_id)
+    )
+    if response is None:
+        raise NotFoundError("Interview response", response_id)
+    return response
+
+async def relay(chunks: AsyncIterator[Union[str, Completion]]) -> AsyncIterator[Union[str, Completion]]:
+    """Pass text chunks through and yield the final Completion last"""
+    completion = None
+    async for chunk in chunks:
+        if isinstance(chunk, Completion):
+            completion = chunk
+        else:
+            yield chunk
+    yield completion
+
+async def stream_answer_evaluation(
+    interview: Interview,
+    question: str,
+    answer: str,
+    rubric: Optional[str] = None,
+    session_factory: Optional[async_sessionmaker] = None
+) -> AsyncIterator[Union[str, InterviewResponse]]:
+    """Evaluation text as it is generated, then the saved InterviewResponse.
+
+    The response row is written once, after the last chunk; a stream that
+    fails or is abandoned writes nothing.
+    """
+    interview_id = interview.id
+    async for chunk in relay(ai_client.stream(**evaluation_request(question, answer, rubric, interview.company_id))):
+        if isinstance(chunk, str):
+            yield chunk
+            continue
+        score, feedback = parse_evaluation(chunk.text)
+        response = InterviewResponse(
+            interview_id=interview_id,
+            question=question,
+            answer=answer,
+            rubric=rubric,
+            score=score,
+            feedback=feedback,
+            model=chunk.model,
+            prompt_tokens=chunk.prompt_tokens,
+            completion_tokens=chunk.completion_tokens,
+            evaluated_at=datetime.utcnow()
+        )
+        async with (session_factory or AsyncSessionLocal)() as db:
+            db.add(response)
+            await db.commit()
+        yield response
+
+async def stream_follow_up_question(
+    interview: Interview,
+    response: InterviewResponse,
+    session_factory: Optional[async_sessionmaker] = None
+) -> AsyncIterator[Union[str, InterviewResponse]]:
+    """Follow-up question text as it is generated, then the updated InterviewResponse"""
+    request = follow_up_request(response.question, response.answer, interview.company_id)
+    async for chunk in relay(ai_client.stream(**request)):
+        if isinstance(chunk, str):
+            yield chunk
+            continue
+        async with (session_factory or AsyncSessionLocal)() as db:
+            updated = await db.scalar(
+                update(InterviewResponse)
+                .where(InterviewResponse.id == response.id)
+                .values(follow_up_question=chunk.text.strip(), updated_at=datetime.utcnow())
+                .returning(InterviewResponse)
+            )
+            await db.commit()
+        if updated is None:
+            raise NotFoundError("Interview response", response.id)
+        yield updated
+
+# Scheduling. Each worker keeps, per company, one interval tree of booked
+# interviews per interviewer (times as epoch seconds), loaded on first use
+# and then kept current from interviews.updated_at. Availability queries and
+# the first double-booking check run against the trees; a booking then
+# locks its interviewers in the database and re-checks there, which covers
+# bookings other workers made since the last sync.
+
+EPOCH = datetime(1970, 1, 1)
+SCHEDULE_LOCK_NAMESPACE = 7401  # pg_advisory_xact_lock(namespace, interviewer id)
+# A row's updated_at is set before its transaction commits, so it can become
+# visible after a sync that started later: re-read this much history each time
+SYNC_OVERLAP = timedelta(seconds=30)
+
+def naive_utc(value: datetime) -> datetime:
+    """Timestamps are stored as naive UTC"""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+def to_seconds(value: datetime) -> int:
+    return int((naive_utc(value) - EPOCH).total_seconds())
+
+def from_seconds(value: int) -> datetime:
+    return EPOCH + timedelta(seconds=value)
+
+class CompanySchedule:
+    """A company's booked interviews, one IntervalTree per interviewer"""
+
+    def __init__(self, company_id: int):
+        self.company_id = company_id
+        self.trees: Dict[int, IntervalTree] = {}
+        self.bookings: Dict[int, Tuple[int, int, Tuple[int, ...]]] = {}  # interview_id -> (start, end, interviewers)
+        self.synced_at: Optional[datetime] = None
+        self.lock = asyncio.Lock()
+
+    def book(self, interview_id: int, start: int, end: int, interviewer_ids: Iterable[int]):
+        """Add or move an interview's booking"""
+        self.remove(interview_id)
+        interviewers = tuple(sorted(set(interviewer_ids)))
+        for user_id in interviewers:
+            tree = self.trees.get(user_id)
+            if tree is None:
+                tree = self.trees[user_id] = IntervalTree()
+            tree.add(start, end, interview_id)
+        if interviewers:
+            self.bookings[interview_id] = (start, end, interviewers)
+
+    def remove(self, interview_id: int):
+        booking = self.bookings.pop(interview_id, None)
+        if booking is not None:
+            start, end, interviewers = booking
+            for user_id in interviewers:
+                self.trees[user_id].remove(start, end, interview_id)
+
+    def conflicts(
+        self,
+        interviewer_ids: Iterable[int],
+        start: int,
+        end: int,
+        exclude: Optional[int] = None
+    ) -> Dict[int, List[int]]:
+        """Interviews overlapping ``[start, end)``, per busy interviewer"""
+        found = {}
+        for user_id in interviewer_ids:
+            tree = self.trees.get(user_id)
+            # overlaps() is the O(log n) answer for the usual free case
+            if tree is None or not tree.overlaps(start, end):
+                continue
+            clashes = [key for _, _, key in tree.overlapping(start, end) if key != exclude]
+            if clashes:
+                found[user_id] = clashes
+        return found
+
+    def free_windows(
+        self,
+        interviewer_ids: Iterable[int],
+        start: int,
+        end: int,
+        min_length: int
+    ) -> List[Tuple[int, int]]:
+        """Gaps of at least ``min_length`` in ``[start, end)`` when every interviewer is free.
+
+        The busy intervals of all interviewers are merged in start order, so
+        the gaps between them are the intersection of their free time.
+        """
+        busy = heapq.merge(*(
+            self.trees[user_id].overlapping(start, end) for user_id in set(interviewer_ids) if user_id in self.trees
+        ))
+        windows = []
+        cursor = start
+        for busy_start, busy_end, _ in busy:
+            if busy_start - cursor >= min_length:
+                windows.append((cursor, busy_start))
+            cursor = max(cursor, busy_end)
+        if end - cursor >= min_length:
+            windows.append((cursor, end))
+        return windows
+
+def slot_starts(windows: Sequence[Tuple[int, int]], length: int, step: int, limit: int) -> List[int]:
+    """Start times on a ``step`` grid (from midnight UTC) where ``length`` fits in a window"""
+    slots = []
+    for window_start, window_end in windows:
+        for slot in range(-(-window_start // step) * step, window_end - length + 1, step):
+            slots.append(slot)
+            if len(slots) == limit:
+                return slots
+    return slots
+
+class SchedulingIndex:
+    def __init__(self, lookback_days: int = 7):
+        self.lookback = timedelta(days=lookback_days)
+        self.schedules: Dict[int, CompanySchedule] = {}
+
+    async def get(self, db: AsyncSession, company_id: int) -> CompanySchedule:
+        """The company's schedule, brought up to date with the database"""
+        schedule = self.schedules.get(company_id)
+        if schedule is None:
+            schedule = self.schedules[company_id] = CompanySchedule(company_id)
+        async with schedule.lock:
+            await self.sync(db, schedule)
+        return schedule
+
+    async def sync(self, db: AsyncSession, schedule: CompanySchedule):
+        """Load the company's bookings (first call) or the interviews changed since the last sync"""
+        started = datetime.utcnow()
+        query = (
+            select(
+                Interview.id,
+                Interview.status,
+                InterviewInterviewer.user_id,
+                InterviewInterviewer.starts_at,
+                InterviewInterviewer.ends_at,
+                InterviewInterviewer.active
+            )
+            .outerjoin(InterviewInterviewer, InterviewInterviewer.interview_id == Interview.id)
+            .where(Interview.company_id == schedule.company_id)
+        )
+        if schedule.synced_at is None:
+            # Bookings that ended before the lookback don't affect scheduling
+            query = query.where(
+                Interview.status != "cancelled",
+                InterviewInterviewer.active.is_(True),
+                InterviewInterviewer.ends_at > started - self.lookback
+            )
+        else:
+            query = query.where(Interview.updated_at >= schedule.synced_at - SYNC_OVERLAP)
+
+        bookings: Dict[int, Tuple[Optional[datetime], Optional[datetime], List[int]]] = {}
+        for row in (await db.execute(query)).all():
+            starts_at, ends_at, interviewers = bookings.setdefault(row.id, (None, None, []))
+            if row.user_id is not None and row.active and row.status != "cancelled":
+                interviewers.append(row.user_id)
+                bookings[row.id] = (row.starts_at, row.ends_at, interviewers)
+        for interview_id, (starts_at, ends_at, interviewers) in bookings.items():
+            if interviewers:
+                schedule.book(interview_id, to_seconds(starts_at), to_seconds(ends_at), interviewers)
+            else:
+                schedule.remove(interview_id)
+        schedule.synced_at = started
+
+scheduling_index = SchedulingIndex(lookback_days=settings.SCHEDULING_LOOKBACK_DAYS)
+
+def describe_conflicts(conflicts: Dict[int, List[int]]) -> str:
+    return "; ".join(
+        f"interviewer {user_id}: interview {', '.join(map(str, sorted(set(ids))))}"
+        for user_id, ids in sorted(conflicts.items())
+    )
+
+async def check_interviewers(db: AsyncSession, company_id: int, interviewer_ids: Sequence[int]):
+    members = set(await db.scalars(
+        select(CompanyUser.user_id).where(
+            CompanyUser.company_id == company_id,
+            CompanyUser.user_id.in_(interviewer_ids),
+            CompanyUser.is_active.is_(True)
+        )
+    ))
+    unknown = sorted(set(interviewer_ids) - members)
+    if unknown:
+        raise ValidationError(
+            f"Not members of company {company_id}: {', '.join(map(str, unknown))}", field="interviewer_ids"
+        )
+
+async def reserve(
+    db: AsyncSession,
+    schedule: CompanySchedule,
+    interview_id: Optional[int],
+    interviewer_ids: Sequence[int],
+    starts_at: datetime,
+    ends_at: datetime
+):
+    """Raise ConflictError if an interviewer is busy during the slot; otherwise
+    hold the interviewers' schedules until the transaction ends"""
+    conflicts = schedule.conflicts(interviewer_ids, to_seconds(starts_at), to_seconds(ends_at), exclude=interview_id)
+    if not conflicts and interviewer_ids:
+        # Other workers' bookings may not be in this index yet: serialize on
+        # the interviewers (in a fixed order, so bookings can't deadlock)
+        # and check the database itself
+        for user_id in sorted(set(interviewer_ids)):
+            await db.execute(select(func.pg_advisory_xact_lock(SCHEDULE_LOCK_NAMESPACE, user_id)))
+        clashes = (
+            select(InterviewInterviewer.user_id, InterviewInterviewer.interview_id)
+            .where(
+                InterviewInterviewer.user_id.in_(interviewer_ids),
+                InterviewInterviewer.active.is_(True),
+                InterviewInterviewer.starts_at < ends_at,
+                InterviewInterviewer.starts_at > starts_at - timedelta(minutes=MAX_DURATION_MINUTES),
+                InterviewInterviewer.ends_at > starts_at
+            )
+        )
+        if interview_id is not None:
+            clashes = clashes.where(InterviewInterviewer.interview_id != interview_id)
+        for row in (await db.execute(clashes)).all():
+            conflicts.setdefault(row.user_id, []).append(row.interview_id)
+    if conflicts:
+        await db.rollback()
+        raise ConflictError(f"Interviewers already booked: {describe_conflicts(conflicts)}", conflicts)
+
+def assign_interviewers(interview: Interview, interviewer_ids: Sequence[int], starts_at: datetime, ends_at: datetime):
+    # Rows are updated in place: replacing them would insert and delete the
+    # same primary key in one flush
+    wanted = set(interviewer_ids)
+    rows = {row.user_id: row for row in interview.interviewers}
+    for user_id, row in rows.items():
+        if user_id not in wanted:
+            interview.interviewers.remove(row)
+    for user_id in sorted(wanted):
+        row = rows.get(user_id)
+        if row is None:
+            interview.interviewers.append(
+                InterviewInterviewer(user_id=user_id, starts_at=starts_at, ends_at=ends_at, active=True)
+            )
+        else:
+            row.starts_at, row.ends_at, row.active = starts_at, ends_at, True
+
+async def get_interview_with_interviewers(db: AsyncSession, interview_id: int) -> Interview:
+    interview = await db.scalar(
+        select(Interview)
+        .options(selectinload(Interview.interviewers))
+        .where(Interview.id == interview_id, Interview.is_active.is_(True))
+    )
+    if interview is None:
+        raise NotFoundError("Interview", interview_id)
+    return interview
+
+async def schedule_interview(db: AsyncSession, interview_data: InterviewCreate) -> Interview:
+    """Book an interview; raises ConflictError if an interviewer is already booked"""
+    interviewer_ids = sorted(set(interview_data.interviewer_ids))
+    await check_interviewers(db, interview_data.company_id, interviewer_ids)
+    starts_at = naive_utc(interview_data.scheduled_at)
+    ends_at = starts_at + timedelta(minutes=interview_data.duration_minutes)
+    schedule = await scheduling_index.get(db, interview_data.company_id)
+    await reserve(db, schedule, None, interviewer_ids, starts_at, ends_at)
+
+    interview = Interview(**{**interview_data.dict(exclude={"interviewer_ids"}), "scheduled_at": starts_at})
+    interview.interviewers = []
+    assign_interviewers(interview, interviewer_ids, starts_at, ends_at)
+    db.add(interview)
+    await db.commit()
+    schedule.book(interview.id, to_seconds(starts_at), to_seconds(ends_at), interviewer_ids)
+    return interview
+
+async def reschedule_interview(db: AsyncSession, interview_id: int, changes: InterviewReschedule) -> Interview:
+    """Move an interview and/or change its interviewers"""
+    interview = await get_interview_with_interviewers(db, interview_id)
+    if interview.status != "scheduled":
+        raise ValidationError(f"Interview is {interview.status}", field="status")
+    interviewer_ids = sorted(set(
+        changes.interviewer_ids if changes.interviewer_ids is not None else interview.interviewer_ids
+    ))
+    if changes.interviewer_ids is not None:
+        await check_interviewers(db, interview.company_id, interviewer_ids)
+    duration_minutes = changes.duration_minutes or interview.duration_minutes
+    starts_at = naive_utc(changes.scheduled_at)
+    ends_at = starts_at + timedelta(minutes=duration_minutes)
+    schedule = await scheduling_index.get(db, interview.company_id)
+    await reserve(db, schedule, interview.id, interviewer_ids, starts_at, ends_at)
+
+    interview.scheduled_at = starts_at
+    interview.duration_minutes = duration_minutes
+    # Also bumped when only interviewers change, so other workers' indexes sync it
+    interview.updated_at = datetime.utcnow()
+    assign_interviewers(interview, interviewer_ids, starts_at, ends_at)
+    await db.commit()
+    schedule.book(interview.id, to_seconds(starts_at), to_seconds(ends_at), interviewer_ids)
+    return interview
+
+async def cancel_interview(db: AsyncSession, interview_id: int) -> Interview:
+    interview = await get_interview_with_interviewers(db, interview_id)
+    if interview.status == "cancelled":
+        return interview
+    if interview.status == "completed":
+        raise ValidationError("Interview is completed", field="status")
+    interview.status = "cancelled"
+    interview.updated_at = datetime.utcnow()
+    for row in interview.interviewers:
+        row.active = False
+    await db.commit()
+    schedule = scheduling_index.schedules.get(interview.company_id)
+    if schedule is not None:
+        schedule.remove(interview.id)
+    return interview
+
+async def find_free_slots(
+    db: AsyncSession,
+    company_id: int,
+    interviewer_ids: Sequence[int],
+    window_start: datetime,
+    window_end: datetime,
+    duration_minutes: int = 60,
+    step_minutes: int = 30,
+    limit: int = 20
+) -> Dict[str, Any]:
+    """Times in the window when all of ``interviewer_ids`` are free for ``duration_minutes``"""
+    start, end = to_seconds(window_start), to_seconds(window_end)
+    if end <= start:
+        raise ValidationError("The window must end after it starts", field="end")
+    schedule = await scheduling_index.get(db, company_id)
+    windows = schedule.free_windows(interviewer_ids, start, end, duration_minutes * 60)
+    return {
+        "windows": [{"start": from_seconds(free_start), "end": from_seconds(free_end)} for free_start, free_end in windows],
+        "slots": [from_seconds(slot) for slot in slot_starts(windows, duration_minutes * 60, step_minutes * 60, limit)],
+    }
@@ -0,0 +1,497 @@
+"""Live interview sessions over WebSockets.
+
+Clients send numbered events (answer drafts as they are typed, submitted
+answers, navigation); the engine applies them to in-memory state and acks
+each one right away. Every ``flush_interval`` seconds the sessions that
+changed are written out together: a snapshot per session to the session
+store and, in one transaction, their interview_sessions rows, submitted
+answers and interview status changes. A hundred keystrokes between two
+flushes cost one row write.
+
+Resume: events carry consecutive ``seq`` numbers. On (re)connect the server
+sends its state and the last seq it holds, and the client replays whatever
+it sent after that; events at or below that seq are acked and ignored, so
+replays are harmless. After each flush the server sends ``saved`` with the
+durable seq, and clients keep events until they are saved, which also
+covers a worker dying between flushes.
+
+With the Redis store a reconnect routed to another worker resumes from the
+last flush. A session should be driven from one worker at a time (sticky
+routing); snapshots are only ever replaced by ones with a higher seq, so a
+stale worker cannot overwrite newer state.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.cache import TTLCache, get_redis
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import ValidationError
+from app.models.interview import Interview, InterviewResponse, InterviewSession
+
+logger = logging.getLogger(__name__)
+
+# Close code for a connection replaced by a newer one for the same interview
+SUPERSEDED_CLOSE_CODE = 4000
+
+CLOSED_STATUSES = ("completed", "cancelled")
+
+class SessionState:
+    """Everything a client needs to pick an interview back up"""
+
+    def __init__(
+        self,
+        interview_id: int,
+        seq: int = 0,
+        status: str = "in_progress",
+        question_index: int = 0,
+        drafts: Optional[Dict[str, str]] = None,
+        answered: Optional[List[str]] = None,
+        started_at: Optional[str] = None,
+        completed_at: Optional[str] = None
+    ):
+        self.interview_id = interview_id
+        self.seq = seq
+        self.status = status
+        self.question_index = question_index
+        self.drafts = drafts or {}  # question_id -> answer being typed
+        self.answered = answered or []  # question_ids, in submission order
+        self.started_at = started_at
+        self.completed_at = completed_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "interview_id": self.interview_id,
+            "seq": self.seq,
+            "status": self.status,
+            "question_index": self.question_index,
+            "drafts": dict(self.drafts),
+            "answered": list(self.answered),
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SessionState":
+        return cls(**data)
+
+    def apply(self, event: Dict[str, Any], max_draft_chars: int, max_drafts: int) -> Optional[Dict[str, str]]:
+        """Apply one client event; returns the submitted answer to persist, if any.
+
+        Raises ValidationError, without changing anything, for an invalid event.
+        """
+        kind = event.get("type")
+        if self.status in CLOSED_STATUSES:
+            raise ValidationError(f"Interview session is {self.status}", field="type")
+        if kind == "draft":
+            question_id, text = question_key(event), answer_text(event, max_draft_chars)
+            if question_id not in self.drafts and len(self.drafts) >= max_drafts:
+                raise ValidationError(f"At most {max_drafts} unsubmitted drafts", field="question_id")
+            self.drafts[question_id] = text
+        elif kind == "answer":
+            question_id, text = question_key(event), answer_text(event, max_draft_chars)
+            question = event.get("question")
+            if not isinstance(question, str) or not question.strip():
+                raise ValidationError("question is required", field="question")
+            self.drafts.pop(question_id, None)
+            if question_id not in self.answered:
+                self.answered.append(question_id)
+            return {"question": question, "answer": text}
+        elif kind == "navigate":
+            index = event.get("question_index")
+            if type(index) is not int or index < 0:
+                raise ValidationError("question_index must be a non-negative integer", field="question_index")
+            self.question_index = index
+        elif kind == "complete":
+            self.status = "completed"
+            self.completed_at = datetime.utcnow().isoformat()
+        else:
+            raise ValidationError(f"Unknown event type: {kind}", field="type")
+        return None
+
+def question_key(event: Dict[str, Any]) -> str:
+    question_id = event.get("question_id")
+    if not isinstance(question_id, (str, int)) or isinstance(question_id, bool) or question_id == "":
+        raise ValidationError("question_id is required", field="question_id")
+    return str(question_id)
+
+def answer_text(event: Dict[str, Any], max_chars: int) -> str:
+    text = event.get("text")
+    if not isinstance(text, str):
+        raise ValidationError("text is required", field="text")
+    if len(text) > max_chars:
+        raise ValidationError(f"text is longer than {max_chars} characters", field="text")
+    return text
+
+class LiveSession:
+    """A session's state on this worker and the connection currently driving it"""
+
+    def __init__(self, state: SessionState):
+        self.state = state
+        self.websocket: Any = None
+        self.answers: List[Dict[str, Any]] = []  # Submitted since the last flush
+        self.status_changed = False
+        self.saved_seq = state.seq
+        self.send_lock = asyncio.Lock()
+
+    async def send(self, websocket: Any, message: Dict[str, Any]):
+        # Replies and flush notices come from different tasks
+        async with self.send_lock:
+            try:
+                await websocket.send_json(message)
+            except Exception:
+                pass  # Gone; its receive loop sees the disconnect
+
+class SessionStore:
+    """Snapshots of session state, for resuming a session that is not live on this worker"""
+
+    async def load(self, interview_id: int) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def save_many(self, snapshots: Dict[int, Dict[str, Any]]):
+        """Store snapshots, skipping any that are older (lower seq) than the stored one"""
+        raise NotImplementedError
+
+class MemorySessionStore(SessionStore):
+    """Per-process store; other workers resume from the database"""
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 86400):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def load(self, interview_id: int) -> Optional[Dict[str, Any]]:
+        return self.cache.get(interview_id)
+
+    async def save_many(self, snapshots: Dict[int, Dict[str, Any]]):
+        for interview_id, snapshot in snapshots.items():
+            current = self.cache.get(interview_id)
+            if current is None or current["seq"] <= snapshot["seq"]:
+                self.cache.set(interview_id, snapshot)
+
+# KEYS: one per snapshot; ARGV: ttl, then (json, seq) per key
+SAVE_IF_NEWER_SCRIPT = """
+local saved = 0
+for i, key in ipairs(KEYS) do
+    local current = redis.call('GET', key)
+    if not current or cjson.decode(current)['seq'] <= tonumber(ARGV[i * 2 + 1]) then
+        redis.call('SET', key, ARGV[i * 2], 'EX', ARGV[1])
+        saved = saved + 1
+    end
+end
+return saved
+"""
+
+class RedisSessionStore(SessionStore):
+    """Shared across workers; a flush writes all its snapshots in one round trip"""
+    key_prefix = "interview_session:"
+
+    def __init__(self, redis, ttl: int = 86400):
+        self.redis = redis
+        self.ttl = ttl
+        self.save_if_newer = redis.register_script(SAVE_IF_NEWER_SCRIPT)
+
+    async def load(self, interview_id: int) -> Optional[Dict[str, Any]]:
+        raw = await self.redis.get(f"{self.key_prefix}{interview_id}")
+        return json.loads(raw) if raw is not None else None
+
+    async def save_many(self, snapshots: Dict[int, Dict[str, Any]]):
+        if not snapshots:
+            return
+        args: List[Any] = [self.ttl]
+        for snapshot in snapshots.values():
+            args.extend([json.dumps(snapshot), snapshot["seq"]])
+        await self.save_if_newer(keys=[f"{self.key_prefix}{interview_id}" for interview_id in snapshots], args=args)
+
+def create_session_store() -> SessionStore:
+    """Redis when configured (and allowed by INTERVIEW_SESSION_STORE), else in-process"""
+    backend = (settings.INTERVIEW_SESSION_STORE or "auto").lower()
+    redis = get_redis() if backend in ("auto", "redis") else None
+    if redis is not None:
+        return RedisSessionStore(redis, ttl=settings.INTERVIEW_SESSION_TTL_SECONDS)
+    if backend == "redis":
+        logger.warning("INTERVIEW_SESSION_STORE=redis but Redis is not available, keeping sessions in memory")
+    return MemorySessionStore(ttl=settings.INTERVIEW_SESSION_TTL_SECONDS)
+
+class InterviewSessionManager:
+    """Live sessions of this worker, flushed in batches every ``flush_interval`` seconds"""
+
+    def __init__(
+        self,
+        store: SessionStore,
+        flush_interval: float = 0.5,
+        max_draft_chars: int = 20000,
+        max_drafts: int = 100,
+        session_factory: Optional[async_sessionmaker] = None
+    ):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.max_draft_chars = max_draft_chars
+        self.max_drafts = max_drafts
+        self.session_factory = session_factory or AsyncSessionLocal
+        self.sessions: Dict[int, LiveSession] = {}
+        self.dirty: Set[int] = set()
+        self.wake = asyncio.Event()  # Flush now instead of at the next tick
+        self.flush_lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+        self.counters = {
+            "events": 0,
+            "duplicates": 0,
+            "rejected": 0,
+            "superseded": 0,
+            "flushes": 0,
+            "flushed_sessions": 0,
+            "flushed_answers": 0,
+            "flush_failures": 0,
+        }
+
+    async def load(self, interview_id: int) -> Optional[Dict[str, Any]]:
+        """The newer of the store's snapshot and the interview_sessions row.
+
+        The row is always read: a flush whose store write failed leaves the
+        store behind it, and resuming from there would reuse saved seqs.
+        """
+        try:
+            snapshot = await self.store.load(interview_id)
+        except Exception as e:
+            logger.warning(f"Interview session store read failed: {str(e)}")
+            snapshot = None
+        async with self.session_factory() as db:
+            stored = await db.scalar(
+                select(InterviewSession.state).where(InterviewSession.interview_id == interview_id)
+            )
+        if stored is not None and (snapshot is None or stored["seq"] > snapshot["seq"]):
+            snapshot = stored
+        return snapshot
+
+    async def open(self, interview: Interview) -> LiveSession:
+        live = self.sessions.get(interview.id)
+        if live is not None:
+            return live
+        snapshot = await self.load(interview.id)
+        live = self.sessions.get(interview.id)
+        if live is not None:
+            return live  # Opened by another connection while we were loading
+        state = SessionState.from_dict(snapshot) if snapshot else SessionState(interview.id)
+        live = self.sessions[interview.id] = LiveSession(state)
+        if interview.status == "scheduled" and not state.started_at:
+            state.started_at = datetime.utcnow().isoformat()
+            live.status_changed = True
+            self.dirty.add(interview.id)
+        return live
+
+    async def connect(self, interview: Interview, websocket: Any) -> LiveSession:
+        """Attach a connection to an interview's session, replacing any other one"""
+        if interview.status in CLOSED_STATUSES:
+            raise ValidationError(f"Interview is {interview.status}", field="interview_id")
+        live = await self.open(interview)
+        previous, live.websocket = live.websocket, websocket
+        if previous is not None and previous is not websocket:
+            self.counters["superseded"] += 1
+            await live.send(previous, {"type": "superseded"})
+            try:
+                await previous.close(code=SUPERSEDED_CLOSE_CODE)
+            except Exception:
+                pass
+        return live
+
+    def disconnect(self, live: LiveSession, websocket: Any):
+        # The session stays live until its changes are flushed
+        if live.websocket is websocket:
+            live.websocket = None
+
+    def resume_message(self, live: LiveSession) -> Dict[str, Any]:
+        return {"type": "state", "seq": live.state.seq, "saved_seq": live.saved_seq, "state": live.state.to_dict()}
+
+    def handle(self, live: LiveSession, event: Any) -> Dict[str, Any]:
+        """Apply a client event and return the reply"""
+        if not isinstance(event, dict):
+            return {"type": "error", "message": "Events must be JSON objects"}
+        if event.get("type") == "ping":
+            return {"type": "pong"}
+        seq = event.get("seq")
+        if type(seq) is not int:
+            return {"type": "error", "message": "seq is required"}
+        state = live.state
+        if seq <= state.seq:
+            # Replayed after a reconnect; already applied
+            self.counters["duplicates"] += 1
+            return {"type": "ack", "seq": seq}
+        if seq != state.seq + 1:
+            return {"type": "resync", "seq": state.seq}
+
+        was_open = state.status not in CLOSED_STATUSES
+        try:
+            answer = state.apply(event, self.max_draft_chars, self.max_drafts)
+        except ValidationError as e:
+            # Consumed all the same, so the client's later events still line up
+            answer = None
+            reply = {"type": "error", "seq": seq, "message": e.message}
+            self.counters["rejected"] += 1
+        else:
+            reply = {"type": "ack", "seq": seq}
+            self.counters["events"] += 1
+        state.seq = seq
+        self.dirty.add(state.interview_id)
+        if answer is not None:
+            live.answers.append({**answer, "interview_id": state.interview_id, "session_seq": seq})
+        if was_open and state.status in CLOSED_STATUSES:
+            live.status_changed = True
+            self.wake.set()  # Persist the end of an interview right away
+        return reply
+
+    async def write(
+        self,
+        snapshots: Dict[int, Dict[str, Any]],
+        answers: List[Dict[str, Any]],
+        status_changes: List[SessionState]
+    ):
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            statement = pg_insert(InterviewSession)
+            await db.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[InterviewSession.interview_id],
+                    set_={
+                        "seq": statement.excluded.seq,
+                        "state": statement.excluded.state,
+                        "updated_at": statement.excluded.updated_at,
+                    },
+                    where=InterviewSession.seq <= statement.excluded.seq
+                ),
+                [
+                    {"interview_id": interview_id, "seq": snapshot["seq"], "state": snapshot, "updated_at": now}
+                    for interview_id, snapshot in snapshots.items()
+                ]
+            )
+            if answers:
+                # A flush retried after a commit that did land skips the answers it already saved
+                await db.execute(
+                    pg_insert(InterviewResponse.__table__).on_conflict_do_nothing(
+                        index_elements=["interview_id", "session_seq"]
+                    ),
+                    [{**answer, "created_at": now, "updated_at": now, "is_active": True} for answer in answers]
+                )
+            if status_changes:
+                table = Interview.__table__
+                await db.execute(
+                    update(table).where(table.c.id == bindparam("interview_id")).values(
+                        status=bindparam("new_status"),
+                        started_at=func.coalesce(table.c.started_at, bindparam("new_started_at")),
+                        completed_at=bindparam("new_completed_at"),
+                        updated_at=now
+                    ),
+                    [
+                        {
+                            "interview_id": state.interview_id,
+                            "new_status": state.status,
+                            "new_started_at": parse_timestamp(state.started_at),
+                            "new_completed_at": parse_timestamp(state.completed_at),
+                        }
+                        for state in status_changes
+                    ]
+                )
+            await db.commit()
+
+    async def flush(self) -> int:
+        """Write every session changed since the last flush; returns how many were written"""
+        async with self.flush_lock:
+            batch = [self.sessions[interview_id] for interview_id in self.dirty if interview_id in self.sessions]
+            self.dirty = set()
+            if not batch:
+                self.evict()
+                return 0
+            snapshots = {live.state.interview_id: live.state.to_dict() for live in batch}
+            taken = {live.state.interview_id: (live.answers, live.status_changed) for live in batch}
+            for live in batch:
+                live.answers, live.status_changed = [], False
+            try:
+                await self.write(
+                    snapshots,
+                    [answer for answers, _ in taken.values() for answer in answers],
+                    [live.state for live in batch if taken[live.state.interview_id][1]]
+                )
+            except Exception as e:
+                logger.error(f"Interview session flush failed: {str(e)}")
+                self.counters["flush_failures"] += 1
+                for live in batch:
+                    answers, status_changed = taken[live.state.interview_id]
+                    live.answers = answers + live.answers
+                    live.status_changed = live.status_changed or status_changed
+                    self.dirty.add(live.state.interview_id)
+                return 0
+            try:
+                await self.store.save_many(snapshots)
+            except Exception as e:
+                logger.warning(f"Interview session store write failed: {str(e)}")
+
+            self.counters["flushes"] += 1
+            self.counters["flushed_sessions"] += len(batch)
+            self.counters["flushed_answers"] += sum(len(answers) for answers, _ in taken.values())
+            notices = []
+            for live in batch:
+                live.saved_seq = max(live.saved_seq, snapshots[live.state.interview_id]["seq"])
+                if live.websocket is not None:
+                    notices.append(live.send(live.websocket, {"type": "saved", "seq": live.saved_seq}))
+            await asyncio.gather(*notices)
+            self.evict()
+            return len(batch)
+
+    def evict(self):
+        """Drop disconnected sessions whose changes are all written"""
+        for interview_id, live in list(self.sessions.items()):
+            if live.websocket is None and interview_id not in self.dirty:
+                del self.sessions[interview_id]
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        await self.flush()
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Interview session flush failed: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "store": type(self.store).__name__,
+            "flush_interval_ms": round(self.flush_interval * 1000),
+            "live_sessions": len(self.sessions),
+            "connected": sum(live.websocket is not None for live in self.sessions.values()),
+            "dirty": len(self.dirty),
+            **self.counters,
+        }
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+interview_session_manager = InterviewSessionManager(
+    create_session_store(),
+    flush_interval=settings.INTERVIEW_SESSION_FLUSH_MS / 1000,
+    max_draft_chars=settings.INTERVIEW_SESSION_MAX_DRAFT_CHARS,
+    max_drafts=settings.INTERVIEW_SESSION_MAX_DRAFTS
+)
@@ -0,0 +1,56 @@
+from typing import Optional
+
+from sqlalchemy import Select, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import NotFoundError
+from app.models.candidate import Candidate, CandidateSkill, Skill
+from app.models.job import Job, JobApplication
+from app.utils.similarity_scoring import CandidateBatch, SkillVocabulary, score_candidates
+
+def candidate_feature_query(key=Candidate.id) -> Select:
+    """One row per candidate in CandidateBatch.from_rows order, keyed by ``key``.
+
+    Skill names are aggregated in the database so encoding a batch costs a
+    single query regardless of how many skills candidates have.
+    """
+    return (
+        select(
+            key,
+            func.array_remove(func.array_agg(Skill.name), None),
+            Candidate.years_of_experience,
+            Candidate.expected_salary_min,
+            Candidate.expected_salary_max,
+            Candidate.remote_work_preference
+        )
+        .select_from(Candidate)
+        .outerjoin(CandidateSkill, CandidateSkill.candidate_id == Candidate.id)
+        .outerjoin(Skill, Skill.id == CandidateSkill.skill_id)
+        .group_by(key, Candidate.id)
+    )
+
+async def score_job_applications(db: AsyncSession, job_id: int, vocabulary: Optional[SkillVocabulary] = None) -> int:
+    """Recompute ``ai_match_score`` for every application to a job; returns the count"""
+    job = await db.get(Job, job_id)
+    if job is None:
+        raise NotFoundError("Job", job_id)
+
+    rows = (await db.execute(
+        candidate_feature_query(JobApplication.id)
+        .join(JobApplication, JobApplication.candidate_id == Candidate.id)
+        .where(JobApplication.job_id == job_id)
+    )).all()
+    if not rows:
+        return 0
+
+    scores = score_candidates(job, CandidateBatch.from_rows(rows, vocabulary))
+    # ORM bulk UPDATE by primary key: one executemany
+    await db.execute(
+        update(JobApplication),
+        [
+            {"id": int(application_id), "ai_match_score": float(score)}
+            for application_id, score in zip(scores.ids, scores.total)
+        ]
+    )
+    await db.commit()
+    return len(rows)
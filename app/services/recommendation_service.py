@@ -0,0 +1,226 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.candidate import Candidate
+from app.models.job import Job, JobRecommendation
+from app.services.job_service import candidate_feature_query
+from app.utils.similarity_scoring import CandidateBatch, score_candidates
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key so only one process refreshes at a time
+REFRESH_LOCK_KEY = 0x5245434F
+
+RECOMMENDABLE_CANDIDATE = and_(
+    Candidate.is_active.is_(True),
+    func.coalesce(Candidate.availability_status, "available").notin_(("hired", "not_looking"))
+)
+
+RECOMMENDABLE_JOB = and_(Job.is_active.is_(True), Job.status == "active")
+
+# updated_at is stamped before its transaction commits, so a change can turn
+# visible after a refresh that started later; each refresh re-reads this much
+SYNC_OVERLAP = timedelta(seconds=30)
+
+class RecommendationRefresher:
+    """Maintains ``job_recommendations``: the top ``top_k`` candidates per active job.
+
+    Each refresh only touches what changed since the previous one:
+
+    * jobs edited since then (``updated_at``) are rescored against every
+      recommendable candidate;
+    * candidates edited since then (``updated_at`` or
+      ``last_embedding_update``) are scored against the remaining jobs and
+      merged into their stored lists. If a changed candidate in a full list
+      now scores below the list's old K-th score (or left the pool), an
+      unchanged candidate that was never listed may outrank it, so that job
+      is rescored in full instead.
+
+    Changes from the last ``sync_overlap`` before the previous refresh are
+    read again; merging them twice gives the same lists.
+
+    Rows for jobs and candidates that are no longer recommendable are
+    deleted. "Jobs for you" reads the same table by candidate, i.e. the jobs
+    where the candidate ranks in the top K.
+    """
+
+    def __init__(self, top_k: int = 50, sync_overlap: timedelta = SYNC_OVERLAP):
+        self.top_k = top_k
+        self.sync_overlap = sync_overlap
+        self.synced_at: Optional[datetime] = None
+
+    async def refresh(self, db: AsyncSession) -> Dict[str, int]:
+        # Transaction-scoped: released by the commit below
+        if not await db.scalar(select(func.pg_try_advisory_xact_lock(REFRESH_LOCK_KEY))):
+            return {"skipped": 1}
+
+        computed_at = datetime.utcnow()
+        if self.synced_at is None:
+            self.synced_at = await db.scalar(select(func.max(JobRecommendation.computed_at)))
+        since = self.synced_at - self.sync_overlap if self.synced_at is not None else None
+
+        jobs = (await db.scalars(select(Job).where(RECOMMENDABLE_JOB))).all()
+        stats = {"jobs_rescored": 0, "jobs_merged": 0, "candidates_changed": 0}
+
+        # Drop rows for jobs that left the pool
+        await db.execute(delete(JobRecommendation).where(
+            JobRecommendation.job_id.notin_(select(Job.id).where(RECOMMENDABLE_JOB))
+        ))
+
+        rows: Dict[int, List[Tuple[int, float]]] = {}
+        if since is None:
+            rescore = {job.id for job in jobs}
+        else:
+            rescore = {job.id for job in jobs if job.updated_at > since}
+            changed_ids, changed_batch = await self.load_changed_candidates(db, since)
+            stats["candidates_changed"] = len(changed_ids)
+            if changed_ids:
+                # Candidates that left the pool are in changed_ids but not the batch,
+                # so merging drops them (and rescores jobs whose full lists they were in)
+                merged, needs_rescore = await self.merge_changed(
+                    db, [job for job in jobs if job.id not in rescore], changed_ids, changed_batch
+                )
+                rows.update(merged)
+                rescore |= needs_rescore
+                stats["jobs_merged"] = len(merged)
+
+        if rescore:
+            candidates = (await db.execute(candidate_feature_query().where(RECOMMENDABLE_CANDIDATE))).all()
+            # Encoding and scoring the whole pool is CPU-bound: keep it off the event loop
+            rows.update(await asyncio.to_thread(
+                self.score_jobs, [job for job in jobs if job.id in rescore], candidates
+            ))
+            stats["jobs_rescored"] = len(rescore)
+
+        await self.write(db, rows, computed_at)
+        await db.commit()
+        self.synced_at = computed_at
+        return stats
+
+    def score_jobs(self, jobs: List[Job], candidates: List[Any]) -> Dict[int, List[Tuple[int, float]]]:
+        """Top ``top_k`` of ``candidates`` (feature rows) per job; runs in a worker thread"""
+        batch = CandidateBatch.from_rows(candidates)
+        return {job.id: score_candidates(job, batch).top(self.top_k) if len(batch) else [] for job in jobs}
+
+    async def load_changed_candidates(self, db: AsyncSession, since: datetime) -> Tuple[Set[int], CandidateBatch]:
+        """Ids of every candidate changed since ``since``, and a batch of those still recommendable"""
+        changed_ids = set((await db.scalars(
+            select(Candidate.id).where(or_(Candidate.updated_at > since, Candidate.last_embedding_update > since))
+        )).all())
+        if not changed_ids:
+            return changed_ids, CandidateBatch.from_rows([])
+        candidates = (await db.execute(
+            candidate_feature_query().where(Candidate.id.in_(changed_ids), RECOMMENDABLE_CANDIDATE)
+        )).all()
+        return changed_ids, await asyncio.to_thread(CandidateBatch.from_rows, candidates)
+
+    async def merge_changed(
+        self,
+        db: AsyncSession,
+        jobs: List[Job],
+        changed_ids: Set[int],
+        batch: CandidateBatch
+    ) -> Tuple[Dict[int, List[Tuple[int, float]]], Set[int]]:
+        stored: Dict[int, Dict[int, float]] = {job.id: {} for job in jobs}
+        for job_id, candidate_id, score in await db.execute(
+            select(JobRecommendation.job_id, JobRecommendation.candidate_id, JobRecommendation.score)
+            .where(JobRecommendation.job_id.in_(list(stored)))
+        ):
+            stored[job_id][candidate_id] = score
+        return await asyncio.to_thread(self.merge_scores, jobs, stored, changed_ids, batch)
+
+    def merge_scores(
+        self,
+        jobs: List[Job],
+        stored: Dict[int, Dict[int, float]],
+        changed_ids: Set[int],
+        batch: CandidateBatch
+    ) -> Tuple[Dict[int, List[Tuple[int, float]]], Set[int]]:
+        """Score the changed candidates into each job's stored list; runs in a worker thread"""
+        merged, needs_rescore = {}, set()
+        for job in jobs:
+            current = stored[job.id]
+            scores = {candidate_id: score for candidate_id, score in current.items() if candidate_id not in changed_ids}
+            fresh: Dict[int, float] = {}
+            if len(batch):
+                new_scores = score_candidates(job, batch)
+                fresh = dict(zip(new_scores.ids.tolist(), new_scores.total.tolist()))
+            scores.update(fresh)
+            top = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:self.top_k]
+            # Unlisted, unchanged candidates all score at most the old K-th
+            # score; one of them may now beat a listed candidate that fell below it
+            cutoff = sorted(current.values(), reverse=True)[self.top_k - 1] if len(current) >= self.top_k else None
+            if cutoff is not None and any(
+                fresh.get(candidate_id, float("-inf")) < cutoff for candidate_id in changed_ids & set(current)
+            ):
+                needs_rescore.add(job.id)
+            elif top != sorted(current.items(), key=lambda item: (-item[1], item[0])):
+                merged[job.id] = top
+        return merged, needs_rescore
+
+    async def write(self, db: AsyncSession, rows: Dict[int, List[Tuple[int, float]]], computed_at: datetime):
+        if not rows:
+            return
+        await db.execute(delete(JobRecommendation).where(JobRecommendation.job_id.in_(list(rows))))
+        values = [
+            {
+                "job_id": job_id,
+                "candidate_id": candidate_id,
+                "score": score,
+                "rank": rank,
+                "computed_at": computed_at,
+                "created_at": computed_at,
+                "updated_at": computed_at,
+                "is_active": True
+            }
+            for job_id, top in rows.items()
+            for rank, (candidate_id, score) in enumerate(top, start=1)
+        ]
+        if values:
+            await db.execute(insert(JobRecommendation.__table__), values)
+
+class RecommendationWorker:
+    """Runs RecommendationRefresher every ``interval`` seconds in the background"""
+
+    def __init__(self, refresher: RecommendationRefresher, interval: int = 30):
+        self.refresher = refresher
+        self.interval = interval
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def run(self):
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    stats = await self.refresher.refresh(db)
+                if stats.get("jobs_rescored") or stats.get("jobs_merged"):
+                    logger.info(f"Refreshed recommendations: {stats}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Recommendation refresh failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+recommendation_refresher = RecommendationRefresher(top_k=settings.RECOMMENDATIONS_PER_JOB)
+recommendation_worker = RecommendationWorker(
+    recommendation_refresher, interval=settings.RECOMMENDATION_REFRESH_SECONDS
+)
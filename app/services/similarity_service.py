@@ -0,0 +1,1056 @@
+import asyncio
+import builtins
+import io
+import keyword
+import logging
+import re
+import time
+import tokenize
+import unicodedata
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+from urllib.parse import urlparse
+
+import numpy as np
+from sqlalchemy import delete, insert, or_, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.exceptions import NotFoundError, ValidationError
+from app.models.candidate import Candidate, CandidateLSHBucket, CandidateMinHash
+from app.models.coding import SubmissionFingerprints
+from app.models.job import Job
+from app.utils.ai_helpers import decode_embedding, decode_embeddings, normalize_rows
+from app.utils.minhash import DisjointSet, MinHasher, decode_signature, encode_signature, estimate_jaccard
+
+logger = logging.getLogger(__name__)
+
+class IVFIndex:
+    """Inverted-file approximate nearest-neighbour index (cosine similarity).
+
+    Vectors are L2-normalized and clustered with spherical k-means into
+    ``n_lists`` cells (default ``sqrt(n)``). A query scores the centroids
+    and only scans the ``n_probe`` closest cells, so it touches roughly
+    ``n_probe / n_lists`` of the data. Below ``min_train_size`` vectors
+    everything lives in one cell and search is exact.
+    """
+
+    def __init__(
+        self,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        min_train_size: int = 1024,
+        train_iterations: int = 10,
+        seed: int = 0
+    ):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_train_size = min_train_size
+        self.train_iterations = train_iterations
+        self.seed = seed
+        self.dim: Optional[int] = None
+        self.centroids: Optional[np.ndarray] = None
+        self.list_ids: List[np.ndarray] = []
+        self.list_vectors: List[np.ndarray] = []
+        self.locations: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def build(self, ids: Sequence[int], vectors: np.ndarray):
+        """Train centroids on ``vectors`` and replace the index contents"""
+        vectors = normalize_rows(vectors)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("Expected one vector per id")
+        self.dim = vectors.shape[1] if len(vectors) else None
+        self.centroids = self.train(vectors) if len(vectors) else None
+        self.locations = {}
+        n_lists = 0 if self.centroids is None else len(self.centroids)
+        self.list_ids = [np.empty(0, dtype=np.int64) for _ in range(n_lists)]
+        self.list_vectors = [np.empty((0, self.dim), dtype=np.float32) for _ in range(n_lists)]
+        if len(vectors):
+            self.add(ids, vectors)
+
+    def train(self, vectors: np.ndarray) -> np.ndarray:
+        if len(vectors) < self.min_train_size:
+            return normalize_rows(vectors.mean(axis=0, keepdims=True))
+
+        rng = np.random.default_rng(self.seed)
+        n_lists = min(self.n_lists or int(np.sqrt(len(vectors))), len(vectors))
+        # A few dozen points per centroid is enough to place it
+        sample = vectors[rng.choice(len(vectors), min(len(vectors), n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(self.train_iterations):
+            assignments = self.nearest_lists(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            empty = np.bincount(assignments, minlength=n_lists) == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(len(sample), int(empty.sum()), replace=False)]
+            centroids = normalize_rows(sums)
+        return centroids
+
+    @staticmethod
+    def nearest_lists(vectors: np.ndarray, centroids: np.ndarray, batch_size: int = 8192) -> np.ndarray:
+        # Batched so the (n, n_lists) score matrix stays small
+        return np.concatenate([
+            np.argmax(vectors[start:start + batch_size] @ centroids.T, axis=1)
+            for start in range(0, len(vectors), batch_size)
+        ]) if len(vectors) else np.empty(0, dtype=np.int64)
+
+    def add(self, ids: Sequence[int], vectors: np.ndarray):
+        """Insert or replace vectors; ids already in the index are moved"""
+        if self.centroids is None:
+            self.build(ids, vectors)
+            return
+        vectors = normalize_rows(vectors)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim or len(vectors) != len(ids):
+            raise ValueError(f"Expected one {self.dim}-dimensional vector per id")
+        ids = np.asarray(ids, dtype=np.int64)
+        self.remove(ids[np.isin(ids, list(self.locations))])
+
+        assignments = self.nearest_lists(vectors, self.centroids)
+        for list_no in np.unique(assignments):
+            members = assignments == list_no
+            self.list_ids[list_no] = np.concatenate([self.list_ids[list_no], ids[members]])
+            self.list_vectors[list_no] = np.concatenate([self.list_vectors[list_no], vectors[members]])
+            for vector_id in ids[members]:
+                self.locations[int(vector_id)] = int(list_no)
+
+    def remove(self, ids: Iterable[int]):
+        by_list: Dict[int, List[int]] = {}
+        for vector_id in ids:
+            list_no = self.locations.pop(int(vector_id), None)
+            if list_no is not None:
+                by_list.setdefault(list_no, []).append(int(vector_id))
+        for list_no, removed in by_list.items():
+            keep = ~np.isin(self.list_ids[list_no], removed)
+            self.list_ids[list_no] = self.list_ids[list_no][keep]
+            self.list_vectors[list_no] = self.list_vectors[list_no][keep]
+
+    def search(self, query: np.ndarray, k: int = 10, n_probe: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Return up to ``k`` ``(id, cosine_similarity)`` pairs, best first"""
+        if self.centroids is None or not self.locations:
+            return []
+        query = normalize_rows(query)
+        if query.shape != (self.dim,):
+            raise ValueError(f"Expected a {self.dim}-dimensional query")
+
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        if n_probe < len(self.centroids):
+            probes = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+        else:
+            probes = range(len(self.centroids))
+
+        ids, scores = [], []
+        for list_no in probes:
+            if len(self.list_ids[list_no]):
+                ids.append(self.list_ids[list_no])
+                scores.append(self.list_vectors[list_no] @ query)
+        if not ids:
+            return []
+        ids, scores = np.concatenate(ids), np.concatenate(scores)
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            ids, scores = ids[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+# A row's updated_at is set before its transaction commits, so it can become
+# visible after a refresh that started later: re-read this much history each time
+SYNC_OVERLAP = timedelta(seconds=30)
+
+class CandidateEmbeddingIndex:
+    """Process-local IVF index over active candidates' embeddings.
+
+    Built from the database on first use, then refreshed incrementally from
+    ``updated_at`` at most every ``refresh_seconds``, so matching a job never
+    scans the candidates table.
+    """
+
+    def __init__(self, refresh_seconds: int = 60, n_probe: int = 8, batch_size: int = 5000):
+        self.refresh_seconds = refresh_seconds
+        self.n_probe = n_probe
+        self.batch_size = batch_size
+        self.index = IVFIndex(n_probe=n_probe)
+        self.built_size = 0
+        self.synced_at: Optional[datetime] = None
+        self.checked_at = 0.0
+        self.lock = asyncio.Lock()
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Build the index in the background so the first search doesn't wait for it"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.prewarm())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def prewarm(self):
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.ensure_fresh(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Candidate embedding index prewarm failed: {str(e)}")
+
+    async def fetch(self, db: AsyncSession, since: Optional[datetime] = None):
+        """Yield batches of ``(id, embedding, is_active)`` rows in id order"""
+        last_id = 0
+        while True:
+            query = (
+                select(Candidate.id, Candidate.embedding_vector, Candidate.is_active)
+                .where(Candidate.id > last_id)
+                .order_by(Candidate.id)
+                .limit(self.batch_size)
+            )
+            if since is None:
+                query = query.where(Candidate.embedding_vector.isnot(None), Candidate.is_active.is_(True))
+            else:
+                # Also picks up deactivations and cleared embeddings
+                query = query.where(Candidate.updated_at >= since)
+            rows = (await db.execute(query)).all()
+            if not rows:
+                return
+            last_id = rows[-1].id
+            yield rows
+
+    def build_index(self, ids: List[int], blobs: List[bytes]) -> IVFIndex:
+        dim = len(blobs[0]) // 4 if blobs else 0
+        keep = [i for i, blob in enumerate(blobs) if len(blob) == dim * 4]
+        if len(keep) < len(blobs):
+            logger.warning(f"Skipping {len(blobs) - len(keep)} candidate embeddings with mismatched dimensions")
+        index = IVFIndex(n_probe=self.n_probe)
+        if keep:
+            index.build([ids[i] for i in keep], decode_embeddings((blobs[i] for i in keep), dim))
+        else:
+            index.build([], np.empty((0, 0), dtype=np.float32))
+        return index
+
+    async def rebuild(self, db: AsyncSession):
+        synced_at = datetime.utcnow()
+        ids, blobs = [], []
+        async for rows in self.fetch(db):
+            for row in rows:
+                ids.append(row.id)
+                blobs.append(row.embedding_vector)
+        # k-means over every embedding takes seconds: train a new index in a
+        # thread, off the event loop, and swap it in; searches keep using the
+        # old one meanwhile
+        self.index = await asyncio.to_thread(self.build_index, ids, blobs)
+        self.built_size = len(self.index)
+        self.synced_at = synced_at
+        logger.info(f"Built candidate embedding index with {len(self.index)} vectors")
+
+    async def refresh(self, db: AsyncSession):
+        """Apply candidate changes made since the last sync"""
+        if self.index.dim is None:
+            # Nothing to train centroids on yet
+            await self.rebuild(db)
+            return
+        synced_at = datetime.utcnow()
+        expected_size = self.index.dim * 4
+        # Re-applying a row is harmless: add() replaces and remove() skips missing ids
+        async for rows in self.fetch(db, since=self.synced_at - SYNC_OVERLAP):
+            fresh = [
+                row for row in rows
+                if row.is_active and row.embedding_vector is not None and len(row.embedding_vector) == expected_size
+            ]
+            fresh_ids = {row.id for row in fresh}
+            self.index.remove(row.id for row in rows if row.id not in fresh_ids)
+            if fresh:
+                self.index.add(
+                    [row.id for row in fresh],
+                    decode_embeddings((row.embedding_vector for row in fresh), self.index.dim)
+                )
+        self.synced_at = synced_at
+        # Centroids trained on a much smaller population no longer split it evenly
+        if len(self.index) > 2 * max(self.built_size, self.index.min_train_size):
+            await self.rebuild(db)
+
+    async def ensure_fresh(self, db: AsyncSession):
+        if self.synced_at is not None and time.monotonic() - self.checked_at < self.refresh_seconds:
+            return
+        async with self.lock:
+            if self.synced_at is not None and time.monotonic() - self.checked_at < self.refresh_seconds:
+                return
+            if self.synced_at is None:
+                await self.rebuild(db)
+            else:
+                await self.refresh(db)
+            self.checked_at = time.monotonic()
+
+    async def search(
+        self,
+        db: AsyncSession,
+        query: np.ndarray,
+        k: int = 10,
+        n_probe: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        await self.ensure_fresh(db)
+        return self.index.search(query, k=k, n_probe=n_probe)
+
+candidate_embedding_index = CandidateEmbeddingIndex(
+    refresh_seconds=settings.EMBEDDING_INDEX_REFRESH_SECONDS,
+    n_probe=settings.EMBEDDING_INDEX_N_PROBE
+)
+
+async def top_candidates_for_job(
+    db: AsyncSession,
+    job_id: int,
+    k: int = 10,
+    n_probe: Optional[int] = None
+) -> List[Tuple[int, float]]:
+    """Approximate top-``k`` ``(candidate_id, similarity)`` for a job's embedding"""
+    job = (await db.execute(select(Job.id, Job.job_embedding).where(Job.id == job_id))).first()
+    if job is None:
+        raise NotFoundError("Job", job_id)
+    if job.job_embedding is None:
+        raise ValidationError("Job has no embedding yet", field="job_embedding")
+    return await candidate_embedding_index.search(db, decode_embedding(job.job_embedding), k=k, n_probe=n_probe)
+
+# Plagiarism detection: winnowing (Schleimer et al., the algorithm behind MOSS)
+
+# Stored submissions loaded per query
+FINGERPRINT_LOAD_CHUNK = 5000
+# How often an index's submission ids are compared in full with the stored ones
+FINGERPRINT_RECONCILE_SECONDS = 300.0
+
+PYTHON_KEPT_NAMES = frozenset(keyword.kwlist) | frozenset(getattr(keyword, "softkwlist", ())) | frozenset(dir(builtins))
+PYTHON_LAYOUT_TOKENS = (
+    tokenize.COMMENT, tokenize.NL, tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT, tokenize.ENDMARKER
+)
+
+# Keywords of the C-family languages, kept as-is by the generic tokenizer
+GENERIC_KEYWORDS = frozenset("""
+    abstract async await bool boolean break case catch char class const continue def default do double
+    else enum extends false final float for func function if implements import in int interface let
+    long new null package private protected public return static string struct super switch this throw
+    true try var void while
+""".split())
+# Comments and string literals first, so "//" inside a string is not a comment
+GENERIC_TOKEN = re.compile(
+    r"(?P<comment>//[^\n]*|/\*.*?\*/|#[^\n]*)"
+    r"|(?P<string>\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')"
+    r"|(?P<name>[A-Za-z_]\w*)|(?P<number>\d+(?:\.\d+)?)|\S",
+    re.S
+)
+
+def normalized_tokens(language: str, code: str) -> List[Tuple[str, int]]:
+    """``(token, line)`` pairs with identifiers, numbers and strings replaced by placeholders.
+
+    Renaming variables, editing literals, reformatting or changing comments
+    leaves the sequence unchanged; keywords, builtins and operators are kept.
+    """
+    if language == "python":
+        try:
+            tokens = []
+            for token in tokenize.generate_tokens(io.StringIO(code).readline):
+                if token.type in PYTHON_LAYOUT_TOKENS:
+                    continue
+                if token.type == tokenize.NAME:
+                    text = token.string if token.string in PYTHON_KEPT_NAMES else "V"
+                elif token.type == tokenize.NUMBER:
+                    text = "N"
+                elif token.type == tokenize.STRING:
+                    text = "S"
+                else:
+                    text = token.string
+                tokens.append((text, token.start[0]))
+            return tokens
+        except (tokenize.TokenError, IndentationError, SyntaxError):
+            pass  # Not valid Python: fall back to the generic tokenizer
+
+    tokens = []
+    line, scanned = 1, 0
+    for match in GENERIC_TOKEN.finditer(code):
+        line += code.count("\n", scanned, match.start())
+        scanned = match.start()
+        kind, text = match.lastgroup, match.group()
+        if kind == "comment":
+            continue
+        if kind == "name":
+            text = text if text in GENERIC_KEYWORDS else "V"
+        elif kind == "string":
+            text = "S"
+        elif kind == "number":
+            text = "N"
+        tokens.append((text, line))
+    return tokens
+
+class Winnower:
+    """Selects a document's fingerprints from the hashes of its token k-grams.
+
+    In every window of ``window`` consecutive k-gram hashes the minimum is
+    kept (the rightmost on ties), so any match of at least
+    ``k + window - 1`` tokens shares a fingerprint, and matches shorter than
+    ``k`` tokens never do.
+    """
+
+    # Token hashes are crc32 and k-grams a polynomial over them (mod 2**64),
+    # so fingerprints are stable across processes and can be stored
+    BASE = np.uint64(1000003)
+
+    def __init__(self, k: int = 5, window: int = 4):
+        self.k = k
+        self.window = window
+        self.powers = np.array([int(self.BASE) ** (k - 1 - i) % 2 ** 64 for i in range(k)], dtype=np.uint64)
+
+    def fingerprint(self, language: str, code: str) -> Dict[int, int]:
+        """Map each selected fingerprint to the first source line it covers"""
+        tokens = normalized_tokens(language, code)
+        if len(tokens) < self.k:
+            return {}
+        token_hashes = np.array([zlib.crc32(text.encode()) for text, _ in tokens], dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            kgrams = np.lib.stride_tricks.sliding_window_view(token_hashes, self.k) @ self.powers
+        if len(kgrams) <= self.window:
+            selected = np.array([len(kgrams) - 1 - int(np.argmin(kgrams[::-1]))])
+        else:
+            windows = np.lib.stride_tricks.sliding_window_view(kgrams, self.window)
+            rightmost_min = self.window - 1 - np.argmin(windows[:, ::-1], axis=1)
+            selected = np.unique(np.arange(len(windows)) + rightmost_min)
+        fingerprints: Dict[int, int] = {}
+        for position in selected.tolist():
+            fingerprints.setdefault(int(kgrams[position]), tokens[position][1])
+        return fingerprints
+
+class PlagiarismMatch:
+    def __init__(self, submission_id: int, shared: int, query_coverage: float, other_coverage: float, lines: List[int]):
+        self.submission_id = submission_id
+        self.shared = shared
+        self.query_coverage = query_coverage
+        self.other_coverage = other_coverage
+        self.lines = lines
+
+    @property
+    def similarity(self) -> float:
+        return max(self.query_coverage, self.other_coverage)
+
+    def to_dict(self) -> Dict:
+        return {
+            "submission_id": self.submission_id,
+            "shared_fingerprints": self.shared,
+            "similarity": round(self.similarity, 4),
+            "query_coverage": round(self.query_coverage, 4),
+            "other_coverage": round(self.other_coverage, 4),
+            "lines": self.lines,
+        }
+
+def encode_fingerprints(fingerprints: Dict[int, int]) -> Tuple[bytes, bytes]:
+    """Pack ``{fingerprint: line}`` as little-endian uint64 hashes and uint32 lines"""
+    return (
+        np.fromiter(fingerprints.keys(), dtype="<u8", count=len(fingerprints)).tobytes(),
+        np.fromiter(fingerprints.values(), dtype="<u4", count=len(fingerprints)).tobytes()
+    )
+
+def decode_fingerprints(hashes: bytes, lines: bytes) -> Dict[int, int]:
+    return dict(zip(np.frombuffer(hashes, dtype="<u8").tolist(), np.frombuffer(lines, dtype="<u4").tolist()))
+
+class FingerprintIndex:
+    """Inverted index from fingerprint to the submissions containing it.
+
+    A query walks only its own fingerprints' posting lists. Fingerprints
+    found in more than ``max_document_frequency`` of the indexed submissions
+    (boilerplate most solutions share) are skipped, as are those of ignored
+    starter code. Below ``min_postings`` submissions nothing is skipped for
+    being common, so small problems still compare every shared fingerprint.
+    """
+
+    def __init__(self, max_document_frequency: float = 0.25, min_postings: int = 10):
+        self.max_document_frequency = max_document_frequency
+        self.min_postings = min_postings
+        self.postings: Dict[int, Set[int]] = {}
+        self.documents: Dict[int, Dict[int, int]] = {}
+        self.ignored: Set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def ignore(self, fingerprints: Iterable[int]):
+        """Exclude fingerprints (e.g. of the problem's starter code) from matching"""
+        self.ignored.update(fingerprints)
+
+    def add(self, submission_id: int, fingerprints: Dict[int, int]):
+        self.remove(submission_id)
+        self.documents[submission_id] = fingerprints
+        for fingerprint in fingerprints:
+            self.postings.setdefault(fingerprint, set()).add(submission_id)
+
+    def remove(self, submission_id: int):
+        for fingerprint in self.documents.pop(submission_id, ()):
+            posting = self.postings.get(fingerprint)
+            if posting is not None:
+                posting.discard(submission_id)
+                if not posting:
+                    del self.postings[fingerprint]
+
+    def posting_limit(self) -> int:
+        """Largest posting list still treated as evidence of copying"""
+        return max(self.min_postings, int(self.max_document_frequency * len(self.documents)))
+
+    def informative(self, fingerprints: Iterable[int]) -> List[int]:
+        return [fingerprint for fingerprint in fingerprints if fingerprint not in self.ignored]
+
+    def query(
+        self,
+        fingerprints: Dict[int, int],
+        min_shared: int = 5,
+        min_similarity: float = 0.0,
+        exclude: Optional[int] = None
+    ) -> List[PlagiarismMatch]:
+        """Indexed submissions sharing fingerprints with ``fingerprints``, most similar first"""
+        own = self.informative(fingerprints)
+        limit = self.posting_limit()
+        shared: Dict[int, List[int]] = {}
+        for fingerprint in own:
+            posting = self.postings.get(fingerprint)
+            if not posting or len(posting) > limit:
+                continue
+            for submission_id in posting:
+                if submission_id != exclude:
+                    shared.setdefault(submission_id, []).append(fingerprint)
+
+        matches = []
+        for submission_id, common in shared.items():
+            if len(common) < min_shared:
+                continue
+            other_size = len(self.informative(self.documents[submission_id]))
+            match = PlagiarismMatch(
+                submission_id,
+                len(common),
+                len(common) / max(len(own), 1),
+                len(common) / max(other_size, 1),
+                sorted({fingerprints[fingerprint] for fingerprint in common})
+            )
+            if match.similarity >= min_similarity:
+                matches.append(match)
+        matches.sort(key=lambda match: (-match.similarity, match.submission_id))
+        return matches
+
+class PlagiarismDetector:
+    """Fingerprint indexes, one per coding problem.
+
+    The indexes live in memory; ``check_stored_submission`` keeps them in
+    step with ``submission_fingerprints``, so they survive restarts and
+    cover submissions checked by other processes. After the first load of a
+    problem, each check only reads the rows stored since the previous one.
+    """
+
+    def __init__(
+        self,
+        k: int = 5,
+        window: int = 4,
+        threshold: float = 0.5,
+        max_document_frequency: float = 0.25,
+        min_postings: int = 10,
+        reconcile_seconds: float = FINGERPRINT_RECONCILE_SECONDS
+    ):
+        self.winnower = Winnower(k=k, window=window)
+        self.threshold = threshold
+        self.max_document_frequency = max_document_frequency
+        self.min_postings = min_postings
+        self.reconcile_seconds = reconcile_seconds
+        self.indexes: Dict[Union[int, str], FingerprintIndex] = {}
+        # Per problem: when it was last loaded, and last reconciled (monotonic)
+        self.synced_at: Dict[Union[int, str], datetime] = {}
+        self.reconciled_at: Dict[Union[int, str], float] = {}
+
+    def index(self, problem_id: Union[int, str]) -> FingerprintIndex:
+        index = self.indexes.get(problem_id)
+        if index is None:
+            index = self.indexes[problem_id] = FingerprintIndex(
+                max_document_frequency=self.max_document_frequency, min_postings=self.min_postings
+            )
+        return index
+
+    async def load(self, db: AsyncSession, problem_id: Union[int, str]) -> FingerprintIndex:
+        """The problem's index, brought in line with its stored submissions.
+
+        The first load reads every stored submission; later ones only those
+        stored since the previous load (less SYNC_OVERLAP, for rows stamped
+        before it but committed after). Submissions checked here whose
+        transaction rolled back are dropped by ``reconcile``, every
+        ``reconcile_seconds``.
+        """
+        index = self.index(problem_id)
+        table = SubmissionFingerprints.__table__
+        key = str(problem_id)
+        synced_at = datetime.utcnow()
+        since = self.synced_at.get(problem_id)
+        if since is not None and time.monotonic() - self.reconciled_at.get(problem_id, 0.0) >= self.reconcile_seconds:
+            await self.reconcile(db, problem_id)
+
+        query = select(table.c.submission_id, table.c.fingerprints, table.c.lines).where(table.c.problem_key == key)
+        if since is not None:
+            query = query.where(table.c.created_at >= since - SYNC_OVERLAP)
+        loaded: Set[int] = set()
+        last_id = None
+        while True:
+            page = query if last_id is None else query.where(table.c.submission_id > last_id)
+            rows = (await db.execute(page.order_by(table.c.submission_id).limit(FINGERPRINT_LOAD_CHUNK))).all()
+            if not rows:
+                break
+            for submission_id, hashes, lines in rows:
+                index.add(submission_id, decode_fingerprints(hashes, lines))
+                loaded.add(submission_id)
+            last_id = rows[-1].submission_id
+        if since is None:
+            # A full read: anything else in the index was never stored
+            for submission_id in set(index.documents) - loaded:
+                index.remove(submission_id)
+            self.reconciled_at[problem_id] = time.monotonic()
+        self.synced_at[problem_id] = synced_at
+        return index
+
+    async def reconcile(self, db: AsyncSession, problem_id: Union[int, str]):
+        """Drop indexed submissions that aren't stored (their check was rolled back)"""
+        index = self.index(problem_id)
+        table = SubmissionFingerprints.__table__
+        stored = set((await db.scalars(
+            select(table.c.submission_id).where(table.c.problem_key == str(problem_id))
+        )).all())
+        for submission_id in set(index.documents) - stored:
+            index.remove(submission_id)
+        self.reconciled_at[problem_id] = time.monotonic()
+
+    def set_starter_code(self, problem_id: Union[int, str], language: str, code: str):
+        self.index(problem_id).ignore(self.winnower.fingerprint(language, code))
+
+    def check_submission(
+        self,
+        problem_id: Union[int, str],
+        submission_id: int,
+        language: str,
+        code: str,
+        add: bool = True
+    ) -> List[PlagiarismMatch]:
+        """Earlier submissions to the same problem at least ``threshold`` similar
+        to this one; the submission is then indexed for later checks.
+        """
+        fingerprints = self.winnower.fingerprint(language, code)
+        index = self.index(problem_id)
+        matches = index.query(fingerprints, min_similarity=self.threshold, exclude=submission_id)
+        if add:
+            index.add(submission_id, fingerprints)
+        return matches
+
+    async def check_stored_submission(
+        self,
+        db: AsyncSession,
+        problem_id: Union[int, str],
+        submission_id: int,
+        language: str,
+        code: str
+    ) -> List[PlagiarismMatch]:
+        """``check_submission`` against every stored submission to the problem,
+        then store this one's fingerprints. The caller commits.
+        """
+        await self.load(db, problem_id)
+        matches = self.check_submission(problem_id, submission_id, language, code)
+        hashes, lines = encode_fingerprints(self.index(problem_id).documents[submission_id])
+        table = SubmissionFingerprints.__table__
+        stmt = pg_insert(table).values(
+            problem_key=str(problem_id),
+            submission_id=submission_id,
+            fingerprints=hashes,
+            lines=lines,
+            created_at=datetime.utcnow()
+        )
+        # created_at moves on a re-check too, so other processes' loads pick it up
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["problem_key", "submission_id"],
+            set_={
+                "fingerprints": stmt.excluded.fingerprints,
+                "lines": stmt.excluded.lines,
+                "created_at": stmt.excluded.created_at,
+            }
+        ))
+        return matches
+
+plagiarism_detector = PlagiarismDetector(
+    threshold=settings.PLAGIARISM_SIMILARITY_THRESHOLD,
+    max_document_frequency=settings.PLAGIARISM_MAX_DOCUMENT_FREQUENCY
+)
+
+# A matching phone number or profile URL counts as much as this many name trigrams
+IDENTIFIER_WEIGHT = 8
+RESUME_SHINGLE_WORDS = 4
+# Shorter resumes share 4-grams by accident too often to be evidence
+MIN_RESUME_WORDS = 40
+# (band, bucket) pairs per lookup query; two bind parameters each
+PROBE_CHUNK_SIZE = 5000
+
+CLUSTER_PAIRS_SQL = """
+    SELECT DISTINCT a.candidate_id, b.candidate_id
+    FROM candidate_lsh_buckets a
+    JOIN candidate_lsh_buckets b
+      ON b.band = a.band AND b.bucket = a.bucket AND b.candidate_id > a.candidate_id
+    WHERE a.candidate_id >= :first_id AND a.candidate_id <= :last_id
+      AND (
+          SELECT count(*) FROM candidate_lsh_buckets c WHERE c.band = a.band AND c.bucket = a.bucket
+      ) <= :max_bucket_size
+"""
+
+def normalize_name(first_name: Optional[str], last_name: Optional[str]) -> str:
+    """Lowercase ASCII-folded name with punctuation and repeated spaces removed"""
+    name = unicodedata.normalize("NFKD", f"{first_name or ''} {last_name or ''}")
+    name = "".join(char for char in name if not unicodedata.combining(char)).lower()
+    return " ".join(re.findall(r"[^\W\d_]+", name))
+
+def normalize_phone(phone_number: Optional[str]) -> Optional[str]:
+    """Last ten digits, so "+1 (555) 010-0199" and "555.010.0199" agree"""
+    digits = re.sub(r"\D", "", phone_number or "")
+    return digits[-10:] if len(digits) >= 7 else None
+
+def profile_handle(url: Optional[str]) -> Optional[str]:
+    """The account part of a LinkedIn or GitHub profile URL, lowercased"""
+    if not url or not url.strip():
+        return None
+    url = url.strip().lower()
+    parsed = urlparse(url if "://" in url else f"https://{url}")
+    parts = [part for part in parsed.path.split("/") if part]
+    if parts[:1] in (["in"], ["pub"]):
+        parts = parts[1:]
+    return parts[0] if parts else None
+
+def profile_shingles(candidate) -> Set[str]:
+    """Name character trigrams plus weighted phone and profile-URL tokens.
+
+    Empty without a phone number or profile URL: a shared name alone is
+    not evidence of a duplicate.
+    """
+    identifiers = []
+    phone = normalize_phone(candidate.phone_number)
+    if phone:
+        identifiers.append(f"phone:{phone}")
+    for source, url in (("linkedin", candidate.linkedin_url), ("github", candidate.github_url)):
+        handle = profile_handle(url)
+        if handle:
+            identifiers.append(f"{source}:{handle}")
+    if not identifiers:
+        return set()
+    name = f" {normalize_name(candidate.first_name, candidate.last_name)} "
+    shingles = {f"name:{name[i:i + 3]}" for i in range(len(name) - 2)}
+    for identifier in identifiers:
+        shingles.update(f"{identifier}#{copy}" for copy in range(IDENTIFIER_WEIGHT))
+    return shingles
+
+def resume_shingles(resume_text: Optional[str]) -> Set[str]:
+    words = re.findall(r"\w+", (resume_text or "").lower())
+    if len(words) < MIN_RESUME_WORDS:
+        return set()
+    return {" ".join(words[i:i + RESUME_SHINGLE_WORDS]) for i in range(len(words) - RESUME_SHINGLE_WORDS + 1)}
+
+class DuplicateMatch:
+    def __init__(self, candidate_id: int, profile_similarity: float, resume_similarity: float):
+        self.candidate_id = candidate_id
+        self.profile_similarity = profile_similarity
+        self.resume_similarity = resume_similarity
+
+    @property
+    def similarity(self) -> float:
+        return max(self.profile_similarity, self.resume_similarity)
+
+Signatures = Tuple[Optional[np.ndarray], Optional[np.ndarray]]
+
+class CandidateDeduplicator:
+    """Near-duplicate candidates via MinHash/LSH, stored in the database.
+
+    Each candidate gets a profile signature (name, phone, LinkedIn/GitHub
+    handle) and a resume signature (word 4-grams); their LSH band keys go
+    into ``candidate_lsh_buckets`` (profile bands first, then resume bands).
+    A lookup probes its own ``2 * bands`` keys through the primary key
+    instead of comparing against every candidate, then verifies suspects
+    by estimated Jaccard similarity. Buckets holding more than
+    ``max_bucket_size`` candidates are skipped as uninformative.
+
+    ``cluster_id`` is kept up to date on insert by merging clusters; a
+    change that breaks a duplicate link is only undone by
+    ``cluster_candidates``, which recomputes every cluster.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 32,
+        profile_threshold: float = 0.5,
+        resume_threshold: float = 0.7,
+        max_bucket_size: int = 100
+    ):
+        self.hasher = MinHasher(num_perm=num_perm, bands=bands)
+        self.profile_threshold = profile_threshold
+        self.resume_threshold = resume_threshold
+        self.max_bucket_size = max_bucket_size
+
+    def signatures(self, candidate) -> Signatures:
+        """Signatures of a row with the name, phone, profile URL and resume_text columns"""
+        return (
+            self.hasher.signature(profile_shingles(candidate)),
+            self.hasher.signature(resume_shingles(candidate.resume_text))
+        )
+
+    def bucket_keys(self, signatures: Signatures) -> List[Tuple[int, int]]:
+        keys = []
+        for offset, signature in enumerate(signatures):
+            if signature is not None:
+                keys.extend(
+                    (offset * self.hasher.bands + band, key)
+                    for band, key in enumerate(self.hasher.band_keys(signature))
+                )
+        return keys
+
+    def compare(self, candidate_id: int, a: Signatures, b: Signatures) -> Optional[DuplicateMatch]:
+        """A DuplicateMatch for ``candidate_id`` (with signatures ``b``) if it duplicates ``a``"""
+        profile, resume = (
+            estimate_jaccard(x, y) if x is not None and y is not None else 0.0
+            for x, y in zip(a, b)
+        )
+        if profile >= self.profile_threshold or resume >= self.resume_threshold:
+            return DuplicateMatch(candidate_id, profile, resume)
+        return None
+
+    @staticmethod
+    async def load_candidates(db: AsyncSession, candidate_ids: Iterable[int]) -> List:
+        return (await db.execute(
+            select(
+                Candidate.id,
+                Candidate.first_name,
+                Candidate.last_name,
+                Candidate.phone_number,
+                Candidate.linkedin_url,
+                Candidate.github_url,
+                Candidate.resume_text
+            ).where(Candidate.id.in_(list(candidate_ids)))
+        )).all()
+
+    @staticmethod
+    async def load_signatures(db: AsyncSession, candidate_ids: Iterable[int]) -> Dict[int, Signatures]:
+        candidate_ids = list(candidate_ids)
+        signatures = {}
+        for start in range(0, len(candidate_ids), PROBE_CHUNK_SIZE):
+            rows = await db.execute(
+                select(
+                    CandidateMinHash.candidate_id,
+                    CandidateMinHash.profile_signature,
+                    CandidateMinHash.resume_signature
+                ).where(CandidateMinHash.candidate_id.in_(candidate_ids[start:start + PROBE_CHUNK_SIZE]))
+            )
+            for candidate_id, profile, resume in rows:
+                signatures[candidate_id] = (decode_signature(profile), decode_signature(resume))
+        return signatures
+
+    async def suspects(self, db: AsyncSession, probes: Dict[int, List[Tuple[int, int]]]) -> Dict[int, Set[int]]:
+        """Other candidates sharing an informative bucket with each probe's keys"""
+        owners: Dict[Tuple[int, int], List[int]] = {}
+        for candidate_id, keys in probes.items():
+            for key in keys:
+                owners.setdefault(key, []).append(candidate_id)
+
+        members: Dict[Tuple[int, int], List[int]] = {}
+        keys = list(owners)
+        table = CandidateLSHBucket.__table__
+        for start in range(0, len(keys), PROBE_CHUNK_SIZE):
+            rows = await db.execute(
+                select(table.c.band, table.c.bucket, table.c.candidate_id)
+                .where(tuple_(table.c.band, table.c.bucket).in_(keys[start:start + PROBE_CHUNK_SIZE]))
+            )
+            for band, bucket, candidate_id in rows:
+                members.setdefault((band, bucket), []).append(candidate_id)
+
+        suspects: Dict[int, Set[int]] = {candidate_id: set() for candidate_id in probes}
+        for key, candidate_ids in members.items():
+            if len(candidate_ids) <= self.max_bucket_size:
+                for owner in owners[key]:
+                    suspects[owner].update(candidate_ids)
+        for candidate_id, others in suspects.items():
+            others.discard(candidate_id)
+        return suspects
+
+    async def write_signatures(self, db: AsyncSession, signatures: Dict[int, Signatures], replace: bool = True):
+        """Upsert signatures and bucket rows; new rows start as their own cluster.
+
+        ``replace=False`` skips clearing old bucket rows, for candidates
+        that were just inserted.
+        """
+        now = datetime.utcnow()
+        table = CandidateMinHash.__table__
+        stmt = pg_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["candidate_id"],
+            set_={
+                "profile_signature": stmt.excluded.profile_signature,
+                "resume_signature": stmt.excluded.resume_signature,
+                "computed_at": stmt.excluded.computed_at
+            }
+        )
+        await db.execute(stmt, [
+            {
+                "candidate_id": candidate_id,
+                "profile_signature": encode_signature(profile),
+                "resume_signature": encode_signature(resume),
+                "cluster_id": candidate_id,
+                "computed_at": now
+            }
+            for candidate_id, (profile, resume) in signatures.items()
+        ])
+
+        buckets = CandidateLSHBucket.__table__
+        if replace:
+            await db.execute(delete(buckets).where(buckets.c.candidate_id.in_(list(signatures))))
+        bucket_rows = [
+            {"band": band, "bucket": bucket, "candidate_id": candidate_id}
+            for candidate_id, candidate_signatures in signatures.items()
+            for band, bucket in self.bucket_keys(candidate_signatures)
+        ]
+        if bucket_rows:
+            await db.execute(insert(buckets), bucket_rows)
+
+    @staticmethod
+    async def merge_clusters(db: AsyncSession, candidate_ids: Iterable[int]):
+        """Put the candidates, and everything already clustered with them, in one cluster"""
+        table = CandidateMinHash.__table__
+        cluster_ids = set((await db.scalars(
+            select(table.c.cluster_id).where(table.c.candidate_id.in_(list(candidate_ids)))
+        )).all())
+        if len(cluster_ids) > 1:
+            await db.execute(
+                update(table).where(table.c.cluster_id.in_(cluster_ids)).values(cluster_id=min(cluster_ids))
+            )
+
+    async def index_candidates(
+        self,
+        db: AsyncSession,
+        candidate_ids: Iterable[int],
+        assign_clusters: bool = True
+    ) -> int:
+        """(Re)compute signatures and buckets for candidates, merging their
+        clusters with any duplicates found. The caller commits.
+        """
+        rows = await self.load_candidates(db, candidate_ids)
+        await self.index_rows(db, rows, assign_clusters=assign_clusters)
+        return len(rows)
+
+    async def index_rows(
+        self,
+        db: AsyncSession,
+        rows: Sequence,
+        assign_clusters: bool = True,
+        replace: bool = True
+    ):
+        """index_candidates for rows (or flushed Candidate objects) already in hand"""
+        if not rows:
+            return
+        signatures = {row.id: self.signatures(row) for row in rows}
+        await self.write_signatures(db, signatures, replace=replace)
+        if assign_clusters:
+            suspects = await self.suspects(
+                db, {candidate_id: self.bucket_keys(sigs) for candidate_id, sigs in signatures.items()}
+            )
+            stored = await self.load_signatures(db, set().union(*suspects.values()))
+            for candidate_id, others in suspects.items():
+                duplicates = [
+                    other for other in others
+                    if other in stored and self.compare(other, signatures[candidate_id], stored[other])
+                ]
+                if duplicates:
+                    await self.merge_clusters(db, [candidate_id, *duplicates])
+
+    async def find_duplicates(self, db: AsyncSession, candidate_id: int) -> List[DuplicateMatch]:
+        """Likely duplicates of a candidate, most similar first"""
+        rows = await self.load_candidates(db, [candidate_id])
+        if not rows:
+            raise NotFoundError("Candidate", candidate_id)
+        # Computed from the current row, so a stale index entry doesn't matter here
+        signatures = self.signatures(rows[0])
+        suspects = (await self.suspects(db, {candidate_id: self.bucket_keys(signatures)}))[candidate_id]
+        stored = await self.load_signatures(db, suspects)
+        matches = [
+            match for match in (
+                self.compare(other, signatures, other_signatures) for other, other_signatures in stored.items()
+            )
+            if match
+        ]
+        return sorted(matches, key=lambda match: (-match.similarity, match.candidate_id))
+
+    async def cluster_candidates(self, db: AsyncSession, batch_size: int = 1000) -> Dict[str, int]:
+        """Recompute every duplicate cluster from scratch.
+
+        Indexes candidates that are missing or changed since they were
+        indexed, then walks the buckets in candidate id ranges: colliding
+        pairs come from a self-join on the bucket primary key, are verified
+        in memory and unioned into clusters. Commits per batch.
+        """
+        stats = {"indexed": 0, "pairs_checked": 0, "duplicate_pairs": 0, "clusters": 0, "clustered_candidates": 0}
+        minhashes = CandidateMinHash.__table__
+
+        last_id = 0
+        while True:
+            candidate_ids = (await db.scalars(
+                select(Candidate.id)
+                .outerjoin(minhashes, minhashes.c.candidate_id == Candidate.id)
+                .where(
+                    Candidate.id > last_id,
+                    or_(minhashes.c.candidate_id.is_(None), minhashes.c.computed_at < Candidate.updated_at)
+                )
+                .order_by(Candidate.id)
+                .limit(batch_size)
+            )).all()
+            if not candidate_ids:
+                break
+            last_id = candidate_ids[-1]
+            await self.index_candidates(db, candidate_ids, assign_clusters=False)
+            await db.commit()
+            stats["indexed"] += len(candidate_ids)
+
+        clusters = DisjointSet()
+        last_id = 0
+        while True:
+            candidate_ids = (await db.scalars(
+                select(minhashes.c.candidate_id)
+                .where(minhashes.c.candidate_id > last_id)
+                .order_by(minhashes.c.candidate_id)
+                .limit(batch_size)
+            )).all()
+            if not candidate_ids:
+                break
+            last_id = candidate_ids[-1]
+            pairs = (await db.execute(
+                text(CLUSTER_PAIRS_SQL),
+                {"first_id": candidate_ids[0], "last_id": last_id, "max_bucket_size": self.max_bucket_size}
+            )).all()
+            signatures = await self.load_signatures(db, {candidate_id for pair in pairs for candidate_id in pair})
+            for a, b in pairs:
+                if a in signatures and b in signatures and self.compare(b, signatures[a], signatures[b]):
+                    clusters.union(a, b)
+                    stats["duplicate_pairs"] += 1
+            stats["pairs_checked"] += len(pairs)
+
+        await db.execute(
+            update(minhashes).where(minhashes.c.cluster_id != minhashes.c.candidate_id)
+            .values(cluster_id=minhashes.c.candidate_id)
+        )
+        for members in clusters.clusters():
+            await db.execute(
+                update(minhashes).where(minhashes.c.candidate_id.in_(members)).values(cluster_id=members[0])
+            )
+            stats["clusters"] += 1
+            stats["clustered_candidates"] += len(members)
+        await db.commit()
+        return stats
+
+candidate_deduplicator = CandidateDeduplicator(
+    profile_threshold=settings.DUPLICATE_PROFILE_THRESHOLD,
+    resume_threshold=settings.DUPLICATE_RESUME_THRESHOLD
+)
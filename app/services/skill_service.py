@@ -0,0 +1,234 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, event, func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.candidate import Candidate, CandidateSkill, Skill, SkillCategory, SkillCategoryClosure
+from app.models.job import Job
+from app.services.embedding_service import CANDIDATE, enqueue_embeddings
+from app.utils.text_matching import AhoCorasick
+
+RESUME_SOURCE = "resume"
+# A mention says nothing about depth; recruiters can adjust it
+RESUME_PROFICIENCY = "intermediate"
+
+class SkillDictionary:
+    """Skill names and aliases compiled into one Aho-Corasick automaton"""
+
+    def __init__(self, skills: Iterable[Tuple[int, str, Optional[List[str]]]]):
+        self.names: Dict[int, str] = {}
+        self.matcher = AhoCorasick()
+        for skill_id, name, aliases in skills:
+            self.names[skill_id] = name
+            self.matcher.add(name, (skill_id, False))
+            for alias in aliases or ():
+                self.matcher.add(alias, (skill_id, True))
+        self.matcher.build()
+
+    def extract(self, text: Optional[str]) -> Dict[int, float]:
+        """Map each mentioned skill id to a confidence score in (0, 1).
+
+        Canonical names score higher than aliases, very short terms ("go",
+        "r") lower since they are often plain words, and each repeat
+        mention adds a little.
+        """
+        mentions: Dict[int, List[float]] = {}
+        for start, end, (skill_id, via_alias) in self.matcher.find_longest(text or ""):
+            base = 0.5 if via_alias else 0.6
+            if end - start <= 2:
+                base -= 0.2
+            mentions.setdefault(skill_id, []).append(base)
+        return {
+            skill_id: round(min(0.95, max(bases) + 0.1 * (len(bases) - 1)), 2)
+            for skill_id, bases in mentions.items()
+        }
+
+class SkillDictionaryCache:
+    """Process-local SkillDictionary, rebuilt when the skills table changes.
+
+    Local writes invalidate it through mapper events; writes from other
+    processes are caught by comparing a (count, max(updated_at)) signature.
+    """
+
+    def __init__(self):
+        self.dictionary: Optional[SkillDictionary] = None
+        self.signature = None
+
+    async def get(self, db: AsyncSession) -> SkillDictionary:
+        signature = tuple((await db.execute(select(func.count(Skill.id), func.max(Skill.updated_at)))).one())
+        if self.dictionary is None or signature != self.signature:
+            rows = (await db.execute(
+                select(Skill.id, Skill.name, Skill.aliases).where(Skill.is_active.is_(True))
+            )).all()
+            self.dictionary = SkillDictionary(rows)
+            self.signature = signature
+        return self.dictionary
+
+    def invalidate(self):
+        self.dictionary = None
+
+skill_dictionary_cache = SkillDictionaryCache()
+
+class SkillCategoryTree:
+    """Process-local cache of the skill ids under each category (its whole
+    subtree), for expanding category filters in search.
+
+    A miss costs one indexed join through skill_category_closure. Local
+    writes to categories or skills clear it; other processes' writes are
+    picked up when entries expire.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def skill_ids(self, db: AsyncSession, category_ids: Iterable[int]) -> Set[int]:
+        """Ids of every skill in the given categories or their descendants"""
+        skill_ids: Set[int] = set()
+        missing = []
+        for category_id in set(category_ids):
+            cached = self.cache.get(category_id)
+            if cached is None:
+                missing.append(category_id)
+            else:
+                skill_ids |= cached
+        if missing:
+            subtrees: Dict[int, Set[int]] = {category_id: set() for category_id in missing}
+            for category_id, skill_id in await db.execute(
+                select(SkillCategoryClosure.ancestor_id, Skill.id)
+                .join(Skill, Skill.category_id == SkillCategoryClosure.descendant_id)
+                .where(SkillCategoryClosure.ancestor_id.in_(missing))
+            ):
+                subtrees[category_id].add(skill_id)
+            for category_id, subtree in subtrees.items():
+                self.cache.set(category_id, frozenset(subtree))
+                skill_ids |= subtree
+        return skill_ids
+
+    def invalidate(self):
+        self.cache.clear()
+
+skill_category_tree = SkillCategoryTree(ttl=settings.SKILL_CATEGORY_CACHE_TTL_SECONDS)
+
+def _invalidate_skill_caches(mapper, connection, target):
+    skill_dictionary_cache.invalidate()
+    skill_category_tree.invalidate()
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(Skill, _event_name, _invalidate_skill_caches)
+    event.listen(SkillCategory, _event_name, _invalidate_skill_caches)
+
+REBUILD_CLOSURE_SQL = """
+    WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+        SELECT id, id, 0 FROM skill_categories
+        UNION ALL
+        SELECT tree.ancestor_id, child.id, tree.depth + 1
+        FROM tree JOIN skill_categories child ON child.parent_id = tree.descendant_id
+    )
+    INSERT INTO skill_category_closure (ancestor_id, descendant_id, depth)
+    SELECT ancestor_id, descendant_id, depth FROM tree
+"""
+
+async def rebuild_skill_category_closure(db: AsyncSession):
+    """Recompute the closure from parent_id, e.g. after raw SQL writes to skill_categories"""
+    await db.execute(delete(SkillCategoryClosure))
+    await db.execute(text(REBUILD_CLOSURE_SQL))
+    await db.commit()
+    skill_category_tree.invalidate()
+
+async def extract_resume_skills(
+    db: AsyncSession,
+    candidate_ids: Optional[Sequence[int]] = None,
+    batch_size: int = 500
+) -> Dict[str, int]:
+    """Derive ``source="resume"`` CandidateSkill rows from ``resume_text``.
+
+    Runs over every candidate with a resume (or just ``candidate_ids``) in
+    id-ordered batches, one commit per batch. Previous resume-derived rows
+    are replaced; skills the candidate already has from another source are
+    left alone. Candidates whose extracted skills changed get ``updated_at``
+    bumped so downstream refreshes (recommendations) pick them up, and are
+    queued for re-embedding.
+    """
+    dictionary = await skill_dictionary_cache.get(db)
+    stats = {"candidates": 0, "skills_added": 0, "candidates_changed": 0}
+    table = CandidateSkill.__table__
+    last_id = 0
+    while True:
+        query = (
+            select(Candidate.id, Candidate.resume_text)
+            .where(Candidate.resume_text.isnot(None), Candidate.id > last_id)
+            .order_by(Candidate.id)
+            .limit(batch_size)
+        )
+        if candidate_ids is not None:
+            query = query.where(Candidate.id.in_(candidate_ids))
+        rows = (await db.execute(query)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        ids = [row.id for row in rows]
+
+        existing = (await db.execute(
+            select(table.c.candidate_id, table.c.skill_id, table.c.source).where(table.c.candidate_id.in_(ids))
+        )).all()
+        other_sources = {(row.candidate_id, row.skill_id) for row in existing if row.source != RESUME_SOURCE}
+        previous: Dict[int, set] = {}
+        for row in existing:
+            if row.source == RESUME_SOURCE:
+                previous.setdefault(row.candidate_id, set()).add(row.skill_id)
+
+        now = datetime.utcnow()
+        values, changed = [], []
+        for row in rows:
+            extracted = {
+                skill_id: confidence
+                for skill_id, confidence in dictionary.extract(row.resume_text).items()
+                if (row.id, skill_id) not in other_sources
+            }
+            if set(extracted) != previous.get(row.id, set()):
+                changed.append(row.id)
+            values.extend(
+                {
+                    "candidate_id": row.id,
+                    "skill_id": skill_id,
+                    "proficiency_level": RESUME_PROFICIENCY,
+                    "is_primary": False,
+                    "source": RESUME_SOURCE,
+                    "confidence_score": confidence,
+                    "created_at": now,
+                    "updated_at": now,
+                    "is_active": True
+                }
+                for skill_id, confidence in extracted.items()
+            )
+
+        await db.execute(delete(table).where(table.c.candidate_id.in_(ids), table.c.source == RESUME_SOURCE))
+        if values:
+            await db.execute(insert(table), values)
+        if changed:
+            await db.execute(
+                update(Candidate.__table__).where(Candidate.__table__.c.id.in_(changed)).values(updated_at=now)
+            )
+            # Skills are part of the embedding text
+            await enqueue_embeddings(db, CANDIDATE, changed)
+        await db.commit()
+
+        stats["candidates"] += len(rows)
+        stats["skills_added"] += len(values)
+        stats["candidates_changed"] += len(changed)
+    return stats
+
+async def suggest_job_skills(db: AsyncSession, job: Job) -> List[str]:
+    """Skill names mentioned in a job's title or description but not yet in
+    its required or preferred skills, most confident first"""
+    dictionary = await skill_dictionary_cache.get(db)
+    extracted = dictionary.extract(f"{job.title or ''}\n{job.description or ''}")
+    listed = {name.lower() for name in (job.required_skills or []) + (job.preferred_skills or [])}
+    return [
+        dictionary.names[skill_id]
+        for skill_id, _ in sorted(extracted.items(), key=lambda item: (-item[1], dictionary.names[item[0]]))
+        if dictionary.names[skill_id].lower() not in listed
+    ]
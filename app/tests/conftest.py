@@ -0,0 +1,33 @@
+"""Shared fixtures for database-backed tests.
+
+The models use PostgreSQL-only types (ARRAY, TSVECTOR), so these run against
+a scratch PostgreSQL database named by TEST_DATABASE_URL; tests that need it
+are marked ``requires_database`` and skipped when it is unset.
+"""
+import os
+
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.models import Base
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+@pytest_asyncio.fixture
+async def db_engine():
+    engine = create_async_engine(TEST_DATABASE_URL)
+    async with engine.begin() as connection:
+        await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    yield engine
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+@pytest_asyncio.fixture
+async def db(db_engine):
+    session_factory = async_sessionmaker(db_engine, expire_on_commit=False)
+    async with session_factory() as session:
+        yield session
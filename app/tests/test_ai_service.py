@@ -0,0 +1,261 @@
+"""AI client tests"""
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+from app.services.ai_service import (
+    AIClient,
+    AIServiceBusy,
+    AIServiceError,
+    OpenAIProvider,
+    SemanticResponseCache,
+    StubProvider,
+    create_provider
+)
+from app.services import ai_service
+
+class FlakyProvider(StubProvider):
+    """Fails the first ``failures`` calls with a retryable error"""
+
+    def __init__(self, failures: int, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    async def simulate(self, kind: str):
+        await super().simulate(kind)
+        if self.failures:
+            self.failures -= 1
+            raise AIServiceError("rate limited", retryable=True)
+
+@pytest.mark.asyncio
+async def test_identical_in_flight_completions_share_one_call():
+    provider = StubProvider(latency=0.05)
+    client = AIClient(provider)
+    results = await asyncio.gather(*(client.complete("Rate this answer") for _ in range(10)))
+    assert len({result.text for result in results}) == 1
+    assert provider.calls["complete"] == 1
+    assert client.stats()["coalesced"] == 9
+
+    # Deterministic across calls, and distinct per prompt
+    assert (await client.complete("Rate this answer")).text == results[0].text
+    assert (await client.complete("Rate another answer")).text != results[0].text
+    assert provider.calls["complete"] == 3
+
+@pytest.mark.asyncio
+async def test_embeddings_are_micro_batched():
+    provider = StubProvider(latency=0.01)
+    client = AIClient(provider, embedding_batch_size=16, embedding_batch_wait=0.01)
+    texts = [f"python engineer number {i}" for i in range(40)]
+    vectors = await asyncio.gather(*(client.embed_one(text) for text in texts + texts[:5]))
+    assert provider.calls["embed"] == 3  # 16 + 16 + 8 distinct texts
+    assert np.allclose(vectors[0], vectors[40])
+    matrix = await client.embed(["senior python engineer", "python engineer", "pastry chef"])
+    assert matrix.shape == (3, provider.embedding_dim)
+    assert matrix[0] @ matrix[1] > matrix[0] @ matrix[2]
+
+@pytest.mark.asyncio
+async def test_embedding_batch_fails_when_vectors_are_missing():
+    class ShortProvider(StubProvider):
+        async def embed(self, texts, model):
+            return (await super().embed(texts, model))[:-1]
+
+    client = AIClient(ShortProvider(), embedding_batch_size=4, embedding_batch_wait=0.01)
+    with pytest.raises(AIServiceError, match="3 vectors for 4 texts"):
+        await client.embed(["a", "b", "c", "d"])
+
+def test_real_provider_without_key_fails_startup(monkeypatch):
+    monkeypatch.setattr(ai_service.settings, "OPENAI_API_KEY", None)
+    monkeypatch.setattr(ai_service.settings, "AI_MODEL_PROVIDER", "openai")
+    with pytest.raises(ValueError, match="OPENAI_API_KEY"):
+        create_provider()
+    monkeypatch.setattr(ai_service.settings, "AI_MODEL_PROVIDER", "cohere")
+    with pytest.raises(ValueError, match="Unsupported"):
+        create_provider()
+    monkeypatch.setattr(ai_service.settings, "AI_MODEL_PROVIDER", None)
+    assert isinstance(create_provider(), StubProvider)
+
+@pytest.mark.asyncio
+async def test_retries_with_backoff_then_gives_up():
+    client = AIClient(FlakyProvider(failures=2), max_retries=3, backoff_base=0.001)
+    assert (await client.complete("hello")).text
+    assert client.stats()["retries"] == 2
+
+    client = AIClient(FlakyProvider(failures=5), max_retries=2, backoff_base=0.001)
+    with pytest.raises(AIServiceError):
+        await client.complete("hello")
+    assert client.stats()["failures"] == 1
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_queue_bound():
+    provider = StubProvider(latency=0.05)
+    client = AIClient(provider, max_concurrency=2, max_queue=3)
+    results = await asyncio.gather(
+        *(client.complete(f"prompt {i}") for i in range(8)), return_exceptions=True
+    )
+    busy = [result for result in results if isinstance(result, AIServiceBusy)]
+    assert len(busy) == 3  # 2 running + 3 queued
+    assert provider.calls["complete"] == 5
+
+@pytest.mark.asyncio
+async def test_openai_provider_maps_http_errors():
+    responses = iter([
+        httpx.Response(429, headers={"retry-after": "0"}, json={"error": "slow down"}),
+        httpx.Response(200, json={"data": [{"index": 1, "embedding": [0.0, 1.0]}, {"index": 0, "embedding": [1.0, 0.0]}]}),
+        httpx.Response(400, json={"error": "bad request"}),
+    ])
+    provider = OpenAIProvider("test-key")
+    provider.client = httpx.AsyncClient(
+        base_url="https://api.test/v1", transport=httpx.MockTransport(lambda request: next(responses))
+    )
+    client = AIClient(provider)
+    assert (await client.embed(["a", "b"])).tolist() == [[1.0, 0.0], [0.0, 1.0]]
+    assert client.stats()["retries"] == 1
+    with pytest.raises(AIServiceError) as error:
+        await client.complete("hello")
+    assert not error.value.retryable
+    await client.close()
+
+ANSWER = "I would count every element with a hash map and then scan the map for the most frequent one in linear time"
+
+@pytest.mark.asyncio
+async def test_response_cache_exact_and_per_company():
+    provider = StubProvider()
+    client = AIClient(provider, cache=SemanticResponseCache())
+    first = await client.complete("Write questions for a backend role", cache_scope=1)
+    again = await client.complete("Write questions for a backend role", cache_scope=1)
+    assert first.cached is None and again.cached == "exact" and again.text == first.text
+    assert (await client.complete("Write questions for a backend role", cache_scope=2)).cached is None
+    assert (await client.complete("Write questions for a backend role", cache_scope=1, use_cache=False)).cached is None
+    assert provider.calls["complete"] == 3
+    stats = client.cache.stats()
+    assert stats["exact_hits"] == 1 and stats["misses"] == 2 and stats["hit_rate"] == 0.3333
+
+class MeaningfulStubProvider(StubProvider):
+    """Stub whose bag-of-words embeddings stand in for a real model's"""
+    semantic_embeddings = True
+
+@pytest.mark.asyncio
+async def test_response_cache_semantic_tier():
+    provider = MeaningfulStubProvider()
+    client = AIClient(provider, cache=SemanticResponseCache(similarity_threshold=0.9))
+
+    async def grade(answer, question="Find the mode", scope=1):
+        return await client.complete(
+            f"Question: {question}\nAnswer: {answer}",
+            cache_scope=scope, semantic_text=answer, semantic_namespace=question
+        )
+
+    first = await grade(ANSWER)
+    reworded = await grade(ANSWER.upper() + "!")
+    assert reworded.cached == "semantic" and reworded.text == first.text
+    assert (await grade("Sort the array and take the longest run of equal values")).cached is None
+    # Same answer, different question or company: no reuse
+    assert (await grade(ANSWER, question="Reverse a linked list")).cached is None
+    assert (await grade(ANSWER, scope=2)).cached is None
+    assert provider.calls["complete"] == 4
+    assert client.cache.stats()["semantic_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_semantic_tier_is_off_for_hashing_embeddings():
+    provider = StubProvider()
+    client = AIClient(provider, cache=SemanticResponseCache(similarity_threshold=0.5))
+    await client.complete(f"Answer: {ANSWER}", semantic_text=ANSWER, semantic_namespace="mode")
+    assert (await client.complete(f"Answer: {ANSWER}!", semantic_text=ANSWER + "!", semantic_namespace="mode")).cached is None
+    assert provider.calls["embed"] == 0 and client.cache.stats()["semantic_hits"] == 0
+
+@pytest.mark.asyncio
+async def test_grading_only_reuses_an_identical_answer(monkeypatch):
+    provider = MeaningfulStubProvider()
+    client = AIClient(provider, cache=SemanticResponseCache(similarity_threshold=0.5))
+    monkeypatch.setattr(ai_service, "ai_client", client)
+    answer = "Use a mutex because a lock-free queue is not needed here"
+    swapped = "Use a lock-free queue because a mutex is not needed here"
+    first = await ai_service.evaluate_answer("Guard a shared queue", answer, company_id=1)
+    assert (await ai_service.evaluate_answer("Guard a shared queue", swapped, company_id=1)).cached is None
+    again = await ai_service.evaluate_answer("Guard a shared queue", f"  {answer}\n", company_id=1)
+    assert again.cached == "exact" and again.text == first.text
+    assert provider.calls["complete"] == 2 and provider.calls["embed"] == 0
+
+def test_response_cache_is_bounded():
+    cache = SemanticResponseCache(maxsize=2, semantic_maxsize=2)
+    for i in range(3):
+        vector = np.zeros(4, dtype=np.float32)
+        vector[i] = 1.0
+        cache.set(1, f"key{i}", {"text": str(i), "model": "m"}, namespace=("m", ""), vector=vector)
+    assert cache.get_exact(1, "key0") is None
+    assert cache.get_exact(1, "key2")["text"] == "2"
+    index = cache.indexes[(1, ("m", ""))]
+    assert list(index.vectors) == ["key1", "key2"]
+    assert cache.get_similar(1, ("m", ""), np.array([0, 1, 0, 0], dtype=np.float32))[0]["text"] == "1"
+    assert cache.get_similar(1, ("m", ""), np.array([1, 0, 0, 0], dtype=np.float32)) is None
+
+
+class BrokenStreamProvider(StubProvider):
+    """Streams one word, then fails with a retryable error"""
+
+    async def stream(self, messages, model, max_tokens, temperature):
+        await self.simulate("stream")
+        yield "partial"
+        raise AIServiceError("connection reset", retryable=True)
+
+@pytest.mark.asyncio
+async def test_stream_relays_chunks_then_caches():
+    provider = StubProvider(token_latency=0.001)
+    client = AIClient(provider, cache=SemanticResponseCache())
+    chunks = [chunk async for chunk in client.stream("Rate this answer please", cache_scope=1)]
+    *text, completion = chunks
+    assert len(text) > 1 and "".join(text) == completion.text
+    assert completion.text == (await client.complete("Rate this answer please", cache_scope=1, use_cache=False)).text
+
+    # Served from the cache as one chunk; complete() shares the same entries
+    cached = [chunk async for chunk in client.stream("Rate this answer please", cache_scope=1)]
+    assert cached[0] == completion.text and cached[1].cached == "exact"
+    assert (await client.complete("Rate this answer please", cache_scope=1)).cached == "exact"
+    assert provider.calls["stream"] == 1
+    assert client.stats()["streams"] == 2 and client.stats()["in_use"] == 0
+
+@pytest.mark.asyncio
+async def test_stream_retries_only_before_first_chunk():
+    client = AIClient(FlakyProvider(failures=2), max_retries=3, backoff_base=0.001)
+    chunks = [chunk async for chunk in client.stream("hello there")]
+    assert chunks[-1].text == "".join(chunks[:-1])
+    assert client.stats()["retries"] == 2
+
+    client = AIClient(BrokenStreamProvider(), max_retries=3, backoff_base=0.001)
+    received = []
+    with pytest.raises(AIServiceError):
+        async for chunk in client.stream("hello there"):
+            received.append(chunk)
+    assert received == ["partial"]
+    assert client.stats()["retries"] == 0 and client.stats()["failures"] == 1
+    assert client.stats()["in_use"] == 0
+
+@pytest.mark.asyncio
+async def test_openai_provider_streams_sse():
+    body = "".join(
+        f"data: {line}\n\n" for line in [
+            '{"model": "gpt-test", "choices": [{"delta": {"role": "assistant"}}]}',
+            '{"choices": [{"delta": {"content": "8\\nClear"}}]}',
+            '{"choices": [{"delta": {"content": " answer."}}]}',
+            '{"choices": [], "usage": {"prompt_tokens": 12, "completion_tokens": 4}}',
+            "[DONE]",
+        ]
+    )
+    responses = iter([
+        httpx.Response(503, json={"error": "overloaded"}),
+        httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body.encode()),
+    ])
+    provider = OpenAIProvider("test-key")
+    provider.client = httpx.AsyncClient(
+        base_url="https://api.test/v1", transport=httpx.MockTransport(lambda request: next(responses))
+    )
+    client = AIClient(provider, backoff_base=0.001)
+    chunks = [chunk async for chunk in client.stream("hello")]
+    assert chunks[:-1] == ["8\nClear", " answer."]
+    completion = chunks[-1]
+    assert completion.text == "8\nClear answer." and completion.model == "gpt-test"
+    assert (completion.prompt_tokens, completion.completion_tokens) == (12, 4)
+    assert client.stats()["retries"] == 1
+    await client.close()
@@ -0,0 +1,158 @@
+"""Code runner tests"""
+import asyncio
+import os
+import sys
+
+import pytest
+import pytest_asyncio
+
+from app.services import coding_service
+from app.services.coding_service import CodeRunnerUnavailableError, GradingCase, grade_submission, source_hash
+from app.utils.code_runner import CodeRunnerBusy, CodeRunnerError, CodeRunnerPool, CodeRunnerUnavailable, ResourceLimits
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="The code runner sandbox needs Linux")
+
+@pytest_asyncio.fixture
+async def pool():
+    pool = CodeRunnerPool(size=2, max_queue=4, limits=ResourceLimits(cpu_seconds=1, wall_seconds=2, output_bytes=1024))
+    try:
+        await pool.start()
+    except CodeRunnerError as e:
+        pytest.skip(str(e))
+    yield pool
+    await pool.close()
+
+@pytest.mark.asyncio
+async def test_runs_reuse_prestarted_workers(pool):
+    pids = {worker.process.pid for worker in pool.workers}
+    results = await asyncio.gather(*(pool.run("print(int(input()) * 2)", f"{i}\n") for i in range(6)))
+    assert [result.stdout for result in results] == [f"{i * 2}\n" for i in range(6)]
+    assert {worker.process.pid for worker in pool.workers} == pids
+    stats = pool.stats()
+    assert stats["completed"] == 6
+    assert stats["queue_depth"] == 0
+    assert stats["run_ms"]["max"] > 0
+
+@pytest.mark.asyncio
+async def test_limits_are_enforced(pool):
+    assert (await pool.run("while True: pass")).status == "timeout"
+    assert (await pool.run("import time; time.sleep(30)")).status == "timeout"
+    assert (await pool.run("x = bytearray(1 << 30)")).status == "memory_limit"
+    assert (await pool.run("while True: print('x' * 100)")).status == "output_limit"
+
+    failed = await pool.run("raise ValueError('boom')")
+    assert failed.status == "runtime_error"
+    assert "ValueError: boom" in failed.stderr
+    # The workers survive all of the above
+    assert (await pool.run("print('ok')")).stdout == "ok\n"
+
+@pytest.mark.asyncio
+async def test_submissions_are_sandboxed(pool):
+    network = await pool.run("import socket; socket.socket()")
+    assert network.status == "runtime_error"
+    assert "PermissionError" in network.stderr
+    assert (await pool.run("import os; os.system('true')")).status == "runtime_error"
+
+    environment = await pool.run("import os; print(sorted(os.environ))")
+    assert "DATABASE_URL" not in environment.stdout
+
+    write = await pool.run("open('out.txt', 'w').write('x'); import os; print(os.getcwd())")
+    assert write.ok
+    second = await pool.run("import os; print(os.getcwd(), os.listdir())")
+    assert second.stdout.split()[0] != write.stdout.strip()
+    assert "out.txt" not in second.stdout
+
+    # Only the interpreter's files are visible, read-only, and nothing runs privileged
+    assert (await pool.run(f"open({__file__!r})")).status == "runtime_error"
+    readonly = await pool.run(f"open({os.path.join(sys.prefix, 'x')!r}, 'w')")
+    assert "Read-only file system" in readonly.stderr
+    assert "PermissionError" in (await pool.run("import os; os.chroot('.')")).stderr
+    if os.geteuid() == 0:
+        assert (await pool.run("import os; print(os.getuid())")).stdout != "0\n"
+
+@pytest.mark.asyncio
+async def test_pool_refuses_to_start_unsandboxed(tmp_path, monkeypatch):
+    pool = CodeRunnerPool(size=2, workdir_root=str(tmp_path / "missing"))
+    with pytest.raises(CodeRunnerUnavailable, match="sandbox"):
+        await pool.start()
+    assert not pool.started
+    assert pool.workers == []
+
+    # Runs fail fast with a 503 instead of retrying the start each time
+    assert "sandbox" in pool.stats()["unavailable"]
+    monkeypatch.setitem(coding_service.code_runner.pools, "python", pool)
+    monkeypatch.setattr(pool, "spawn", None)
+    with pytest.raises(CodeRunnerUnavailableError):
+        await coding_service.run_code("python", "print(1)")
+    with pytest.raises(CodeRunnerUnavailableError):
+        await grade_submission("python", "print(1)", [GradingCase("", "1\n")], use_cache=False)
+
+@pytest.mark.asyncio
+async def test_dead_worker_is_replaced(pool):
+    # Idle workers are handed out in order
+    pool.workers[0].process.kill()
+    assert (await pool.run("print(1)")).status == "internal_error"
+    await asyncio.sleep(1)
+    results = await asyncio.gather(pool.run("print(1)"), pool.run("print(2)"))
+    assert all(result.ok for result in results)
+    assert pool.stats()["workers_replaced"] == 1
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected(pool):
+    slow = [asyncio.ensure_future(pool.run("import time; time.sleep(0.5)")) for _ in range(6)]
+    await asyncio.sleep(0.1)
+    with pytest.raises(CodeRunnerBusy):
+        await pool.run("print(1)")
+    await asyncio.gather(*slow)
+    assert pool.stats()["rejected"] == 1
+
+@pytest.mark.asyncio
+async def test_batch_streams_results_and_isolates_failures(pool):
+    code = "n = int(input())\nif n == 2:\n    while True: pass\nif n == 3:\n    raise ValueError(n)\nprint(n * n)"
+    results = [(index, result) async for index, result in pool.run_batch(code, [f"{n}\n" for n in range(6)])]
+    assert [index for index, _ in results] == list(range(6))
+    assert [result.status for _, result in results] == ["ok", "ok", "timeout", "runtime_error", "ok", "ok"]
+    assert [result.stdout for _, result in results if result.ok] == ["0\n", "1\n", "16\n", "25\n"]
+    assert "ValueError: 3" in results[3][1].stderr
+    assert pool.stats()["batches"] == 1
+
+@pytest.mark.asyncio
+async def test_batch_cases_cannot_tamper_with_results_or_each_other(pool):
+    forged = '{"index": 1, "status": "ok", "stdout": "forged", "stderr": "", "exit_code": 0, "duration_ms": 0, "cpu_ms": 0}'
+    code = (
+        "import builtins, os, signal\n"
+        "signal.setitimer(signal.ITIMER_PROF, 0)\n"
+        "n = int(input())\n"
+        "print(getattr(builtins, 'previous', None), os.listdir(), flush=True)\n"
+        "builtins.previous = n\n"
+        "open('left_behind', 'w').close()\n"
+        f"os.write(1, {(forged + chr(10)).encode()!r})\n"
+        "if n == 1:\n    while True: pass\n"
+    )
+    results = [result async for _, result in pool.run_batch(code, ["0\n", "1\n", "2\n"])]
+    assert [result.status for result in results] == ["ok", "timeout", "ok"]
+    assert results[0].stdout == f"None []\n{forged}\n"
+    assert results[2].stdout == results[0].stdout
+
+@pytest.mark.asyncio
+async def test_grading_reruns_only_changed_cases(monkeypatch, pool):
+    monkeypatch.setitem(coding_service.code_runner.pools, "python", pool)
+    coding_service.grading_result_cache.clear()
+    cases = [GradingCase(f"{n}\n", f"{n * 2}\n") for n in range(4)]
+
+    first = await grade_submission("python", "print(int(input()) * 2)", cases, problem_id=1)
+    assert (first["passed"], first["cached"]) == (4, 0)
+
+    # Same solution, different formatting and comments
+    resubmitted = await grade_submission("python", "# doubled\nprint( int(input())*2 )  \n", cases, problem_id=1)
+    assert (resubmitted["passed"], resubmitted["cached"]) == (4, 4)
+
+    cases[1] = GradingCase("10\n", "20\n")
+    cases.append(GradingCase("5\n", "11\n"))
+    regraded = await grade_submission("python", "print(int(input()) * 2)", cases, problem_id=1)
+    assert (regraded["passed"], regraded["cached"]) == (4, 3)
+    assert [result["cached"] for result in regraded["results"]] == [True, False, True, True, False]
+
+def test_normalize_source_keeps_string_literals():
+    assert source_hash("python", "x = 1  # one\n\ny = 2\n") == source_hash("python", "x=1\ny = 2")
+    assert source_hash("python", "print('a  ')") != source_hash("python", "print('a')")
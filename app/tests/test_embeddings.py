@@ -0,0 +1,133 @@
+"""Embedding pipeline tests"""
+import os
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import select, update
+
+from app.models import Candidate, CandidateSkill, Company, EmbeddingQueueItem, Job, Skill, SkillCategory
+from app.schemas.candidate import CandidateCreate
+from app.services.candidate_service import create_candidate
+from app.services.embedding_service import (
+    CANDIDATE,
+    EmbeddingPipeline,
+    HashingEmbedder,
+    candidate_embedding_text,
+    enqueue_embeddings
+)
+from app.utils.ai_helpers import decode_embedding
+
+requires_database = pytest.mark.skipif(
+    not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL is not set"
+)
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.texts = []
+        self.fail = False
+
+    async def embed(self, texts):
+        if self.fail:
+            raise RuntimeError("provider down")
+        self.texts.extend(texts)
+        return await super().embed(texts)
+
+@pytest.mark.asyncio
+async def test_hashing_embedder_is_deterministic_and_topical():
+    embedder = HashingEmbedder(dim=256)
+    backend, same, chef = await embedder.embed([
+        candidate_embedding_text("Backend Engineer", "Python and PostgreSQL services", None, ["Python", "SQL"]),
+        candidate_embedding_text("Backend Engineer", "Python and PostgreSQL services", None, ["SQL", "Python"]),
+        candidate_embedding_text("Pastry Chef", "Croissants and laminated dough", None, []),
+    ])
+    assert np.array_equal(backend, same)
+    assert backend @ same > 0.99
+    assert abs(backend @ chef) < 0.3
+
+async def queued(db):
+    return (await db.execute(select(EmbeddingQueueItem.entity_type, EmbeddingQueueItem.entity_id))).all()
+
+@requires_database
+@pytest.mark.asyncio
+async def test_pipeline_embeds_changed_text_only(db):
+    embedder = CountingEmbedder(dim=64, batch_size=2)
+    pipeline = EmbeddingPipeline(embedder)
+    created = [
+        await create_candidate(db, CandidateCreate(
+            first_name=f"Dev{i}", last_name="Example", email=f"dev{i}@example.com",
+            current_title="Backend Engineer", summary=f"Service number {i}"
+        ))
+        for i in range(3)
+    ]
+    ids = [candidate.id for candidate in created]
+    assert sorted(entity_id for _, entity_id in await queued(db)) == ids
+
+    stats = await pipeline.drain(db)
+    assert stats["batches"] == 2
+    assert stats["embedded"] == 3
+    assert await queued(db) == []
+    rows = (await db.execute(
+        select(Candidate.id, Candidate.embedding_vector, Candidate.embedding_hash, Candidate.last_embedding_update)
+        .where(Candidate.id.in_(ids))
+    )).all()
+    assert all(len(decode_embedding(row.embedding_vector)) == 64 and row.embedding_hash for row in rows)
+
+    # Re-queued without a text change: nothing is sent to the embedder
+    embedder.texts.clear()
+    await enqueue_embeddings(db, CANDIDATE, ids)
+    await db.commit()
+    stats = await pipeline.drain(db)
+    assert stats["unchanged"] == 3 and embedder.texts == []
+
+    # Skills are part of the text
+    category = SkillCategory(name="Languages")
+    db.add(CandidateSkill(candidate_id=ids[0], skill=Skill(name="Rust", category=category), proficiency_level="expert"))
+    await enqueue_embeddings(db, CANDIDATE, ids)
+    await db.commit()
+    stats = await pipeline.drain(db)
+    assert stats["embedded"] == 1 and stats["unchanged"] == 2
+    assert "Rust" in embedder.texts[0]
+
+@requires_database
+@pytest.mark.asyncio
+async def test_pipeline_backs_off_failed_batches_and_sweeps_missing(db):
+    company = Company(name="Acme", slug="acme")
+    db.add(Job(
+        company=company, title="Data Engineer", description="Pipelines in Python",
+        employment_type="full-time", experience_level="mid", required_skills=["Python"]
+    ))
+    await db.commit()
+
+    embedder = CountingEmbedder(dim=32)
+    pipeline = EmbeddingPipeline(embedder)
+    # Inserting the job queued it already
+    assert (await db.execute(select(EmbeddingQueueItem.entity_type))).scalars().all() == ["job"]
+    assert await pipeline.enqueue_missing(db) == 0
+    embedder.fail = True
+    stats = await pipeline.drain(db)
+    assert stats["failed"] == 1
+    item = (await db.execute(select(EmbeddingQueueItem))).scalar_one()
+    assert item.attempts == 1 and item.available_at > datetime.utcnow()
+    assert "provider down" in item.last_error
+    assert (await pipeline.queue_stats(db))["retrying"] == 1
+
+    # Not due yet; once it is, the retry succeeds
+    assert (await pipeline.drain(db))["claimed"] == 0
+    embedder.fail = False
+    await db.execute(update(EmbeddingQueueItem).values(available_at=datetime.utcnow()))
+    await db.commit()
+    assert (await pipeline.drain(db))["embedded"] == 1
+    job = (await db.execute(select(Job.job_embedding, Job.embedding_hash))).one()
+    assert job.job_embedding is not None and job.embedding_hash
+    assert await pipeline.enqueue_missing(db) == 0
+
+    # Only edits to the embedded text queue the job again
+    job = (await db.execute(select(Job))).scalar_one()
+    job.status = "active"
+    await db.commit()
+    assert (await pipeline.queue_stats(db))["depth"] == 0
+    job.required_skills = ["Python", "Airflow"]
+    await db.commit()
+    assert (await pipeline.queue_stats(db))["depth"] == 1
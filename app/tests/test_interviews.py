@@ -0,0 +1,516 @@
+"""Interview streaming, live session and scheduling tests"""
+import contextlib
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from fastapi import FastAPI, WebSocketDisconnect, status
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.v1.endpoints import interviews
+from app.core.database import get_async_db, get_async_session_factory
+from app.core.exceptions import setup_exception_handlers
+from app.core.security import get_current_active_user, get_current_websocket_user
+from app.models import Candidate, Company, CompanyUser, Interview, InterviewResponse, InterviewSession, User
+from app.services import interview_service, interview_session_service
+from app.services.interview_session_service import InterviewSessionManager, LiveSession, MemorySessionStore, SessionState
+from app.services.ai_service import AIClient, AIServiceError, SemanticResponseCache, StubProvider, parse_evaluation
+from app.services.interview_service import CompanySchedule, SchedulingIndex, slot_starts
+from app.utils.interval_tree import IntervalTree
+
+requires_database = pytest.mark.skipif(
+    not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL is not set"
+)
+
+app = FastAPI()
+setup_exception_handlers(app)
+app.include_router(interviews.router, prefix="/interviews")
+
+class GradingProvider(StubProvider):
+    """Replies like a grader would: a score line, then feedback"""
+
+    @staticmethod
+    def reply(messages, model, max_tokens):
+        completion = StubProvider.reply(messages, model, max_tokens)
+        completion.text = "7/10\nClear and correct, but misses edge cases."
+        return completion
+
+class FailingProvider(StubProvider):
+    async def simulate(self, kind):
+        raise AIServiceError("invalid api key")
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+@pytest.fixture
+def override_user():
+    app.dependency_overrides[get_current_active_user] = lambda: User(id=1, email="hr@example.com", is_active=True)
+    yield
+    app.dependency_overrides.clear()
+
+def test_parse_evaluation():
+    assert parse_evaluation("Score: 8.5\nGood structure.") == (8.5, "Good structure.")
+    assert parse_evaluation("6/10 - vague on complexity") == (6.0, "vague on complexity")
+    assert parse_evaluation("Solid answer overall") == (None, "Solid answer overall")
+    assert parse_evaluation("42 is the answer") == (None, "42 is the answer")
+
+@pytest.mark.asyncio
+async def test_failure_before_first_chunk_is_an_http_error(monkeypatch, override_user):
+    async def get_interview(db, interview_id):
+        return Interview(id=interview_id, company_id=1)
+
+    monkeypatch.setattr(interview_service, "get_interview", get_interview)
+    monkeypatch.setattr(interview_service, "ai_client", AIClient(FailingProvider()))
+    app.dependency_overrides[get_async_db] = lambda: None
+    # Superusers skip the membership query, so no database is needed
+    app.dependency_overrides[get_current_active_user] = lambda: User(id=1, email="admin@example.com", is_superuser=True)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post(
+            "/interviews/1/responses/evaluate/stream", json={"question": "Why?", "answer": "Because."}
+        )
+    assert response.status_code == 502
+    assert response.json()["code"] == "AI_SERVICE_ERROR"
+
+@requires_database
+@pytest.mark.asyncio
+async def test_evaluation_and_follow_up_stream_then_persist_once(db_engine, db, monkeypatch, override_user):
+    company = Company(name="Acme", slug="acme")
+    candidate = Candidate(first_name="Ada", last_name="Lovelace", email="ada@example.com")
+    member, outsider = (
+        User(email=f"{name}@example.com", first_name="Grace", last_name="Hopper", hashed_password="x")
+        for name in ("hr", "outsider")
+    )
+    db.add_all([company, candidate, member, outsider])
+    await db.flush()
+    interview = Interview(company_id=company.id, candidate_id=candidate.id, title="Backend screen")
+    db.add_all([interview, CompanyUser(company_id=company.id, user_id=member.id, role="hr_manager")])
+    await db.commit()
+
+    monkeypatch.setattr(interview_service, "ai_client", AIClient(GradingProvider(), cache=SemanticResponseCache()))
+    app.dependency_overrides[get_current_active_user] = lambda: outsider
+
+    async def get_test_db():
+        yield db
+
+    app.dependency_overrides[get_async_db] = get_test_db
+    app.dependency_overrides[get_async_session_factory] = lambda: async_sessionmaker(db_engine, expire_on_commit=False)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post(f"/interviews/{interview.id}/responses/evaluate/stream", json={
+            "question": "Why?", "answer": "Because."
+        })
+        assert response.status_code == 403
+
+        app.dependency_overrides[get_current_active_user] = lambda: member
+        async with client.stream(
+            "POST",
+            f"/interviews/{interview.id}/responses/evaluate/stream",
+            json={"question": "How do you find the mode of a list?", "answer": "Count with a hash map."}
+        ) as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            events = parse_events((await response.aread()).decode())
+
+        tokens = [data["text"] for event, data in events if event == "token"]
+        assert len(tokens) > 1
+        assert events[-1][0] == "result"
+        result = events[-1][1]
+        assert result["score"] == 7.0 and result["feedback"] == "Clear and correct, but misses edge cases."
+        assert "".join(tokens) == "7/10\nClear and correct, but misses edge cases."
+
+        app.dependency_overrides[get_current_active_user] = lambda: outsider
+        response = await client.post(f"/interviews/{interview.id}/responses/{result['id']}/follow-up/stream")
+        assert response.status_code == 403
+        app.dependency_overrides[get_current_active_user] = lambda: member
+        response = await client.post(f"/interviews/{interview.id}/responses/{result['id']}/follow-up/stream")
+        events = parse_events(response.text)
+        assert events[-1][0] == "result" and events[-1][1]["follow_up_question"]
+
+        response = await client.post(f"/interviews/{interview.id + 1}/responses/evaluate/stream", json={
+            "question": "Why?", "answer": "Because."
+        })
+        assert response.status_code == 404
+
+    db.expire_all()
+    saved = (await db.scalars(select(InterviewResponse))).all()
+    assert len(saved) == 1
+    assert saved[0].score == 7.0 and saved[0].follow_up_question == events[-1][1]["follow_up_question"]
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed = None
+
+    async def send_json(self, message):
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed = code
+
+class OfflineSessionManager(InterviewSessionManager):
+    """Keeps flushed state in the store only"""
+
+    def __init__(self, **kwargs):
+        super().__init__(MemorySessionStore(), **kwargs)
+        self.writes = []
+
+    async def load(self, interview_id):
+        return await self.store.load(interview_id)
+
+    async def write(self, snapshots, answers, status_changes):
+        self.writes.append((snapshots, answers, [state.status for state in status_changes]))
+
+def test_session_events_apply_in_seq_order():
+    manager = InterviewSessionManager(MemorySessionStore(), max_draft_chars=100)
+    live = manager.sessions[1] = LiveSession(SessionState(1))
+    for seq, text in enumerate(["I", "I w", "I would use a heap"], start=1):
+        assert manager.handle(live, {"type": "draft", "seq": seq, "question_id": "q1", "text": text}) == {
+            "type": "ack", "seq": seq
+        }
+    assert live.state.drafts == {"q1": "I would use a heap"} and manager.dirty == {1}
+
+    # Replays are acked without being applied again; gaps ask for a replay
+    assert manager.handle(live, {"type": "draft", "seq": 2, "question_id": "q1", "text": "I w"})["type"] == "ack"
+    assert live.state.drafts["q1"] == "I would use a heap"
+    assert manager.handle(live, {"type": "navigate", "seq": 9, "question_index": 1}) == {"type": "resync", "seq": 3}
+
+    # Invalid events are rejected but still consume their seq
+    assert manager.handle(live, {"type": "draft", "seq": 4, "question_id": "q1", "text": "x" * 101})["type"] == "error"
+    assert manager.handle(live, {"type": "answer", "seq": 5, "question_id": "q1", "text": "A heap"})["type"] == "error"
+    assert manager.handle(live, {"type": "answer", "seq": 6, "question_id": "q1", "question": "Top k?", "text": "A heap"})[
+        "type"
+    ] == "ack"
+    assert live.state.drafts == {} and live.state.answered == ["q1"]
+    assert live.answers == [{"question": "Top k?", "answer": "A heap", "interview_id": 1, "session_seq": 6}]
+
+    assert manager.handle(live, {"type": "complete", "seq": 7}) == {"type": "ack", "seq": 7}
+    assert live.state.status == "completed" and live.status_changed and manager.wake.is_set()
+    assert manager.handle(live, {"type": "navigate", "seq": 8, "question_index": 2})["type"] == "error"
+    assert manager.stats()["events"] == 5 and manager.stats()["duplicates"] == 1 and manager.stats()["rejected"] == 3
+
+def test_session_caps_unsubmitted_drafts():
+    manager = InterviewSessionManager(MemorySessionStore(), max_drafts=2)
+    live = manager.sessions[1] = LiveSession(SessionState(1))
+    for seq, question_id in enumerate(["q1", "q2", "q3"], start=1):
+        manager.handle(live, {"type": "draft", "seq": seq, "question_id": question_id, "text": "..."})
+    assert set(live.state.drafts) == {"q1", "q2"} and manager.stats()["rejected"] == 1
+    # Editing a held draft, or submitting one to make room, still works
+    assert manager.handle(live, {"type": "draft", "seq": 4, "question_id": "q2", "text": "A heap"})["type"] == "ack"
+    manager.handle(live, {"type": "answer", "seq": 5, "question_id": "q1", "question": "Top k?", "text": "A heap"})
+    assert manager.handle(live, {"type": "draft", "seq": 6, "question_id": "q3", "text": "..."})["type"] == "ack"
+
+def test_websocket_session_requires_company_membership(monkeypatch):
+    async def get_interview(db, interview_id):
+        return Interview(id=interview_id, company_id=1, status="scheduled")
+
+    async def is_company_member(db, user, company_id):
+        return False
+
+    session_app = FastAPI()
+    session_app.include_router(interviews.router, prefix="/interviews")
+    session_app.dependency_overrides[get_current_websocket_user] = lambda: User(id=2, email="outsider@example.com")
+    session_app.dependency_overrides[get_async_session_factory] = lambda: contextlib.nullcontext
+    monkeypatch.setattr(interview_service, "get_interview", get_interview)
+    monkeypatch.setattr(interviews, "is_company_member", is_company_member)
+    with TestClient(session_app) as client:
+        with pytest.raises(WebSocketDisconnect) as rejected:
+            with client.websocket_connect("/interviews/7/session"):
+                pass
+    assert rejected.value.code == status.WS_1008_POLICY_VIOLATION
+
+def test_websocket_session_resumes_after_reconnect(monkeypatch):
+    manager = OfflineSessionManager(flush_interval=0.01)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        manager.start()
+        yield
+        await manager.stop()
+
+    session_app = FastAPI(lifespan=lifespan)
+    session_app.include_router(interviews.router, prefix="/interviews")
+    # Superusers skip the membership query, so no database is needed
+    session_app.dependency_overrides[get_current_websocket_user] = lambda: User(
+        id=1, email="admin@example.com", is_superuser=True
+    )
+    session_app.dependency_overrides[get_async_session_factory] = lambda: contextlib.nullcontext
+
+    async def get_interview(db, interview_id):
+        return Interview(id=interview_id, company_id=1, status="scheduled")
+
+    monkeypatch.setattr(interview_service, "get_interview", get_interview)
+    monkeypatch.setattr(interview_session_service, "interview_session_manager", manager)
+
+    def receive_until(websocket, kind):
+        while True:
+            message = websocket.receive_json()
+            if message["type"] == kind:
+                return message
+
+    with TestClient(session_app) as client:
+        with client.websocket_connect("/interviews/7/session") as websocket:
+            assert websocket.receive_json()["seq"] == 0
+            for seq in range(1, 51):
+                websocket.send_json({"type": "draft", "seq": seq, "question_id": "q1", "text": "x" * seq})
+                assert receive_until(websocket, "ack")["seq"] == seq
+            websocket.send_text("not json")
+            assert receive_until(websocket, "error")["message"] == "Events must be JSON objects"
+            assert receive_until(websocket, "saved")["seq"] == 50
+
+            # A second connection for the same interview takes over
+            with client.websocket_connect("/interviews/7/session") as replacement:
+                assert replacement.receive_json()["state"]["drafts"] == {"q1": "x" * 50}
+                assert receive_until(websocket, "superseded")
+
+        # Evicted once disconnected and flushed; the next connection resumes from the store
+        for _ in range(100):
+            client.portal.call(manager.flush)
+            if not manager.sessions:
+                break
+        assert not manager.sessions
+        with client.websocket_connect("/interviews/7/session") as websocket:
+            resumed = websocket.receive_json()
+            assert resumed["seq"] == 50 and resumed["state"]["started_at"]
+            websocket.send_json({"type": "draft", "seq": 50, "question_id": "q1", "text": "replayed"})
+            assert receive_until(websocket, "ack")["seq"] == 50
+            websocket.send_json({"type": "complete", "seq": 51})
+            assert receive_until(websocket, "saved")["seq"] == 51
+
+    # 51 events, a handful of writes; the start and the end each reach the interview row
+    assert len(manager.writes) < 20
+    assert [status for _, _, statuses in manager.writes for status in statuses] == ["in_progress", "completed"]
+
+@requires_database
+@pytest.mark.asyncio
+async def test_session_flushes_in_batches_and_resumes_from_database(db_engine, db):
+    company = Company(name="Acme", slug="acme")
+    candidate = Candidate(first_name="Ada", last_name="Lovelace", email="ada@example.com")
+    db.add_all([company, candidate])
+    await db.flush()
+    interview = Interview(company_id=company.id, candidate_id=candidate.id, title="Backend screen")
+    db.add(interview)
+    await db.commit()
+    interview_id = interview.id
+
+    session_factory = async_sessionmaker(db_engine, expire_on_commit=False)
+    manager = InterviewSessionManager(MemorySessionStore(), session_factory=session_factory)
+    websocket = FakeWebSocket()
+    live = await manager.connect(interview, websocket)
+    for seq in range(1, 101):
+        manager.handle(live, {"type": "draft", "seq": seq, "question_id": "q1", "text": f"draft {seq}"})
+    manager.handle(live, {"type": "answer", "seq": 101, "question_id": "q1", "question": "Top k?", "text": "A heap"})
+    assert await manager.flush() == 1
+    assert websocket.sent[-1] == {"type": "saved", "seq": 101}
+
+    db.expire_all()
+    row = await db.get(InterviewSession, interview_id)
+    assert row.seq == 101 and row.state["answered"] == ["q1"]
+    assert (await db.scalar(select(InterviewResponse.answer))) == "A heap"
+    # A flush retried after its commit landed doesn't save the answer twice
+    await manager.write(
+        {interview_id: live.state.to_dict()},
+        [{"question": "Top k?", "answer": "A heap", "interview_id": interview_id, "session_seq": 101}],
+        []
+    )
+    assert (await db.scalar(select(func.count()).select_from(InterviewResponse))) == 1
+    await db.refresh(interview)
+    assert interview.status == "in_progress" and interview.started_at is not None
+
+    # A new worker (empty store) resumes from the database
+    manager.disconnect(live, websocket)
+    other = InterviewSessionManager(MemorySessionStore(), session_factory=session_factory)
+    resumed = await other.connect(interview, FakeWebSocket())
+    assert resumed.state.seq == 101 and resumed.state.answered == ["q1"]
+    other.handle(resumed, {"type": "complete", "seq": 102})
+    await other.flush()
+
+    # A stale snapshot from the first worker does not overwrite newer state
+    live.state.seq = 101
+    manager.dirty.add(interview_id)
+    manager.sessions[interview_id] = live
+    await manager.flush()
+    db.expire_all()
+    row = await db.get(InterviewSession, interview_id)
+    assert row.seq == 102 and row.state["status"] == "completed"
+    await db.refresh(interview)
+    assert interview.status == "completed" and interview.completed_at is not None
+    assert (await db.scalar(select(func.count()).select_from(InterviewResponse))) == 1
+
+    # A store left behind by a failed store write loses to the newer row
+    lagging = InterviewSessionManager(MemorySessionStore(), session_factory=session_factory)
+    await lagging.store.save_many({interview_id: {**row.state, "seq": 101, "status": "in_progress"}})
+    snapshot = await lagging.load(interview_id)
+    assert snapshot["seq"] == 102 and snapshot["status"] == "completed"
+
+def test_interval_tree_matches_brute_force():
+    rng = random.Random(7)
+    tree = IntervalTree()
+    intervals = set()
+    for key in range(400):
+        start = rng.randrange(1000)
+        interval = (start, start + rng.randrange(1, 60), key)
+        tree.add(*interval)
+        intervals.add(interval)
+        if key % 3 == 0:
+            removed = rng.choice(sorted(intervals))
+            assert tree.remove(*removed)
+            intervals.discard(removed)
+    assert not tree.remove(0, 1, "missing")
+    assert len(tree) == len(intervals) and list(tree) == sorted(intervals)
+    for _ in range(200):
+        start = rng.randrange(1050)
+        end = start + rng.randrange(1, 40)
+        expected = sorted(i for i in intervals if i[0] < end and start < i[1])
+        assert list(tree.overlapping(start, end)) == expected
+        assert tree.overlaps(start, end) == bool(expected)
+    with pytest.raises(ValueError):
+        tree.add(5, 5)
+
+def test_company_schedule_conflicts_and_free_windows():
+    hour = 3600
+    schedule = CompanySchedule(company_id=1)
+    schedule.book(10, 9 * hour, 10 * hour, [1, 2])
+    schedule.book(11, 13 * hour, 14 * hour, [2])
+    schedule.book(12, 11 * hour, 12 * hour, [3])
+
+    # Half-open: back-to-back interviews don't clash
+    assert schedule.conflicts([1, 2], 10 * hour, 11 * hour) == {}
+    assert schedule.conflicts([1, 2, 3], 9 * hour + 1800, 13 * hour + 60) == {1: [10], 2: [10, 11], 3: [12]}
+    assert schedule.conflicts([1], 9 * hour, 10 * hour, exclude=10) == {}
+
+    windows = schedule.free_windows([1, 2, 3], 8 * hour, 17 * hour, hour)
+    assert windows == [(8 * hour, 9 * hour), (10 * hour, 11 * hour), (12 * hour, 13 * hour), (14 * hour, 17 * hour)]
+    assert slot_starts(windows[-1:], hour, 30 * 60, limit=4) == [14 * hour, 14 * hour + 1800, 15 * hour, 15 * hour + 1800]
+    assert slot_starts([(8 * hour + 60, 10 * hour)], hour, 30 * 60, limit=4) == [8 * hour + 1800, 9 * hour]
+
+    schedule.book(10, 15 * hour, 16 * hour, [1])  # Moved, and interviewer 2 dropped
+    assert schedule.conflicts([2], 9 * hour, 10 * hour) == {}
+    schedule.remove(11)
+    assert schedule.free_windows([2], 8 * hour, 17 * hour, hour) == [(8 * hour, 17 * hour)]
+
+@requires_database
+@pytest.mark.asyncio
+async def test_scheduling_rejects_double_booking(db, monkeypatch, override_user):
+    company = Company(name="Acme", slug="acme")
+    candidate = Candidate(first_name="Ada", last_name="Lovelace", email="ada@example.com")
+    interviewers = [
+        User(email=f"interviewer{i}@example.com", first_name="Grace", last_name="Hopper", hashed_password="x")
+        for i in range(3)
+    ]
+    outsider = User(email="outsider@example.com", first_name="Alan", last_name="Turing", hashed_password="x")
+    db.add_all([company, candidate, *interviewers, outsider])
+    await db.flush()
+    db.add_all([CompanyUser(company_id=company.id, user_id=user.id, role="interviewer") for user in interviewers])
+    await db.commit()
+    # Detached copies: a rejected booking rolls back, expiring the loaded users
+    member, outsider = (User(id=user.id, email=user.email, is_active=True) for user in (interviewers[0], outsider))
+    app.dependency_overrides[get_current_active_user] = lambda: member
+    first, second, third = (user.id for user in interviewers)
+    company_id, candidate_id = company.id, candidate.id  # A rejected booking rolls back, expiring these
+
+    monkeypatch.setattr(interview_service, "scheduling_index", SchedulingIndex())
+
+    async def get_test_db():
+        yield db
+
+    app.dependency_overrides[get_async_db] = get_test_db
+    day = (datetime.utcnow() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def booking(hour, interviewer_ids, duration_minutes=60):
+        return {
+            "title": "Backend screen",
+            "candidate_id": candidate_id,
+            "company_id": company_id,
+            "scheduled_at": (day + timedelta(hours=hour)).isoformat(),
+            "duration_minutes": duration_minutes,
+            "interviewer_ids": interviewer_ids,
+        }
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/interviews/", json=booking(10, [first, second]))
+        assert response.status_code == 200
+        booked = response.json()["data"]
+        assert booked["interviewer_ids"] == sorted([first, second])
+
+        response = await client.post("/interviews/", json=booking(10.5, [second, third]))
+        assert response.status_code == 409
+        assert response.json()["code"] == "CONFLICT"
+        response = await client.post("/interviews/", json=booking(11, [second, third]))
+        assert response.status_code == 200
+        later = response.json()["data"]
+
+        response = await client.post("/interviews/", json=booking(12, [first, 10 ** 6]))
+        assert response.status_code == 400
+
+        response = await client.get("/interviews/availability", params={
+            "company_id": company_id,
+            "interviewer_ids": [first, second, third],
+            "start": (day + timedelta(hours=9)).isoformat(),
+            "end": (day + timedelta(hours=14)).isoformat(),
+            "duration_minutes": 60,
+        })
+        availability = response.json()["data"]
+        assert [(w["start"][11:16], w["end"][11:16]) for w in availability["windows"]] == [
+            ("09:00", "10:00"), ("12:00", "14:00")
+        ]
+        assert [slot[11:16] for slot in availability["slots"]] == ["09:00", "12:00", "12:30", "13:00"]
+
+        # Moving onto the other interview clashes; moving it past the other doesn't
+        response = await client.put(f"/interviews/{booked['id']}/schedule", json={
+            "scheduled_at": (day + timedelta(hours=11)).isoformat()
+        })
+        assert response.status_code == 409
+        response = await client.put(f"/interviews/{booked['id']}/schedule", json={
+            "scheduled_at": (day + timedelta(hours=12)).isoformat(), "interviewer_ids": [first, third]
+        })
+        assert response.status_code == 200
+        assert response.json()["data"]["interviewer_ids"] == sorted([first, third])
+
+        # Only members of the company can book, look up or change its interviews
+        app.dependency_overrides[get_current_active_user] = lambda: outsider
+        assert (await client.post("/interviews/", json=booking(15, [first]))).status_code == 403
+        assert (await client.get("/interviews/availability", params={
+            "company_id": company_id,
+            "interviewer_ids": [first],
+            "start": (day + timedelta(hours=9)).isoformat(),
+            "end": (day + timedelta(hours=14)).isoformat(),
+        })).status_code == 403
+        assert (await client.put(f"/interviews/{later['id']}/schedule", json={
+            "scheduled_at": (day + timedelta(hours=15)).isoformat()
+        })).status_code == 403
+        assert (await client.post(f"/interviews/{later['id']}/cancel")).status_code == 403
+        app.dependency_overrides[get_current_active_user] = lambda: member
+
+        response = await client.post(f"/interviews/{later['id']}/cancel")
+        assert response.json()["data"]["status"] == "cancelled"
+        response = await client.post("/interviews/", json=booking(11, [second, third]))
+        assert response.status_code == 200
+
+    # Another worker's index loads the same bookings, and the database check
+    # catches a booking its own index hasn't seen yet
+    other = SchedulingIndex()
+    schedule = await other.get(db, company_id)
+    assert len(schedule.bookings) == 2
+    monkeypatch.setattr(interview_service, "scheduling_index", other)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/interviews/", json=booking(15, [first]))
+        assert response.status_code == 200
+    stale = CompanySchedule(company_id)
+    stale.synced_at = datetime.utcnow()
+    monkeypatch.setattr(other, "schedules", {company_id: stale})
+
+    async def skip_sync(db, schedule):
+        pass
+
+    monkeypatch.setattr(other, "sync", skip_sync)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/interviews/", json=booking(15.5, [first]))
+        assert response.status_code == 409
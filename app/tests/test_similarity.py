@@ -0,0 +1,434 @@
+"""Similarity service tests"""
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy import select, update
+
+from app.models import Candidate, CandidateSkill, Company, Job, JobApplication, JobRecommendation, Skill, SkillCategory
+from app.services.job_service import score_job_applications
+from app.services import recommendation_service
+from app.services.recommendation_service import RecommendationRefresher
+from app.models import CandidateMinHash
+from app.schemas.candidate import CandidateCreate
+from app.services.candidate_service import create_candidate, import_candidates
+from app.services.similarity_service import (
+    CandidateDeduplicator,
+    CandidateEmbeddingIndex,
+    FingerprintIndex,
+    IVFIndex,
+    PlagiarismDetector,
+    Winnower,
+    candidate_deduplicator,
+    profile_shingles
+)
+from app.utils.ai_helpers import decode_embedding, encode_embedding
+from app.utils.minhash import DisjointSet, MinHasher, estimate_jaccard
+from app.utils.similarity_scoring import CandidateBatch, score_candidates
+
+requires_database = pytest.mark.skipif(
+    not os.getenv("TEST_DATABASE_URL"), reason="TEST_DATABASE_URL is not set"
+)
+
+def clustered_vectors(n, dim=32, clusters=50, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(clusters, size=n)] + 0.3 * rng.normal(size=(n, dim))).astype(np.float32)
+
+def brute_force(vectors, query, k):
+    vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return set(np.argsort(-(vectors @ (query / np.linalg.norm(query))))[:k].tolist())
+
+def test_embedding_round_trip():
+    vector = [0.5, -1.25, 3.0]
+    packed = encode_embedding(vector)
+    assert len(packed) == 12
+    assert decode_embedding(packed).tolist() == vector
+
+def test_ivf_index_recall():
+    vectors = clustered_vectors(5000)
+    index = IVFIndex(n_probe=8)
+    index.build(range(len(vectors)), vectors)
+    assert len(index.centroids) == 70
+
+    queries = clustered_vectors(50, seed=1)
+    recall = np.mean([
+        len({vector_id for vector_id, _ in index.search(query, k=10)} & brute_force(vectors, query, 10)) / 10
+        for query in queries
+    ])
+    assert recall >= 0.9
+    # Probing every cell is an exact scan
+    exact = index.search(queries[0], k=10, n_probe=len(index.centroids))
+    assert {vector_id for vector_id, _ in exact} == brute_force(vectors, queries[0], 10)
+    assert [score for _, score in exact] == sorted((score for _, score in exact), reverse=True)
+
+def test_ivf_index_upsert_and_remove():
+    vectors = clustered_vectors(2000)
+    index = IVFIndex()
+    index.build(range(len(vectors)), vectors)
+    query = vectors[7]
+
+    index.add([7], -query[None, :])
+    assert 7 not in {vector_id for vector_id, _ in index.search(query, k=20)}
+    index.add([7], query[None, :])
+    assert index.search(query, k=1)[0][0] == 7
+    index.remove([7])
+    assert len(index) == 1999
+    assert 7 not in {vector_id for vector_id, _ in index.search(query, k=20)}
+
+@requires_database
+@pytest.mark.asyncio
+async def test_top_candidates_for_job_refreshes_incrementally(db):
+    vectors = clustered_vectors(40, dim=8)
+    company = Company(name="Acme", slug="acme")
+    job = Job(
+        company=company, title="Engineer", description="Build things", employment_type="full-time",
+        experience_level="mid", job_embedding=encode_embedding(vectors[3])
+    )
+    candidates = [
+        Candidate(
+            first_name=f"Test{i}", last_name="Candidate", email=f"candidate{i}@example.com",
+            embedding_vector=encode_embedding(vector), last_embedding_update=datetime.utcnow()
+        )
+        for i, vector in enumerate(vectors)
+    ]
+    db.add_all([job, *candidates])
+    await db.commit()
+
+    index = CandidateEmbeddingIndex(refresh_seconds=0)
+    matches = await index.search(db, decode_embedding(job.job_embedding), k=5)
+    assert matches[0] == (candidates[3].id, pytest.approx(1.0))
+    assert len(index.index) == 40
+
+    candidates[3].is_active = False
+    candidates[4].embedding_vector = encode_embedding(vectors[3] * 2)
+    await db.commit()
+    matches = await index.search(db, vectors[3], k=5)
+    assert candidates[3].id not in {candidate_id for candidate_id, _ in matches}
+    assert matches[0] == (candidates[4].id, pytest.approx(1.0))
+
+    # Stamped before that refresh but committed after it, like an embedding
+    # written while a provider call was in flight
+    await db.execute(
+        update(Candidate).where(Candidate.id == candidates[4].id)
+        .values(is_active=False, updated_at=index.synced_at - timedelta(seconds=5))
+    )
+    await db.commit()
+    matches = await index.search(db, vectors[3], k=5)
+    assert candidates[4].id not in {candidate_id for candidate_id, _ in matches}
+
+class JobStub:
+    required_skills = ["Python", "SQL"]
+    preferred_skills = ["Rust"]
+    min_years_experience = 4
+    max_years_experience = 8
+    salary_min = 100000
+    salary_max = 150000
+    remote_work_type = "remote"
+    is_remote = True
+
+def test_score_candidates_components():
+    batch = CandidateBatch.from_rows([
+        (1, ["python", "SQL", "Rust"], 5, 120000, 140000, "remote"),
+        (2, ["Python"], 2, 200000, None, "onsite"),
+        (3, [], None, None, None, None),
+        (4, ["Go"], 16, None, 150000, "hybrid"),
+    ])
+    scores = score_candidates(JobStub(), batch)
+
+    assert scores.components["required_skills"].tolist() == [1.0, 0.5, 0.0, 0.0]
+    assert scores.components["preferred_skills"].tolist() == [1.0, 0.0, 0.0, 0.0]
+    assert scores.components["experience"].tolist() == [1.0, 0.5, 0.5, 0.5]
+    assert scores.components["salary"].tolist() == pytest.approx([1.0, 0.75, 0.5, 1.0])
+    assert scores.components["remote"].tolist() == [1.0, 0.5, 0.5, 0.75]
+    assert scores.total[0] == 100.0
+    assert [candidate_id for candidate_id, _ in scores.top(2)] == [1, 2]
+
+def test_score_candidates_skips_unspecified_components():
+    job = JobStub()
+    job.required_skills = job.preferred_skills = None
+    job.salary_min = job.salary_max = None
+    job.remote_work_type, job.is_remote = None, False
+    scores = score_candidates(job, CandidateBatch.from_rows([(1, ["Go"], 6, None, None, None)]))
+    assert set(scores.components) == {"experience"}
+    assert scores.total.tolist() == [100.0]
+
+@requires_database
+@pytest.mark.asyncio
+async def test_score_job_applications(db):
+    python = Skill(name="Python", category=SkillCategory(name="Programming Languages"))
+    job = Job(
+        company=Company(name="Acme", slug="acme"), title="Engineer", description="Build things",
+        employment_type="full-time", experience_level="mid", required_skills=["python"], min_years_experience=4
+    )
+    strong = Candidate(first_name="Ada", last_name="Lovelace", email="ada@example.com", years_of_experience=6)
+    strong.skills = [CandidateSkill(skill=python, proficiency_level="expert")]
+    weak = Candidate(first_name="No", last_name="Skills", email="noskills@example.com", years_of_experience=2)
+    applications = [JobApplication(job=job, candidate=candidate, applied_at=datetime.utcnow()) for candidate in (strong, weak)]
+    db.add_all(applications)
+    await db.commit()
+
+    assert await score_job_applications(db, job.id) == 2
+    await db.refresh(applications[0])
+    await db.refresh(applications[1])
+    assert applications[0].ai_match_score == 100.0
+    assert applications[1].ai_match_score == pytest.approx(100 * 0.2 / 0.65 * 0.5, abs=0.01)
+
+@requires_database
+@pytest.mark.asyncio
+async def test_recommendations_refresh_incrementally(db):
+    company = Company(name="Acme", slug="acme")
+    jobs = [
+        Job(
+            company=company, title=f"Engineer {i}", description="Build things", employment_type="full-time",
+            experience_level="mid", status="active", min_years_experience=10 * (i + 1)
+        )
+        for i in range(2)
+    ]
+    candidates = [
+        Candidate(first_name=f"Test{i}", last_name="Candidate", email=f"candidate{i}@example.com", years_of_experience=i)
+        for i in range(1, 6)
+    ]
+    db.add_all([*jobs, *candidates])
+    await db.commit()
+
+    # Without an overlap, so each refresh only sees the changes made since the last one
+    refresher = RecommendationRefresher(top_k=3, sync_overlap=timedelta(0))
+    assert (await refresher.refresh(db))["jobs_rescored"] == 2
+
+    async def ranked(job):
+        return (await db.scalars(
+            select(JobRecommendation.candidate_id).where(JobRecommendation.job_id == job.id).order_by(JobRecommendation.rank)
+        )).all()
+
+    assert await ranked(jobs[0]) == [candidates[4].id, candidates[3].id, candidates[2].id]
+
+    # A new strong candidate is merged in without rescoring either job
+    newcomer = Candidate(first_name="New", last_name="Candidate", email="new@example.com", years_of_experience=30)
+    db.add(newcomer)
+    await db.commit()
+    stats = await refresher.refresh(db)
+    assert (stats["jobs_rescored"], stats["jobs_merged"], stats["candidates_changed"]) == (0, 2, 1)
+    assert await ranked(jobs[0]) == [newcomer.id, candidates[4].id, candidates[3].id]
+
+    # Leaving the pool vacates a full list's slot, so that job is rescored
+    newcomer.availability_status = "hired"
+    await db.commit()
+    stats = await refresher.refresh(db)
+    assert stats["jobs_rescored"] == 2
+    assert await ranked(jobs[0]) == [candidates[4].id, candidates[3].id, candidates[2].id]
+
+    jobs[1].status = "closed"
+    await db.commit()
+    await refresher.refresh(db)
+    assert await ranked(jobs[1]) == []
+    assert await refresher.refresh(db) == {"jobs_rescored": 0, "jobs_merged": 0, "candidates_changed": 0}
+
+    # A change stamped before the last refresh but committed after it is still read
+    await db.execute(
+        update(Candidate).where(Candidate.id == candidates[0].id)
+        .values(years_of_experience=40, updated_at=refresher.synced_at - timedelta(seconds=5))
+    )
+    await db.commit()
+    assert (await refresher.refresh(db))["candidates_changed"] == 0
+    refresher.sync_overlap = timedelta(seconds=30)
+    await refresher.refresh(db)
+    assert (await ranked(jobs[0]))[0] == candidates[0].id
+
+def test_merge_rescores_a_full_list_when_a_listed_candidate_falls_below_its_cutoff(monkeypatch):
+    refresher = RecommendationRefresher(top_k=2)
+    job = SimpleNamespace(id=1)
+    batch = CandidateBatch.from_rows([(2, [], None, None, None, None)])
+    stored = {1: {1: 0.9, 2: 0.8}}  # Candidate 3, unchanged at 0.7, isn't listed
+
+    def rescored(score):
+        return lambda job, batch: SimpleNamespace(ids=np.array([2]), total=np.array([score]))
+
+    # Candidate 3 may now rank second
+    monkeypatch.setattr(recommendation_service, "score_candidates", rescored(0.5))
+    assert refresher.merge_scores([job], stored, {2}, batch) == ({}, {1})
+    # Still above every unlisted candidate
+    monkeypatch.setattr(recommendation_service, "score_candidates", rescored(0.85))
+    assert refresher.merge_scores([job], stored, {2}, batch) == ({1: [(1, 0.9), (2, 0.85)]}, set())
+    # Left the pool
+    assert refresher.merge_scores([job], stored, {2}, CandidateBatch.from_rows([])) == ({}, {1})
+
+TWO_SUM = """
+def solve(nums, target):
+    seen = {}
+    for i, n in enumerate(nums):
+        if target - n in seen:
+            return [seen[target - n], i]
+        seen[n] = i
+    return []
+
+print(solve(list(map(int, input().split())), int(input())))
+"""
+
+TWO_SUM_RENAMED = """
+# My own solution!
+def find_pair(values, goal):
+    lookup = {}
+
+    for idx, v in enumerate(values):
+        if goal - v in lookup:  # found it
+            return [lookup[goal - v], idx]
+        lookup[v] = idx
+    return []
+print(find_pair(list(map(int, input().split())), int(input())))
+"""
+
+TWO_POINTERS = """
+n = int(input())
+arr = sorted(map(int, input().split()))
+lo, hi = 0, len(arr) - 1
+while lo < hi:
+    total = arr[lo] + arr[hi]
+    if total == n:
+        break
+    elif total < n:
+        lo += 1
+    else:
+        hi -= 1
+print(lo, hi)
+"""
+
+def test_winnowing_ignores_renames_and_formatting():
+    winnower = Winnower()
+    original = winnower.fingerprint("python", TWO_SUM)
+    assert set(original) == set(winnower.fingerprint("python", TWO_SUM_RENAMED))
+    unrelated = winnower.fingerprint("python", TWO_POINTERS)
+    assert len(set(original) & set(unrelated)) < len(original) / 4
+
+def test_plagiarism_detector_flags_copies():
+    detector = PlagiarismDetector(threshold=0.5)
+    assert detector.check_submission(1, 1, "python", TWO_SUM) == []
+    assert detector.check_submission(1, 2, "python", TWO_POINTERS) == []
+    matches = detector.check_submission(1, 3, "python", TWO_SUM_RENAMED)
+    assert [match.submission_id for match in matches] == [1]
+    assert matches[0].similarity == 1.0
+    # Other problems have their own index
+    assert detector.check_submission(2, 4, "python", TWO_SUM) == []
+
+def test_fingerprint_index_skips_common_fingerprints():
+    index = FingerprintIndex(max_document_frequency=0.25, min_postings=3)
+    for submission_id in range(400):
+        # 1 and 2 are in every submission, 7 and 8 in a fifth of them
+        shared = {7: 3, 8: 4} if submission_id % 5 == 0 else {}
+        index.add(submission_id, {1: 1, 2: 1, 1000 + submission_id: 2, **shared})
+    assert index.posting_limit() == 100
+    matches = index.query({1: 1, 2: 1, 7: 1, 8: 2}, min_shared=1)
+    assert len(matches) == 80
+    assert all(match.shared == 2 and match.submission_id % 5 == 0 for match in matches)
+    index.ignore([7])
+    assert index.query({1: 1, 2: 1, 7: 1, 8: 2}, min_shared=2) == []
+
+@requires_database
+@pytest.mark.asyncio
+async def test_plagiarism_index_is_rebuilt_from_stored_fingerprints(db):
+    detector = PlagiarismDetector(threshold=0.5)
+    assert await detector.check_stored_submission(db, 1, 1, "python", TWO_SUM) == []
+    assert await detector.check_stored_submission(db, 1, 2, "python", TWO_POINTERS) == []
+    await db.commit()
+    assert await detector.check_stored_submission(db, 1, 3, "python", TWO_SUM) != []
+    await db.rollback()
+
+    # A fresh process sees the committed submissions, and not the rolled-back one
+    restarted = PlagiarismDetector(threshold=0.5)
+    matches = await restarted.check_stored_submission(db, 1, 4, "python", TWO_SUM_RENAMED)
+    assert [match.submission_id for match in matches] == [1]
+    assert await restarted.check_stored_submission(db, 2, 5, "python", TWO_SUM) == []
+    # Later loads read only newer rows; the rolled-back one goes at the next reconcile
+    assert sorted((await detector.load(db, 1)).documents) == [1, 2, 3, 4]
+    detector.reconcile_seconds = 0
+    assert sorted((await detector.load(db, 1)).documents) == [1, 2, 4]
+
+def test_minhash_estimates_jaccard_and_buckets_similar_sets():
+    hasher = MinHasher(num_perm=128, bands=32)
+    a = {f"shingle{i}" for i in range(100)}
+    b = {f"shingle{i}" for i in range(20, 120)}  # Jaccard 80 / 120
+    c = {f"other{i}" for i in range(100)}
+    sig_a, sig_b, sig_c = (hasher.signature(shingles) for shingles in (a, b, c))
+    assert abs(estimate_jaccard(sig_a, sig_b) - 2 / 3) < 0.12
+    assert estimate_jaccard(sig_a, sig_c) < 0.1
+    assert set(hasher.band_keys(sig_a)) & set(hasher.band_keys(sig_b))
+    assert not set(hasher.band_keys(sig_a)) & set(hasher.band_keys(sig_c))
+    assert hasher.signature([]) is None
+    # Stable across instances, so signatures can be stored
+    assert (MinHasher(num_perm=128, bands=32).signature(a) == sig_a).all()
+
+def test_disjoint_set_clusters():
+    clusters = DisjointSet()
+    for a, b in [(5, 3), (3, 9), (20, 21), (7, 7)]:
+        clusters.union(a, b)
+    assert sorted(clusters.clusters()) == [[3, 5, 9], [20, 21]]
+
+class Profile:
+    def __init__(self, first_name, last_name, phone_number=None, linkedin_url=None, github_url=None, resume_text=None):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.phone_number = phone_number
+        self.linkedin_url = linkedin_url
+        self.github_url = github_url
+        self.resume_text = resume_text
+
+def test_profile_signatures_need_an_identifier():
+    deduplicator = CandidateDeduplicator()
+    assert profile_shingles(Profile("Jane", "Doe")) == set()
+    jane = deduplicator.signatures(Profile("Jane", "Doe", phone_number="+1 (555) 010-0199"))
+    typo = deduplicator.signatures(Profile("Jane", "Doe", phone_number="555.010.0199"))
+    accent = deduplicator.signatures(Profile("Jäne", "Doe", linkedin_url="https://www.linkedin.com/in/janedoe/"))
+    namesake = deduplicator.signatures(Profile("Jane", "Doe", phone_number="555 777 1234"))
+    assert deduplicator.compare(2, jane, typo).profile_similarity == 1.0
+    assert deduplicator.compare(3, jane, namesake) is None
+    # Same name, no shared identifier: not enough on its own
+    assert deduplicator.compare(4, jane, accent) is None
+
+RESUME = " ".join(
+    f"Built and operated service {i} handling payments with Python PostgreSQL and Kafka at scale" for i in range(6)
+)
+
+@requires_database
+@pytest.mark.asyncio
+async def test_candidate_duplicates_are_indexed_on_insert_and_clustered(db):
+    jane = await create_candidate(db, CandidateCreate(
+        first_name="Jane", last_name="Doe", email="jane@example.com",
+        phone_number="+1 555 010 0199", github_url="https://github.com/janedoe"
+    ))
+    namesake = await create_candidate(db, CandidateCreate(
+        first_name="Jane", last_name="Doe", email="jane.doe@example.org", phone_number="555 777 1234"
+    ))
+
+    async def records():
+        yield 1, {
+            "first_name": "Jane", "last_name": "Doe-Smith", "email": "jds@example.net",
+            "phone_number": "(555) 010-0199", "github_url": "github.com/JaneDoe"
+        }
+        yield 2, {"first_name": "Other", "last_name": "Person", "email": "other@example.com"}
+    result = await import_candidates(db, records())
+    assert result.created == 2
+    copy_id = await db.scalar(select(Candidate.id).where(Candidate.email == "jds@example.net"))
+
+    matches = await candidate_deduplicator.find_duplicates(db, jane.id)
+    assert [match.candidate_id for match in matches] == [copy_id]
+    assert await candidate_deduplicator.find_duplicates(db, namesake.id) == []
+    clusters = dict((await db.execute(select(CandidateMinHash.candidate_id, CandidateMinHash.cluster_id))).all())
+    assert clusters[copy_id] == jane.id
+    assert clusters[namesake.id] == namesake.id
+
+    # Written without going through the index, then picked up by the batch job
+    db.add_all([
+        Candidate(first_name="Resume", last_name="One", email="r1@example.com", resume_text=RESUME),
+        Candidate(first_name="Someone", last_name="Else", email="r2@example.com", resume_text=RESUME + " Also Go")
+    ])
+    await db.commit()
+    stats = await candidate_deduplicator.cluster_candidates(db, batch_size=2)
+    assert stats["indexed"] == 2
+    assert stats["clusters"] == 2
+    clusters = dict((await db.execute(select(CandidateMinHash.candidate_id, CandidateMinHash.cluster_id))).all())
+    resume_ids = (await db.scalars(select(Candidate.id).where(Candidate.resume_text.isnot(None)).order_by(Candidate.id))).all()
+    assert clusters[resume_ids[1]] == resume_ids[0]
+    assert clusters[copy_id] == jane.id
+
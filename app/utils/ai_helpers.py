@@ -0,0 +1,46 @@
+import re
+import zlib
+from typing import Iterable, Optional, Sequence, Union
+
+import numpy as np
+
+# Embeddings are stored as packed big-endian float32, 4 bytes per dimension.
+# This is the byte order of Postgres' float4send(), so SQL (e.g. migrations)
+# can produce the same encoding.
+EMBEDDING_DTYPE = np.dtype(">f4")
+
+def encode_embedding(vector: Union[Sequence[float], np.ndarray, None]) -> Optional[bytes]:
+    if vector is None:
+        return None
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()
+
+def decode_embedding(data: Optional[bytes]) -> Optional[np.ndarray]:
+    if data is None:
+        return None
+    return np.frombuffer(data, dtype=EMBEDDING_DTYPE).astype(np.float32)
+
+def decode_embeddings(blobs: Iterable[bytes], dim: int) -> np.ndarray:
+    """Decode equally sized embeddings into one ``(n, dim)`` float32 matrix"""
+    data = b"".join(blobs)
+    return np.frombuffer(data, dtype=EMBEDDING_DTYPE).astype(np.float32).reshape(-1, dim)
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize the last axis so dot products are cosine similarities"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def hash_embedding(text: Optional[str], dim: int = 256) -> np.ndarray:
+    """Signed feature-hashing bag of words, L2-normalized.
+
+    A deterministic, model-free embedding: texts sharing words get a
+    positive cosine similarity, unrelated texts land near zero.
+    """
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in re.findall(r"\w+", (text or "").lower()):
+        digest = zlib.crc32(token.encode())
+        vector[digest % dim] += 1.0 if digest & 0x80000000 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
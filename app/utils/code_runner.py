@@ -0,0 +1,1036 @@
+"""Sandboxed execution of coding-challenge submissions.
+
+Each language runtime gets a pool of long-lived worker processes started
+ahead of time (``CodeRunnerPool.start``). A worker is a fresh interpreter,
+not a fork of the API process, so submissions never inherit its memory,
+environment or open connections. For every run the worker forks a child
+from its already-initialized interpreter (commonly used modules are
+preloaded), so a test case costs a fork instead of an interpreter start.
+
+Before it accepts any work the worker enters its sandbox (``Sandbox.enter``):
+
+* new mount and network namespaces (inside a new user namespace when the
+  API doesn't run as root), so there is no network at all;
+* a chroot into a tmpfs that only holds read-only bind mounts of the
+  system and interpreter directories, plus a small scratch tmpfs for run
+  directories; the application code, its configuration and the rest of
+  the host filesystem are not there.
+
+A worker that can't set this up reports why and exits, and the pool
+refuses to start rather than run submissions unconfined. Every forked
+child then, before any submitted code runs:
+
+* switches to an unprivileged user (``nobody`` unless configured
+  otherwise) when the worker is root, drops every capability, empties its
+  capability bounding set and sets ``no_new_privs``;
+* sets ``RLIMIT_CPU``, ``RLIMIT_AS``, ``RLIMIT_FSIZE``, ``RLIMIT_NOFILE``
+  and ``RLIMIT_NPROC`` to cap CPU time, memory, file writes, descriptors
+  and forking; a wall-clock deadline kills it (and its process group) even
+  when it sleeps or blocks;
+* runs in a per-run directory on the scratch tmpfs, removed afterwards;
+* installs an audit hook that rejects sockets, subprocesses, forking and
+  ctypes. This only produces clearer errors: the limits above are what
+  hold when a submission gets around it.
+
+This module only imports the standard library: the worker side runs it as
+a script (``python -I code_runner.py --worker``).
+"""
+import asyncio
+import builtins
+import errno
+import json
+import logging
+import os
+import resource
+import selectors
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+from collections import deque
+from contextlib import asynccontextmanager
+from types import CodeType
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_LANGUAGES = ("python",)
+
+# Modules imported by the worker before it starts forking, so submissions
+# using them don't pay for the import on every run
+PRELOAD_MODULES = (
+    "array", "bisect", "collections", "copy", "dataclasses", "decimal", "fractions", "functools",
+    "heapq", "itertools", "json", "math", "operator", "random", "re", "statistics", "string", "typing",
+)
+
+# Audit events a submission may not raise (exact names or prefixes ending in ".")
+BLOCKED_AUDIT_EVENTS = (
+    "socket.", "subprocess.", "ctypes.", "os.system", "os.exec", "os.posix_spawn", "os.spawn",
+    "os.fork", "os.forkpty", "os.kill", "os.killpg", "os.setuid", "os.chroot", "pty.",
+)
+
+# Host directories bind-mounted read-only into the sandbox, besides the
+# interpreter's own prefixes; symlinks (merged /usr) are recreated instead
+SYSTEM_PATHS = ("/bin", "/lib", "/lib32", "/lib64", "/usr")
+SANDBOX_DEVICES = ("/dev/null", "/dev/random", "/dev/urandom", "/dev/zero")
+SANDBOX_SCRATCH = "/sandbox"
+SANDBOX_SCRATCH_MB = 64
+# Submissions run as nobody:nogroup when the worker is root
+SANDBOX_UID = 65534
+SANDBOX_GID = 65534
+
+CLONE_NEWNS = 0x00020000
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+MS_RDONLY = 0x1
+MS_NOSUID = 0x2
+MS_NODEV = 0x4
+MS_NOEXEC = 0x8
+MS_REMOUNT = 0x20
+MS_BIND = 0x1000
+MS_REC = 0x4000
+MS_PRIVATE = 0x40000
+PR_SET_DUMPABLE = 4
+PR_CAPBSET_DROP = 24
+PR_SET_NO_NEW_PRIVS = 38
+LINUX_CAPABILITY_VERSION_3 = 0x20080522
+
+MEMORY_ERROR_EXIT = 102
+READ_CHUNK = 65536
+# Extra time the pool gives a worker to report back before replacing it
+WORKER_GRACE_SECONDS = 2.0
+WORKER_START_TIMEOUT = 10.0
+# How long a pool that failed to start refuses runs before trying again
+START_RETRY_SECONDS = 60.0
+# Extra time a worker gives its batch child, which enforces the per-case limits itself
+BATCH_GRACE_SECONDS = 1.0
+
+INTERNAL_ERROR_RESULT = {
+    "status": "internal_error", "stdout": "", "stderr": "", "exit_code": None, "duration_ms": 0.0, "cpu_ms": 0.0
+}
+
+class CodeRunnerError(Exception):
+    """A worker failed, as opposed to the submitted code"""
+
+class CodeRunnerBusy(CodeRunnerError):
+    """The run queue is full"""
+
+class CodeRunnerUnavailable(CodeRunnerError):
+    """Workers can't be started (e.g. the host doesn't allow the sandbox)"""
+
+class ResourceLimits:
+    def __init__(
+        self,
+        cpu_seconds: float = 2.0,
+        wall_seconds: float = 5.0,
+        memory_mb: int = 256,
+        output_bytes: int = 65536,
+        file_size_mb: int = 8,
+        max_open_files: int = 64
+    ):
+        self.cpu_seconds = cpu_seconds
+        self.wall_seconds = wall_seconds
+        self.memory_mb = memory_mb
+        self.output_bytes = output_bytes
+        self.file_size_mb = file_size_mb
+        self.max_open_files = max_open_files
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+class ExecutionResult:
+    """Outcome of one run.
+
+    ``status`` is one of ``ok``, ``runtime_error`` (non-zero exit or
+    uncaught exception), ``timeout`` (CPU or wall-clock limit),
+    ``memory_limit``, ``output_limit`` (killed for writing more than
+    ``output_bytes``) or ``internal_error`` (the worker itself failed).
+    """
+
+    def __init__(
+        self,
+        status: str,
+        stdout: str = "",
+        stderr: str = "",
+        exit_code: Optional[int] = None,
+        duration_ms: float = 0.0,
+        cpu_ms: float = 0.0,
+        queue_ms: float = 0.0
+    ):
+        self.status = status
+        self.stdout = stdout
+        self.stderr = stderr
+        self.exit_code = exit_code
+        self.duration_ms = duration_ms
+        self.cpu_ms = cpu_ms
+        self.queue_ms = queue_ms
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ExecutionResult":
+        return cls(**{key: data[key] for key in ("status", "stdout", "stderr", "exit_code", "duration_ms", "cpu_ms")})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+def default_workdir_root() -> str:
+    """Where workers mount their sandbox root; the mount is only visible to the worker"""
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+# Worker side: runs inside the pre-started interpreter
+
+def _sandbox_paths() -> List[str]:
+    """Host paths to expose in the sandbox, outermost first"""
+    candidates = set(SYSTEM_PATHS)
+    candidates.update((sys.prefix, sys.base_prefix, sys.exec_prefix, sys.base_exec_prefix))
+    paths: List[str] = []
+    for path in sorted(os.path.normpath(path) for path in candidates):
+        if os.path.lexists(path) and not any(path.startswith(parent + "/") for parent in paths):
+            paths.append(path)
+    return paths
+
+class Sandbox:
+    """The worker's confinement, and the privilege drop for each child it forks.
+
+    ``enter`` runs once, in the worker; ``drop_privileges`` in every forked
+    child before it runs submitted code. Both raise OSError when the kernel
+    or the container doesn't allow a step.
+    """
+
+    def __init__(self, ctypes, libc, uid: Optional[int], gid: Optional[int]):
+        self.ctypes = ctypes
+        self.libc = libc
+        # None when the worker is unprivileged: its own user is then the only
+        # one mapped into its user namespace
+        self.uid = uid
+        self.gid = gid
+        self.workdir_root = SANDBOX_SCRATCH
+
+    @classmethod
+    def enter(cls, mount_point: str, uid: int = SANDBOX_UID, gid: int = SANDBOX_GID) -> "Sandbox":
+        """Move this process into new namespaces and chroot it into a fresh root
+        built on ``mount_point`` (only visible inside the new mount namespace)"""
+        if not sys.platform.startswith("linux"):
+            raise OSError("the code runner sandbox needs Linux namespaces")
+        try:
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+        except (ImportError, OSError) as e:
+            raise OSError(f"the code runner sandbox needs ctypes: {str(e)}")
+        sandbox = cls(ctypes, libc, uid, gid)
+
+        host_uid, host_gid = os.geteuid(), os.getegid()
+        flags = CLONE_NEWNS | CLONE_NEWNET
+        if host_uid != 0:
+            flags |= CLONE_NEWUSER
+        sandbox.check(libc.unshare(flags), "unshare")
+        if host_uid != 0:
+            for name, mapping in (("setgroups", "deny"), ("uid_map", f"0 {host_uid} 1"), ("gid_map", f"0 {host_gid} 1")):
+                with open(f"/proc/self/{name}", "w") as f:
+                    f.write(mapping)
+            sandbox.uid = sandbox.gid = None
+
+        # Nothing mounted from here on propagates back to the host
+        sandbox.mount(None, "/", None, MS_REC | MS_PRIVATE)
+        sandbox.mount("tmpfs", mount_point, "tmpfs", MS_NOSUID | MS_NODEV, "mode=0755")
+        for path in _sandbox_paths():
+            target = mount_point + path
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.islink(path):
+                os.symlink(os.readlink(path), target)
+                continue
+            os.mkdir(target)
+            sandbox.mount(path, target, None, MS_BIND | MS_REC)
+            # A remount has to keep the flags the source mount is locked with
+            noexec = MS_NOEXEC if os.statvfs(path).f_flag & os.ST_NOEXEC else 0
+            sandbox.mount(None, target, None, MS_REMOUNT | MS_BIND | MS_RDONLY | MS_NOSUID | MS_NODEV | noexec)
+        os.mkdir(mount_point + "/dev")
+        for device in SANDBOX_DEVICES:
+            target = mount_point + device
+            open(target, "w").close()
+            sandbox.mount(device, target, None, MS_BIND)
+        scratch = mount_point + SANDBOX_SCRATCH
+        os.mkdir(scratch)
+        sandbox.mount(
+            "tmpfs", scratch, "tmpfs", MS_NOSUID | MS_NODEV | MS_NOEXEC, f"size={SANDBOX_SCRATCH_MB}m,mode=0711"
+        )
+        sandbox.mount(None, mount_point, None, MS_REMOUNT | MS_RDONLY | MS_NOSUID | MS_NODEV)
+        os.chroot(mount_point)
+        os.chdir("/")
+        return sandbox
+
+    def check(self, result: int, call: str):
+        if result != 0:
+            error = self.ctypes.get_errno()
+            raise OSError(error, f"{call} failed: {os.strerror(error)}")
+
+    def mount(self, source: Optional[str], target: str, fstype: Optional[str], flags: int, options: Optional[str] = None):
+        encode = lambda value: value.encode() if value is not None else None
+        self.check(
+            self.libc.mount(encode(source), encode(target), encode(fstype), flags, encode(options)),
+            f"mount {target}"
+        )
+
+    def prepare_workdir(self, workdir: str):
+        """Hand a run directory to the user submissions run as"""
+        if self.uid is not None:
+            os.chown(workdir, self.uid, self.gid)
+
+    def drop_privileges(self):
+        """Irreversibly give up every privilege this process holds"""
+        libc = self.libc
+        self.check(libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0), "prctl(PR_SET_NO_NEW_PRIVS)")
+        # An empty bounding set means exec can't grant capabilities back either
+        for capability in range(64):
+            if libc.prctl(PR_CAPBSET_DROP, capability, 0, 0, 0) != 0:
+                if self.ctypes.get_errno() == errno.EINVAL:
+                    break  # Past the last capability this kernel knows
+                self.check(-1, "prctl(PR_CAPBSET_DROP)")
+        if self.uid is not None:
+            os.setgroups([])
+            os.setgid(self.gid)
+            os.setuid(self.uid)
+        header = (self.ctypes.c_uint32 * 2)(LINUX_CAPABILITY_VERSION_3, 0)
+        self.check(libc.capset(header, (self.ctypes.c_uint32 * 6)()), "capset")
+        # No ptrace or core dumps of this process by other submissions' processes
+        self.check(libc.prctl(PR_SET_DUMPABLE, 0, 0, 0, 0), "prctl(PR_SET_DUMPABLE)")
+
+    def verify(self):
+        """Fork a child that drops its privileges and checks it can't chroot out"""
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                self.drop_privileges()
+                try:
+                    os.chroot("/")
+                except PermissionError:
+                    exit_code = 0
+            finally:
+                os._exit(exit_code)
+        if _exit_code(os.waitpid(pid, 0)[1]) != 0:
+            raise OSError("a sandboxed child kept its privileges")
+
+def _deny_sandbox_escapes(event: str, args):
+    if event.startswith(BLOCKED_AUDIT_EVENTS):
+        raise PermissionError(f"{event} is not allowed in submissions")
+
+def _set_limit(limit: int, value: int):
+    resource.setrlimit(limit, (value, value))
+
+def _confine(limits: Dict[str, Any], cpu_seconds: float, sandbox: Sandbox):
+    sandbox.drop_privileges()
+    cpu = max(1, int(cpu_seconds + 0.999))
+    # Soft limit sends SIGXCPU, the hard one a second later SIGKILL
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+    _set_limit(resource.RLIMIT_AS, limits["memory_mb"] * 1024 * 1024)
+    _set_limit(resource.RLIMIT_FSIZE, limits["file_size_mb"] * 1024 * 1024)
+    _set_limit(resource.RLIMIT_NOFILE, limits["max_open_files"])
+    _set_limit(resource.RLIMIT_CORE, 0)
+    # Binding now that the child holds no CAP_SYS_RESOURCE or CAP_SYS_ADMIN
+    _set_limit(resource.RLIMIT_NPROC, 0)
+    sys.addaudithook(_deny_sandbox_escapes)
+    sys.argv = ["solution.py"]
+
+def _format_exception(e: BaseException) -> str:
+    # Hide the sandbox's own frames (this module, the audit hook)
+    frames = [frame for frame in traceback.extract_tb(e.__traceback__) if frame.filename != __file__]
+    return "".join(
+        ["Traceback (most recent call last):\n"]
+        + traceback.format_list(frames)
+        + traceback.format_exception_only(type(e), e)
+    )
+
+def _execute_submission(compiled) -> int:
+    """Run compiled submission code in a fresh ``__main__`` namespace; returns its exit code"""
+    try:
+        exec(compiled, {"__name__": "__main__", "__builtins__": builtins})
+        return 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    except MemoryError:
+        print("MemoryError: memory limit exceeded", file=sys.stderr)
+        return MEMORY_ERROR_EXIT
+    except BaseException as e:
+        sys.stderr.write(_format_exception(e))
+        return 1
+
+def _run_child(code: Union[str, CodeType], limits: Dict[str, Any], sandbox: Sandbox):
+    """Confine the forked child and execute the submission (source, or code
+    a batch child already compiled); never returns"""
+    exit_code = 1
+    try:
+        _confine(limits, limits["cpu_seconds"], sandbox)
+        sys.stdin = open(0, "r", encoding="utf-8", errors="replace", closefd=False)
+        sys.stdout = open(1, "w", encoding="utf-8", errors="replace", closefd=False)
+        sys.stderr = open(2, "w", encoding="utf-8", errors="replace", closefd=False)
+        try:
+            compiled = compile(code, "solution.py", "exec") if isinstance(code, str) else code
+        except SyntaxError as e:
+            sys.stderr.write(_format_exception(e))
+        else:
+            exit_code = _execute_submission(compiled)
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except BaseException:
+            pass
+        os._exit(exit_code)
+
+def _run_batch_child(code: str, inputs: List[str], limits: Dict[str, Any], sandbox: Sandbox):
+    """Compile the submission once, then run it against each input in a
+    confined grandchild of its own; never returns.
+
+    This process runs no submitted code. It writes one JSON result line per
+    case to fd 1, which no grandchild holds (``_fork`` replaces their fds
+    0-2 and closes the rest), so a submission can't forge or suppress
+    results, and whatever it does to its interpreter or run directory ends
+    with its case.
+    """
+    exit_code = 0
+    try:
+        results = open(1, "w", encoding="utf-8", closefd=False)
+        _set_limit(resource.RLIMIT_AS, limits["memory_mb"] * 1024 * 1024)
+        try:
+            compiled = compile(code, "solution.py", "exec")
+        except Exception:
+            # Each case reports whatever compile rejected from its own grandchild
+            compiled = code
+        for index, case_input in enumerate(inputs):
+            workdir = tempfile.mkdtemp(prefix="case-", dir=os.getcwd())
+            sandbox.prepare_workdir(workdir)
+            try:
+                result = _run(workdir, case_input, limits, lambda: _run_child(compiled, limits, sandbox))
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            results.write(json.dumps(dict(result, index=index)) + "\n")
+            results.flush()
+    except BaseException:
+        exit_code = 1
+    finally:
+        os._exit(exit_code)
+
+def _kill_group(pid: int):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+def _drain(fd: int, buffer: bytearray, limit: int) -> Tuple[bool, bool]:
+    """Read what is available from a non-blocking pipe, keeping at most ``limit`` bytes.
+
+    Returns ``(closed, overflowed)``.
+    """
+    overflowed = False
+    while True:
+        try:
+            chunk = os.read(fd, READ_CHUNK)
+        except BlockingIOError:
+            return False, overflowed
+        if not chunk:
+            return True, overflowed
+        room = max(0, limit - len(buffer))
+        buffer += chunk[:room]
+        overflowed = overflowed or len(chunk) > room
+
+def _classify(exit_code: int, cpu_seconds: float, limits: Dict[str, Any]) -> str:
+    if exit_code == -signal.SIGXCPU:
+        return "timeout"
+    if exit_code == -signal.SIGKILL and cpu_seconds >= limits["cpu_seconds"]:
+        return "timeout"
+    if exit_code == MEMORY_ERROR_EXIT:
+        return "memory_limit"
+    return "ok" if exit_code == 0 else "runtime_error"
+
+def _exit_code(wait_status: int) -> int:
+    if os.WIFSIGNALED(wait_status):
+        return -os.WTERMSIG(wait_status)
+    return os.WEXITSTATUS(wait_status)
+
+def _fork(workdir: str, fds: Tuple[int, int, int]) -> int:
+    """Fork a child in its own session and ``workdir`` with ``fds`` as its stdin/stdout/stderr"""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.setsid()
+            os.chdir(workdir)
+            for target, fd in enumerate(fds):
+                os.dup2(fd, target)
+            os.closerange(3, 65536)
+        except BaseException:
+            os._exit(1)
+    return pid
+
+def _run(workdir: str, stdin: str, limits: Dict[str, Any], child: Callable[[], Any]) -> Dict[str, Any]:
+    """Fork a child that calls ``child`` (which must not return) in ``workdir``,
+    feed it ``stdin`` and collect its result within the wall-clock and output limits"""
+    started = time.monotonic()
+    deadline = started + limits["wall_seconds"]
+    in_r, in_w = os.pipe()
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+
+    pid = _fork(workdir, (in_r, out_w, err_w))
+    if pid == 0:
+        child()
+
+    for fd in (in_r, out_w, err_w):
+        os.close(fd)
+    output_limit = limits["output_bytes"]
+    buffers = {out_r: bytearray(), err_r: bytearray()}
+    pending = memoryview(stdin.encode("utf-8"))
+    selector = selectors.DefaultSelector()
+    for fd in (out_r, err_r):
+        os.set_blocking(fd, False)
+        selector.register(fd, selectors.EVENT_READ)
+    if pending:
+        os.set_blocking(in_w, False)
+        selector.register(in_w, selectors.EVENT_WRITE)
+    else:
+        os.close(in_w)
+        in_w = None
+    # Readable once the child exits, so waiting needs no polling
+    pid_fd = os.pidfd_open(pid) if hasattr(os, "pidfd_open") else None
+    if pid_fd is not None:
+        selector.register(pid_fd, selectors.EVENT_READ)
+
+    timed_out = over_output = False
+    while True:
+        waited, wait_status, usage = os.wait4(pid, os.WNOHANG)
+        if waited:
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or over_output:
+            timed_out = not over_output
+            _kill_group(pid)
+            _, wait_status, usage = os.wait4(pid, 0)
+            break
+        for key, _ in selector.select(remaining if pid_fd is not None else min(remaining, 0.01)):
+            if key.fd == in_w:
+                try:
+                    written = os.write(in_w, pending[:READ_CHUNK])
+                except (BrokenPipeError, BlockingIOError) as e:
+                    written = len(pending) if isinstance(e, BrokenPipeError) else 0
+                pending = pending[written:]
+                if not pending:
+                    selector.unregister(in_w)
+                    os.close(in_w)
+                    in_w = None
+            elif key.fd in buffers:
+                closed, overflowed = _drain(key.fd, buffers[key.fd], output_limit)
+                over_output = over_output or overflowed
+                if closed:
+                    selector.unregister(key.fd)
+    _kill_group(pid)  # Anything it left running in its group
+    for fd in (out_r, err_r):
+        over_output = _drain(fd, buffers[fd], output_limit)[1] or over_output
+    selector.close()
+    for fd in (out_r, err_r, in_w, pid_fd):
+        if fd is not None:
+            os.close(fd)
+
+    cpu_seconds = usage.ru_utime + usage.ru_stime
+    exit_code = _exit_code(wait_status)
+    if timed_out:
+        status = "timeout"
+    elif over_output:
+        status = "output_limit"
+    else:
+        status = _classify(exit_code, cpu_seconds, limits)
+    return {
+        "status": status,
+        "stdout": buffers[out_r].decode("utf-8", errors="replace"),
+        "stderr": buffers[err_r].decode("utf-8", errors="replace"),
+        "exit_code": exit_code,
+        "duration_ms": round((time.monotonic() - started) * 1000, 3),
+        "cpu_ms": round(cpu_seconds * 1000, 3),
+    }
+
+def execute(request: Dict[str, Any], sandbox: Sandbox) -> Dict[str, Any]:
+    """Run one submission in a confined child of this worker"""
+    limits = request["limits"]
+    workdir = tempfile.mkdtemp(prefix="run-", dir=sandbox.workdir_root)
+    sandbox.prepare_workdir(workdir)
+    try:
+        return _run(workdir, request.get("stdin", ""), limits, lambda: _run_child(request["code"], limits, sandbox))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def execute_batch(request: Dict[str, Any], sandbox: Sandbox) -> Iterator[Dict[str, Any]]:
+    """Run a submission against every input, yielding each case's result as it finishes.
+
+    A batch child compiles it once and runs every case in a confined
+    grandchild of its own (``_run_batch_child``), which enforces the
+    per-case limits. Should the batch child itself die or stall, the case it
+    was on is reported as an internal error and a new one picks up from the
+    next case.
+    """
+    limits = request["limits"]
+    inputs = request["inputs"]
+    # A result line is bounded by the captured stdout/stderr, JSON-escaped
+    max_line = 12 * limits["output_bytes"] + READ_CHUNK
+    next_index = 0
+    while next_index < len(inputs):
+        offset = next_index
+        workdir = tempfile.mkdtemp(prefix="run-", dir=sandbox.workdir_root)
+        # Stays the worker's: submissions only get the per-case directories inside
+        os.chmod(workdir, 0o711)
+        devnull = os.open(os.devnull, os.O_RDWR)
+        results_r, results_w = os.pipe()
+        pid = _fork(workdir, (devnull, results_w, devnull))
+        if pid == 0:
+            _run_batch_child(request["code"], inputs[offset:], limits, sandbox)
+        os.close(results_w)
+        os.close(devnull)
+        os.set_blocking(results_r, False)
+        selector = selectors.DefaultSelector()
+        selector.register(results_r, selectors.EVENT_READ)
+        pid_fd = os.pidfd_open(pid) if hasattr(os, "pidfd_open") else None
+        if pid_fd is not None:
+            selector.register(pid_fd, selectors.EVENT_READ)
+
+        case_started = time.monotonic()
+        buffer = bytearray()
+        reading = True
+        timed_out = False
+        while True:
+            # Reap first, so everything the child wrote before exiting is read below
+            exited, wait_status, _ = os.wait4(pid, os.WNOHANG)
+            closed = False
+            while reading:
+                try:
+                    chunk = os.read(results_r, READ_CHUNK)
+                except BlockingIOError:
+                    break
+                if not chunk:
+                    closed = True
+                    break
+                buffer += chunk
+            *lines, rest = bytes(buffer).split(b"\n")
+            buffer = bytearray(rest)
+            for line in lines:
+                result = json.loads(line)
+                result["index"] += offset
+                yield result
+                next_index += 1
+                case_started = time.monotonic()
+            if exited:
+                break
+
+            remaining = case_started + limits["wall_seconds"] + BATCH_GRACE_SECONDS - time.monotonic()
+            if remaining <= 0 or len(buffer) > max_line:
+                timed_out = remaining <= 0
+                _kill_group(pid)
+                _, wait_status, _ = os.wait4(pid, 0)
+                break
+            if closed and reading:
+                # The child is exiting: wait for it instead
+                selector.unregister(results_r)
+                reading = False
+            selector.select(remaining if pid_fd is not None else min(remaining, 0.01))
+        _kill_group(pid)
+        selector.close()
+        for fd in (results_r, pid_fd):
+            if fd is not None:
+                os.close(fd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+        if next_index < len(inputs):
+            # The batch child died or stalled in the middle of this case
+            exit_code = _exit_code(wait_status)
+            yield {
+                "index": next_index,
+                "status": "timeout" if timed_out else "internal_error",
+                "stdout": "",
+                "stderr": "",
+                "exit_code": exit_code,
+                "duration_ms": round((time.monotonic() - case_started) * 1000, 3),
+                "cpu_ms": 0.0,
+            }
+            next_index += 1
+
+def worker_main(mount_point: str, uid: int, gid: int):
+    out = sys.stdout
+    for module in PRELOAD_MODULES:
+        try:
+            __import__(module)
+        except ImportError:
+            pass
+    try:
+        sandbox = Sandbox.enter(mount_point, uid, gid)
+        sandbox.verify()
+    except OSError as e:
+        out.write(json.dumps({"ready": False, "error": str(e)}) + "\n")
+        out.flush()
+        return
+    out.write(json.dumps({"ready": True, "pid": os.getpid()}) + "\n")
+    out.flush()
+    for line in sys.stdin:
+        request = json.loads(line)
+        try:
+            if "inputs" in request:
+                for result in execute_batch(request, sandbox):
+                    out.write(json.dumps(result) + "\n")
+                    out.flush()
+                result = {"done": True}
+            else:
+                result = execute(request, sandbox)
+        except Exception as e:
+            result = dict(INTERNAL_ERROR_RESULT, stderr=str(e))
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+
+# Pool side: runs in the API process
+
+class RunnerWorker:
+    """Handle on one worker process; serves one run at a time"""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.runs = 0
+
+    @classmethod
+    async def spawn(cls, workdir_root: str, output_bytes: int, uid: int, gid: int) -> "RunnerWorker":
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, "-I", "-u", os.path.abspath(__file__), "--worker", workdir_root, str(uid), str(gid),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            # Nothing from the API process' environment (credentials...) leaks in
+            env={"PATH": os.defpath, "LC_ALL": "C.UTF-8"},
+            start_new_session=True,
+            # One result line holds stdout and stderr, JSON-escaped
+            limit=8 * output_bytes + READ_CHUNK
+        )
+        try:
+            hello = json.loads(await asyncio.wait_for(process.stdout.readline(), WORKER_START_TIMEOUT) or b"{}")
+        except (asyncio.TimeoutError, ValueError):
+            hello = {}
+        if not hello.get("ready"):
+            if process.returncode is None:
+                process.kill()
+            await process.wait()
+            if hello.get("error"):
+                raise CodeRunnerError(f"Code runner sandbox could not be set up: {hello['error']}")
+            raise CodeRunnerError("Code runner worker failed to start")
+        return cls(process)
+
+    async def send(self, request: Dict[str, Any]):
+        try:
+            self.process.stdin.write(json.dumps(request).encode() + b"\n")
+            await self.process.stdin.drain()
+        except ConnectionError as e:
+            raise CodeRunnerError(f"Code runner worker failed: {str(e)}")
+
+    async def receive(self) -> Dict[str, Any]:
+        try:
+            line = await self.process.stdout.readline()
+        except (ConnectionError, ValueError) as e:
+            raise CodeRunnerError(f"Code runner worker failed: {str(e)}")
+        if not line:
+            raise CodeRunnerError("Code runner worker exited")
+        return json.loads(line)
+
+    async def run(self, code: str, stdin: str, limits: ResourceLimits) -> Dict[str, Any]:
+        await self.send({"code": code, "stdin": stdin, "limits": limits.to_dict()})
+        self.runs += 1
+        return await self.receive()
+
+    async def kill(self):
+        if self.process.returncode is None:
+            self.process.kill()
+        await self.process.wait()
+
+class CodeRunnerPool:
+    """Pre-started workers for one language, shared by all submissions.
+
+    ``run`` and ``run_batch`` wait for an idle worker; at most ``max_queue``
+    runs wait at a time, beyond that they raise CodeRunnerBusy. If the
+    workers can't be started, runs raise CodeRunnerUnavailable for
+    START_RETRY_SECONDS before the next attempt. A worker that misses its
+    deadline or dies is replaced in the background, and every worker is
+    recycled after ``max_runs_per_worker`` runs.
+    """
+
+    def __init__(
+        self,
+        language: str = "python",
+        size: int = 4,
+        max_queue: int = 256,
+        limits: Optional[ResourceLimits] = None,
+        workdir_root: Optional[str] = None,
+        max_runs_per_worker: int = 1000,
+        latency_window: int = 1024,
+        sandbox_uid: int = SANDBOX_UID,
+        sandbox_gid: int = SANDBOX_GID
+    ):
+        if language not in SUPPORTED_LANGUAGES:
+            raise ValueError(f"Unsupported language: {language}")
+        self.language = language
+        self.size = size
+        self.max_queue = max_queue
+        self.limits = limits or ResourceLimits()
+        self.workdir_root = workdir_root or default_workdir_root()
+        self.max_runs_per_worker = max_runs_per_worker
+        self.sandbox_uid = sandbox_uid
+        self.sandbox_gid = sandbox_gid
+        self.idle: Optional[asyncio.Queue] = None
+        self.workers: List[RunnerWorker] = []
+        self.start_lock = asyncio.Lock()
+        self.closed = False
+        self.unavailable: Optional[str] = None  # Why the last start failed
+        self.failed_at = 0.0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.batches = 0
+        self.timeouts = 0
+        self.replaced = 0
+        self.run_latencies: Deque[float] = deque(maxlen=latency_window)
+        self.queue_latencies: Deque[float] = deque(maxlen=latency_window)
+
+    @property
+    def started(self) -> bool:
+        return self.idle is not None
+
+    async def start(self):
+        async with self.start_lock:
+            if self.started:
+                return
+            if self.unavailable and time.monotonic() - self.failed_at < START_RETRY_SECONDS:
+                raise CodeRunnerUnavailable(self.unavailable)
+            self.closed = False
+            spawned = await asyncio.gather(*(self.spawn() for _ in range(self.size)), return_exceptions=True)
+            workers = [worker for worker in spawned if isinstance(worker, RunnerWorker)]
+            failed = [error for error in spawned if isinstance(error, BaseException)]
+            if failed:
+                # No partially started pool: a worker that can't confine itself means none can
+                await asyncio.gather(*(worker.kill() for worker in workers), return_exceptions=True)
+                if not isinstance(failed[0], (CodeRunnerError, OSError)):
+                    raise failed[0]
+                self.unavailable = f"Could not start {self.language} code runner workers: {failed[0]}"
+                self.failed_at = time.monotonic()
+                raise CodeRunnerUnavailable(self.unavailable) from failed[0]
+            self.unavailable = None
+            self.workers = workers
+            self.idle = asyncio.Queue()
+            for worker in self.workers:
+                self.idle.put_nowait(worker)
+            logger.info(f"Started {self.size} {self.language} code runner workers")
+
+    async def spawn(self) -> RunnerWorker:
+        return await RunnerWorker.spawn(self.workdir_root, self.limits.output_bytes, self.sandbox_uid, self.sandbox_gid)
+
+    async def close(self):
+        self.closed = True
+        workers, self.workers, self.idle = self.workers, [], None
+        await asyncio.gather(*(worker.kill() for worker in workers), return_exceptions=True)
+
+    @asynccontextmanager
+    async def checkout(self) -> AsyncIterator[Tuple[RunnerWorker, float]]:
+        """Wait for an idle worker; yields it with the time waited in ms.
+
+        The worker goes back to the pool when the block exits normally and
+        is replaced when it raises (or is cancelled), since it may be in the
+        middle of a run.
+        """
+        if not self.started:
+            await self.start()
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise CodeRunnerBusy("Code runner queue is full, please retry")
+
+        enqueued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            worker = await self.idle.get()
+        finally:
+            self.waiting -= 1
+        queue_ms = (time.perf_counter() - enqueued_at) * 1000
+        self.queue_latencies.append(queue_ms)
+        try:
+            yield worker, round(queue_ms, 3)
+        except BaseException:
+            self.release(worker, False)
+            raise
+        self.release(worker, True)
+
+    async def run(self, code: str, stdin: str = "", limits: Optional[ResourceLimits] = None) -> ExecutionResult:
+        limits = limits or self.limits
+        queue_ms = 0.0
+        try:
+            async with self.checkout() as (worker, queue_ms):
+                data = await asyncio.wait_for(
+                    worker.run(code, stdin, limits), timeout=limits.wall_seconds + WORKER_GRACE_SECONDS
+                )
+        except (asyncio.TimeoutError, CodeRunnerError, ValueError) as e:
+            if isinstance(e, (CodeRunnerBusy, CodeRunnerUnavailable)):
+                raise
+            self.worker_failed(e)
+            data = INTERNAL_ERROR_RESULT
+
+        result = ExecutionResult.from_dict(data)
+        result.queue_ms = queue_ms
+        self.record(result)
+        return result
+
+    async def run_batch(
+        self,
+        code: str,
+        inputs: List[str],
+        limits: Optional[ResourceLimits] = None
+    ) -> AsyncIterator[Tuple[int, ExecutionResult]]:
+        """Run ``code`` once per stdin in ``inputs`` on a single worker, which
+        compiles it once and forks a sandboxed process per case; yields
+        ``(index, result)`` as each case finishes, in input order.
+
+        ``limits`` apply per case. Iterate to the end or ``aclose()`` the
+        generator, otherwise the worker stays checked out.
+        """
+        limits = limits or self.limits
+        next_index = 0
+        queue_ms = 0.0
+        try:
+            async with self.checkout() as (worker, queue_ms):
+                await worker.send({"code": code, "inputs": list(inputs), "limits": limits.to_dict()})
+                worker.runs += len(inputs)
+                self.batches += 1
+                while next_index < len(inputs):
+                    data = await asyncio.wait_for(worker.receive(), timeout=limits.wall_seconds + WORKER_GRACE_SECONDS)
+                    if data.get("index") != next_index:
+                        raise CodeRunnerError(f"Unexpected batch result: {data.get('stderr') or data}")
+                    result = ExecutionResult.from_dict(data)
+                    result.queue_ms = queue_ms
+                    self.record(result)
+                    next_index += 1
+                    yield data["index"], result
+                if not (await asyncio.wait_for(worker.receive(), timeout=WORKER_GRACE_SECONDS)).get("done"):
+                    raise CodeRunnerError("Batch did not finish cleanly")
+        except (asyncio.TimeoutError, CodeRunnerError, ValueError) as e:
+            if isinstance(e, (CodeRunnerBusy, CodeRunnerUnavailable)):
+                raise
+            self.worker_failed(e)
+            for index in range(next_index, len(inputs)):
+                result = ExecutionResult.from_dict(INTERNAL_ERROR_RESULT)
+                result.queue_ms = queue_ms
+                yield index, result
+
+    def worker_failed(self, error: Exception):
+        logger.error(f"{self.language} code runner worker failed: {str(error) or type(error).__name__}")
+
+    def record(self, result: ExecutionResult):
+        self.completed += 1
+        if result.status == "timeout":
+            self.timeouts += 1
+        self.run_latencies.append(result.duration_ms)
+
+    def release(self, worker: RunnerWorker, healthy: bool):
+        if self.closed or worker not in self.workers:
+            asyncio.ensure_future(worker.kill())
+        elif healthy and worker.runs < self.max_runs_per_worker:
+            self.idle.put_nowait(worker)
+        else:
+            asyncio.ensure_future(self.replace(worker))
+
+    async def replace(self, worker: RunnerWorker):
+        self.replaced += 1
+        await worker.kill()
+        delay = 0.5
+        while not self.closed:
+            try:
+                fresh = await self.spawn()
+            except (CodeRunnerError, OSError) as e:
+                logger.error(f"Could not restart {self.language} code runner worker: {str(e)}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+            if self.closed or worker not in self.workers:
+                await fresh.kill()
+                return
+            self.workers[self.workers.index(worker)] = fresh
+            self.idle.put_nowait(fresh)
+            return
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "language": self.language,
+            "unavailable": self.unavailable,
+            "workers": len(self.workers),
+            "idle": self.idle.qsize() if self.idle is not None else 0,
+            "queue_depth": self.waiting,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "batches": self.batches,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "workers_replaced": self.replaced,
+            "run_ms": latency_summary(self.run_latencies),
+            "queue_wait_ms": latency_summary(self.queue_latencies),
+        }
+
+def latency_summary(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    return {
+        "avg": round(sum(ordered) / len(ordered), 3),
+        "p50": round(ordered[len(ordered) // 2], 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+class CodeRunner:
+    """One CodeRunnerPool per supported language"""
+
+    def __init__(self, languages=SUPPORTED_LANGUAGES, **pool_options):
+        self.pools = {language: CodeRunnerPool(language, **pool_options) for language in languages}
+
+    def pool(self, language: str) -> CodeRunnerPool:
+        pool = self.pools.get(language)
+        if pool is None:
+            raise ValueError(f"Unsupported language: {language}")
+        return pool
+
+    async def start(self):
+        await asyncio.gather(*(pool.start() for pool in self.pools.values()))
+
+    async def close(self):
+        await asyncio.gather(*(pool.close() for pool in self.pools.values()))
+
+    async def run(
+        self,
+        language: str,
+        code: str,
+        stdin: str = "",
+        limits: Optional[ResourceLimits] = None
+    ) -> ExecutionResult:
+        return await self.pool(language).run(code, stdin, limits)
+
+    def run_batch(
+        self,
+        language: str,
+        code: str,
+        inputs: List[str],
+        limits: Optional[ResourceLimits] = None
+    ) -> AsyncIterator[Tuple[int, ExecutionResult]]:
+        return self.pool(language).run_batch(code, inputs, limits)
+
+    def stats(self) -> Dict[str, Any]:
+        return {language: pool.stats() for language, pool in self.pools.items()}
+
+if __name__ == "__main__" and "--worker" in sys.argv:
+    mount_point, uid, gid = sys.argv[sys.argv.index("--worker") + 1:][:3]
+    worker_main(mount_point, int(uid), int(gid))
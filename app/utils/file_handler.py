@@ -0,0 +1,147 @@
+import codecs
+import csv
+import json
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Deque, Dict, List, Optional, Tuple, Union
+
+from app.core.exceptions import ValidationError
+
+# A newline-free upload would otherwise be buffered whole
+MAX_LINE_CHARS = 1 << 20
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes],
+    encoding: str = "utf-8",
+    max_chars: int = MAX_LINE_CHARS
+) -> AsyncIterator[str]:
+    """Yield decoded lines from a byte stream without buffering the whole body.
+
+    Each chunk is split once; raises ValidationError for a line longer than
+    ``max_chars``.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    partial: List[str] = []  # Pieces of the line not yet ended
+    partial_chars = 0
+
+    def checked(line: str) -> str:
+        if len(line) > max_chars:
+            raise ValidationError(f"Line is longer than {max_chars} characters")
+        return line.rstrip("\r")
+
+    async for chunk in chunks:
+        *lines, rest = decoder.decode(chunk).split("\n")
+        if lines:
+            lines[0] = "".join(partial) + lines[0]
+            partial, partial_chars = [], 0
+            for line in lines:
+                yield checked(line)
+        partial.append(rest)
+        partial_chars += len(rest)
+        if partial_chars > max_chars:
+            raise ValidationError(f"Line is longer than {max_chars} characters")
+    partial.append(decoder.decode(b"", final=True))
+    last = "".join(partial)
+    if last:
+        yield checked(last)
+
+# Line scanner states for iter_csv_records, following the csv module's
+# default dialect: a quote only opens a field at its start, and "" inside a
+# quoted field is an escaped quote
+FIELD_START, UNQUOTED, QUOTED, QUOTE_IN_QUOTED = range(4)
+# An unterminated quote would otherwise pull the rest of the file into one record
+MAX_CSV_RECORD_CHARS = 1 << 20
+
+def csv_line_state(line: str, state: int = FIELD_START) -> int:
+    """Scanner state at the end of ``line``; QUOTED means the record continues on the next line"""
+    if state != QUOTED and '"' not in line:
+        return UNQUOTED
+    for char in line:
+        if state == QUOTED:
+            if char == '"':
+                state = QUOTE_IN_QUOTED
+        elif char == ",":
+            state = FIELD_START
+        elif char == '"' and state != UNQUOTED:
+            state = QUOTED
+        else:
+            state = UNQUOTED
+    return state
+
+class RecordLines:
+    """Line source for a csv.reader that is handed one complete record at a time"""
+
+    def __init__(self):
+        self.lines: Deque[str] = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+async def iter_csv_records(
+    chunks: AsyncIterable[bytes]
+) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], csv.Error]]]:
+    """Yield ``(row_number, record)`` for each CSV data row, keyed by the header.
+
+    Quoted fields may span lines: csv_line_state finds where each record
+    ends and a single csv.reader parses it, so only one record is held in
+    memory and each line is scanned once. A row the csv module rejects, or
+    one longer than MAX_CSV_RECORD_CHARS, yields its csv.Error instead.
+    """
+    source = RecordLines()
+    reader = csv.reader(source)
+    header = None
+
+    def complete(lines: List[str], too_long: bool) -> Optional[Union[Dict[str, Any], csv.Error]]:
+        nonlocal header
+        if too_long:
+            return csv.Error(f"Row is longer than {MAX_CSV_RECORD_CHARS} characters (unterminated quote?)")
+        source.lines.extend(lines)
+        try:
+            values = next(reader)
+        except csv.Error as e:
+            source.lines.clear()
+            return e
+        if header is None:
+            header = [column.strip() for column in values]
+            return None
+        return dict(zip(header, values))
+
+    row_number = 0
+    pending: List[str] = []
+    pending_chars = 0
+    state = FIELD_START
+    async for line in iter_lines(chunks):
+        if not pending and not line.strip():
+            continue
+        pending.append(line + "\n")
+        pending_chars += len(line) + 1
+        state = csv_line_state(line, state)
+        if state == QUOTED and pending_chars <= MAX_CSV_RECORD_CHARS:
+            continue
+        record = complete(pending, pending_chars > MAX_CSV_RECORD_CHARS)
+        pending, pending_chars, state = [], 0, FIELD_START
+        if record is not None:
+            row_number += 1
+            yield row_number, record
+    if pending:
+        # The file ended inside a quoted field; the csv module closes it there
+        pending[-1] = pending[-1][:-1]
+        record = complete(pending, False)
+        if record is not None:
+            yield row_number + 1, record
+
+async def iter_ndjson_records(chunks: AsyncIterable[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield ``(row_number, record)`` per non-blank NDJSON line; bad JSON yields the ValueError"""
+    row_number = 0
+    async for line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            yield row_number, json.loads(line)
+        except ValueError as e:
+            yield row_number, e
@@ -0,0 +1,165 @@
+"""Interval tree over half-open intervals ``[start, end)``.
+
+An AVL tree ordered by ``(start, end, key)`` in which every node also keeps
+the largest ``end`` in its subtree. That bound lets a lookup skip any
+subtree that ends before the query starts, so "does anything overlap
+[start, end)" walks a single root-to-leaf path (O(log n)) and listing the
+k overlapping intervals costs O(log n + k). Inserts and removals rebalance
+and refresh the bounds along one path, also O(log n).
+
+Endpoints are any mutually comparable values (ints are fastest); ``key``
+identifies an interval, e.g. a booking id, and must be comparable too.
+"""
+from typing import Any, Iterator, List, Optional, Tuple
+
+Interval = Tuple[Any, Any, Any]  # (start, end, key)
+
+class _Node:
+    __slots__ = ("start", "end", "key", "max_end", "height", "left", "right")
+
+    def __init__(self, start: Any, end: Any, key: Any):
+        self.start = start
+        self.end = end
+        self.key = key
+        self.max_end = end
+        self.height = 1
+        self.left: Optional["_Node"] = None
+        self.right: Optional["_Node"] = None
+
+def _height(node: Optional[_Node]) -> int:
+    return node.height if node is not None else 0
+
+def _update(node: _Node):
+    left, right = node.left, node.right
+    node.height = 1 + max(_height(left), _height(right))
+    max_end = node.end
+    if left is not None and left.max_end > max_end:
+        max_end = left.max_end
+    if right is not None and right.max_end > max_end:
+        max_end = right.max_end
+    node.max_end = max_end
+
+def _rotate_right(node: _Node) -> _Node:
+    pivot = node.left
+    node.left, pivot.right = pivot.right, node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+def _rotate_left(node: _Node) -> _Node:
+    pivot = node.right
+    node.right, pivot.left = pivot.left, node
+    _update(node)
+    _update(pivot)
+    return pivot
+
+def _rebalance(node: _Node) -> _Node:
+    _update(node)
+    balance = _height(node.left) - _height(node.right)
+    if balance > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if balance < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+def _insert(node: Optional[_Node], item: Interval) -> _Node:
+    if node is None:
+        return _Node(*item)
+    if item < (node.start, node.end, node.key):
+        node.left = _insert(node.left, item)
+    else:
+        node.right = _insert(node.right, item)
+    return _rebalance(node)
+
+def _remove(node: Optional[_Node], item: Interval) -> Tuple[Optional[_Node], bool]:
+    if node is None:
+        return None, False
+    current = (node.start, node.end, node.key)
+    if item < current:
+        node.left, removed = _remove(node.left, item)
+    elif item > current:
+        node.right, removed = _remove(node.right, item)
+    else:
+        if node.left is None:
+            return node.right, True
+        if node.right is None:
+            return node.left, True
+        successor = node.right
+        while successor.left is not None:
+            successor = successor.left
+        node.start, node.end, node.key = successor.start, successor.end, successor.key
+        node.right, removed = _remove(node.right, (successor.start, successor.end, successor.key))
+    if not removed:
+        return node, False
+    return _rebalance(node), True
+
+class IntervalTree:
+    def __init__(self, intervals: Optional[List[Interval]] = None):
+        self.root: Optional[_Node] = None
+        self.size = 0
+        for start, end, key in intervals or ():
+            self.add(start, end, key)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add(self, start: Any, end: Any, key: Any = None):
+        if not start < end:
+            raise ValueError("An interval must end after it starts")
+        self.root = _insert(self.root, (start, end, key))
+        self.size += 1
+
+    def remove(self, start: Any, end: Any, key: Any = None) -> bool:
+        """Remove one interval equal to ``(start, end, key)``; False if there was none"""
+        self.root, removed = _remove(self.root, (start, end, key))
+        if removed:
+            self.size -= 1
+        return removed
+
+    def overlaps(self, start: Any, end: Any) -> bool:
+        """Whether any interval intersects ``[start, end)``, in O(log n)"""
+        node = self.root
+        while node is not None:
+            if node.start < end and start < node.end:
+                return True
+            # If the left subtree reaches past ``start`` but holds no overlap,
+            # its reaching interval starts at or after ``end``, and so does
+            # everything to the right: only one side can hold an answer
+            if node.left is not None and node.left.max_end > start:
+                node = node.left
+            else:
+                node = node.right
+        return False
+
+    def overlapping(self, start: Any, end: Any) -> Iterator[Interval]:
+        """Intervals intersecting ``[start, end)``, in start order"""
+        stack: List[_Node] = []
+        node = self.root
+        while stack or node is not None:
+            # Subtrees that end at or before ``start`` are skipped whole
+            while node is not None and node.max_end > start:
+                stack.append(node)
+                node = node.left
+            if not stack:
+                return
+            node = stack.pop()
+            if node.start >= end:
+                return  # Everything after this starts too late
+            if node.end > start:
+                yield node.start, node.end, node.key
+            node = node.right
+
+    def __iter__(self) -> Iterator[Interval]:
+        stack: List[_Node] = []
+        node = self.root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.start, node.end, node.key
+            node = node.right
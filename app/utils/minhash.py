@@ -0,0 +1,86 @@
+"""MinHash signatures and LSH banding for near-duplicate detection.
+
+A signature holds, for each of ``num_perm`` hash functions, the minimum
+hash over a set of shingles; the fraction of positions where two
+signatures agree estimates the sets' Jaccard similarity. LSH splits the
+signature into ``bands`` of ``rows`` values and hashes each band to a
+bucket key: two sets land in at least one common bucket with probability
+``1 - (1 - J**rows)**bands``, a steep S-curve around
+``(1 / bands) ** (1 / rows)``, so candidates for a lookup come from a few
+indexed bucket probes instead of a scan.
+
+Shingles are hashed with crc32 and the hash family is multiply-shift over
+fixed seeds, so signatures and bucket keys are stable across processes and
+can be stored.
+"""
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+SIGNATURE_DTYPE = "<u4"
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, bands: int = 32, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        # Odd multipliers; the high 32 bits of a * x + b (mod 2**64) are the hash
+        self.multipliers = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.increments = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+        self.band_weights = rng.integers(0, 2 ** 63, size=self.rows, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+
+    def signature(self, shingles: Iterable[str]) -> Optional[np.ndarray]:
+        """uint32 signature of a shingle set, or None for an empty set"""
+        hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in set(shingles)), dtype=np.uint64)
+        if not len(hashes):
+            return None
+        with np.errstate(over="ignore"):
+            permuted = (hashes[:, None] * self.multipliers + self.increments) >> np.uint64(32)
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit bucket key per band"""
+        with np.errstate(over="ignore"):
+            keys = (signature.reshape(self.bands, self.rows).astype(np.uint64) * self.band_weights).sum(
+                axis=1, dtype=np.uint64
+            )
+        return keys.view(np.int64).tolist()
+
+def estimate_jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.count_nonzero(a == b)) / len(a)
+
+def encode_signature(signature: Optional[np.ndarray]) -> Optional[bytes]:
+    return None if signature is None else signature.astype(SIGNATURE_DTYPE).tobytes()
+
+def decode_signature(blob: Optional[bytes]) -> Optional[np.ndarray]:
+    return None if blob is None else np.frombuffer(blob, dtype=SIGNATURE_DTYPE).astype(np.uint32)
+
+class DisjointSet:
+    """Union-find over integer ids, for turning duplicate pairs into clusters"""
+
+    def __init__(self):
+        self.parent: Dict[int, int] = {}
+
+    def find(self, item: int) -> int:
+        root = self.parent.setdefault(item, item)
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while item != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # The smallest id represents the cluster
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def clusters(self) -> List[List[int]]:
+        groups: Dict[int, List[int]] = {}
+        for item in self.parent:
+            groups.setdefault(self.find(item), []).append(item)
+        return [sorted(members) for members in groups.values() if len(members) > 1]
@@ -0,0 +1,218 @@
+"""Vectorized candidate-job match scoring.
+
+Candidates are encoded once into column arrays (a packed skill bitset plus
+numeric features) and a job is scored against the whole batch with array
+operations, one pass per component. Every component is in [0, 1]; the total
+is their weighted mean scaled to 0-100 (the scale of
+``JobApplication.ai_match_score``). Components a job does not specify (no
+required skills, no salary range, ...) are left out of the mean rather than
+scored as a match or a miss.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_WEIGHTS = {
+    "required_skills": 0.45,
+    "preferred_skills": 0.15,
+    "experience": 0.2,
+    "salary": 0.1,
+    "remote": 0.1,
+}
+
+# Score given for a feature the candidate left blank
+UNKNOWN_SCORE = 0.5
+
+CANDIDATE_REMOTE_CODES = {None: 0, "any": 1, "remote": 2, "hybrid": 3, "onsite": 4}
+JOB_REMOTE_CODES = {"remote": 0, "hybrid": 1, "onsite": 2}
+
+# Rows: candidate preference (CANDIDATE_REMOTE_CODES); columns: job type
+REMOTE_COMPATIBILITY = np.array([
+    [UNKNOWN_SCORE, UNKNOWN_SCORE, UNKNOWN_SCORE],
+    [1.0, 1.0, 1.0],
+    [1.0, 0.5, 0.0],
+    [0.75, 1.0, 0.5],
+    [0.5, 0.75, 1.0],
+], dtype=np.float32)
+
+def normalize_skill(name: str) -> str:
+    return name.strip().lower()
+
+class SkillVocabulary:
+    """Maps skill names (case-insensitive) to bit positions"""
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.positions: Dict[str, int] = {}
+        for name in names:
+            self.add(name)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def add(self, name: str) -> int:
+        return self.positions.setdefault(normalize_skill(name), len(self.positions))
+
+    def lookup(self, names: Optional[Iterable[str]]) -> np.ndarray:
+        """Bit positions of the known names; unknown names no candidate has are dropped"""
+        positions = {self.positions.get(normalize_skill(name)) for name in names or ()}
+        positions.discard(None)
+        return np.array(sorted(positions), dtype=np.int64)
+
+class CandidateBatch:
+    """Column-oriented candidate features for scoring.
+
+    ``skills`` is an ``(n, ceil(len(vocabulary) / 8))`` uint8 bitset; numeric
+    features are float32 with NaN for unknown values.
+    """
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        skills: np.ndarray,
+        years_of_experience: np.ndarray,
+        expected_salary_min: np.ndarray,
+        expected_salary_max: np.ndarray,
+        remote_preference: np.ndarray,
+        vocabulary: SkillVocabulary
+    ):
+        self.ids = ids
+        self.skills = skills
+        self.years_of_experience = years_of_experience
+        self.expected_salary_min = expected_salary_min
+        self.expected_salary_max = expected_salary_max
+        self.remote_preference = remote_preference
+        self.vocabulary = vocabulary
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Sequence[Tuple[int, Optional[Iterable[str]], Optional[float], Optional[int], Optional[int], Optional[str]]],
+        vocabulary: Optional[SkillVocabulary] = None
+    ) -> "CandidateBatch":
+        """Encode ``(id, skill_names, years, salary_min, salary_max, remote_preference)`` rows"""
+        vocabulary = vocabulary or SkillVocabulary()
+        skill_positions = [[vocabulary.add(name) for name in row[1] or ()] for row in rows]
+
+        skills = np.zeros((len(rows), max(1, (len(vocabulary) + 7) // 8)), dtype=np.uint8)
+        row_index = np.repeat(np.arange(len(rows)), [len(positions) for positions in skill_positions])
+        positions = np.fromiter((p for ps in skill_positions for p in ps), dtype=np.int64, count=len(row_index))
+        np.bitwise_or.at(skills, (row_index, positions >> 3), (1 << (positions & 7)).astype(np.uint8))
+
+        def column(i: int) -> np.ndarray:
+            return np.array([np.nan if row[i] is None else row[i] for row in rows], dtype=np.float32)
+
+        return cls(
+            ids=np.array([row[0] for row in rows], dtype=np.int64),
+            skills=skills,
+            years_of_experience=column(2),
+            expected_salary_min=column(3),
+            expected_salary_max=column(4),
+            remote_preference=np.array(
+                [CANDIDATE_REMOTE_CODES.get(row[5], CANDIDATE_REMOTE_CODES[None]) for row in rows], dtype=np.int8
+            ),
+            vocabulary=vocabulary
+        )
+
+    @classmethod
+    def from_candidates(cls, candidates: Iterable, vocabulary: Optional[SkillVocabulary] = None) -> "CandidateBatch":
+        """Encode ORM candidates with ``skills -> skill`` loaded"""
+        return cls.from_rows([
+            (
+                candidate.id,
+                [candidate_skill.skill.name for candidate_skill in candidate.skills],
+                candidate.years_of_experience,
+                candidate.expected_salary_min,
+                candidate.expected_salary_max,
+                candidate.remote_work_preference
+            )
+            for candidate in candidates
+        ], vocabulary)
+
+    def skill_overlap(self, positions: np.ndarray) -> np.ndarray:
+        """Per-candidate count of the given skill bits that are set"""
+        # Names added to a shared vocabulary after this batch was encoded
+        positions = positions[positions < self.skills.shape[1] * 8]
+        if not len(positions):
+            return np.zeros(len(self), dtype=np.float32)
+        # Gather only the bytes holding the job's skills: (n, len(positions))
+        bits = (self.skills[:, positions >> 3] >> (positions & 7).astype(np.uint8)) & 1
+        return bits.sum(axis=1, dtype=np.float32)
+
+class MatchScores:
+    def __init__(self, ids: np.ndarray, total: np.ndarray, components: Dict[str, np.ndarray]):
+        self.ids = ids
+        self.total = total
+        self.components = components
+
+    def top(self, k: int) -> List[Tuple[int, float]]:
+        """Best ``k`` ``(candidate_id, total)`` pairs, highest first"""
+        k = min(k, len(self.total))
+        if k <= 0:
+            return []
+        top = np.argpartition(-self.total, k - 1)[:k]
+        top = top[np.argsort(-self.total[top], kind="stable")]
+        return [(int(self.ids[i]), float(self.total[i])) for i in top]
+
+def skill_score(batch: CandidateBatch, names: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+    names = {normalize_skill(name) for name in names or ()}
+    if not names:
+        return None
+    # Skills no candidate in the batch has still count against everyone
+    return batch.skill_overlap(batch.vocabulary.lookup(names)) / len(names)
+
+def experience_score(years: np.ndarray, min_years: Optional[float], max_years: Optional[float]) -> Optional[np.ndarray]:
+    if min_years is None and max_years is None:
+        return None
+    score = np.ones_like(years)
+    if min_years:
+        # Linear ramp up to the minimum
+        score = np.minimum(score, years / np.float32(min_years))
+    if max_years is not None:
+        # Gentle penalty for overqualification, floored at 0.5
+        over = (years - np.float32(max_years)) / np.float32(max(max_years, 1.0))
+        score = np.minimum(score, np.clip(1.0 - 0.5 * over, 0.5, 1.0))
+    return np.where(np.isnan(years), UNKNOWN_SCORE, np.clip(score, 0.0, 1.0)).astype(np.float32)
+
+def salary_score(
+    expected_min: np.ndarray,
+    expected_max: np.ndarray,
+    salary_min: Optional[int],
+    salary_max: Optional[int]
+) -> Optional[np.ndarray]:
+    budget = salary_max if salary_max is not None else salary_min
+    if not budget:
+        return None
+    # What the candidate needs at least; fall back to their upper bound
+    floor = np.where(np.isnan(expected_min), expected_max, expected_min)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score = np.where(floor <= budget, 1.0, np.float32(budget) / floor)
+    return np.where(np.isnan(floor), UNKNOWN_SCORE, score).astype(np.float32)
+
+def remote_score(remote_preference: np.ndarray, remote_work_type: Optional[str], is_remote: bool = False) -> Optional[np.ndarray]:
+    job_type = remote_work_type or ("remote" if is_remote else None)
+    if job_type not in JOB_REMOTE_CODES:
+        return None
+    return REMOTE_COMPATIBILITY[remote_preference, JOB_REMOTE_CODES[job_type]]
+
+def score_candidates(job, batch: CandidateBatch, weights: Optional[Dict[str, float]] = None) -> MatchScores:
+    """Score every candidate in ``batch`` against ``job`` (a Job or any object with its fields)"""
+    weights = weights or DEFAULT_WEIGHTS
+    components = {
+        "required_skills": skill_score(batch, job.required_skills),
+        "preferred_skills": skill_score(batch, job.preferred_skills),
+        "experience": experience_score(batch.years_of_experience, job.min_years_experience, job.max_years_experience),
+        "salary": salary_score(batch.expected_salary_min, batch.expected_salary_max, job.salary_min, job.salary_max),
+        "remote": remote_score(batch.remote_preference, job.remote_work_type, bool(job.is_remote)),
+    }
+    components = {name: score for name, score in components.items() if score is not None and weights.get(name)}
+
+    total = np.zeros(len(batch), dtype=np.float32)
+    weight_sum = sum(weights[name] for name in components)
+    for name, score in components.items():
+        total += np.float32(weights[name] / weight_sum) * score
+    if not components:
+        total[:] = UNKNOWN_SCORE
+    return MatchScores(batch.ids, np.round(total.astype(np.float64) * 100, 2), components)
@@ -0,0 +1,96 @@
+from collections import deque
+from typing import Any, Dict, Iterator, List, Tuple
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse whitespace runs, so patterns match across line breaks"""
+    return " ".join(text.lower().split())
+
+def is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+class AhoCorasick:
+    """Multi-pattern matcher: finds every occurrence of every pattern in one
+    pass over the text, O(len(text) + matches) regardless of pattern count.
+
+    Patterns are matched on normalize_text() and only as whole words: the
+    characters around a match must not be letters or digits, so "go" does
+    not match inside "google". Punctuation inside a pattern ("c++", "node.js")
+    is matched literally.
+    """
+
+    def __init__(self):
+        self.transitions: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.patterns: List[List[Tuple[int, Any]]] = [[]]  # Patterns ending at each state
+        self.outputs: List[List[Tuple[int, Any]]] = []  # ...plus those ending at its suffixes
+        self.built = False
+
+    def add(self, pattern: str, value: Any):
+        pattern = normalize_text(pattern)
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][char] = next_state
+                self.transitions.append({})
+                self.fail.append(0)
+                self.patterns.append([])
+            state = next_state
+        self.patterns[state].append((len(pattern), value))
+        self.built = False
+
+    def build(self):
+        """Compute failure links breadth-first; called lazily by iter()"""
+        # Depth-1 states fail to the root; deeper ones to the longest proper
+        # suffix that is also a prefix of some pattern
+        self.outputs = [list(patterns) for patterns in self.patterns]
+        queue = deque(self.transitions[0].values())
+        for state in queue:
+            self.fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.transitions[fallback].get(char, 0)
+                # Inherit the matches ending at that suffix
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+        self.built = True
+
+    def iter(self, text: str, normalized: bool = False) -> Iterator[Tuple[int, int, Any]]:
+        """Yield ``(start, end, value)`` for each whole-word match in the normalized text"""
+        if not self.built:
+            self.build()
+        if not normalized:
+            text = normalize_text(text)
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in self.transitions[state]:
+                state = self.fail[state]
+            state = self.transitions[state].get(char, 0)
+            for length, value in self.outputs[state]:
+                start = end - length
+                if (start == 0 or not is_word_char(text[start - 1])) and (end == len(text) or not is_word_char(text[end])):
+                    yield start, end, value
+
+    def find_longest(self, text: str) -> List[Tuple[int, int, Any]]:
+        """Leftmost-longest, non-overlapping matches, so "c++" wins over "c".
+
+        Values of patterns that are identical after normalization are all
+        reported for the same span.
+        """
+        text = normalize_text(text)
+        matches = sorted(self.iter(text, normalized=True), key=lambda match: (match[0], match[0] - match[1]))
+        selected, covered_until, span = [], 0, None
+        for start, end, value in matches:
+            if (start, end) == span:
+                selected.append((start, end, value))
+            elif start >= covered_until:
+                selected.append((start, end, value))
+                covered_until, span = end, (start, end)
+        return selected
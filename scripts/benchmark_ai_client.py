@@ -0,0 +1,102 @@
+"""
+Benchmark the AI client against the offline stub provider: completions where
+many callers send the same prompt (e.g. the same question rubric), and
+embeddings requested one text at a time by concurrent callers, each compared
+with one provider call per request under the same concurrency limit; then
+answer evaluations where most answers repeat an earlier one, through the
+response cache; and time to first byte of a
+streamed completion versus waiting for the whole reply.
+Usage: python scripts/benchmark_ai_client.py [requests] [latency_ms] [concurrency]
+
+No API key or network needed.
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.ai_service import AIClient, SemanticResponseCache, StubProvider, evaluation_request
+
+async def timed(label: str, count: int, coroutines, provider: StubProvider, kind: str):
+    calls_before = provider.calls[kind]
+    started = time.perf_counter()
+    await asyncio.gather(*coroutines)
+    elapsed = time.perf_counter() - started
+    calls = provider.calls[kind] - calls_before
+    print(f"{label:<32} {elapsed:8.2f} s  {count / elapsed:9.0f} req/s  {calls:6d} provider calls")
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+
+    provider = StubProvider(latency=latency)
+    client = AIClient(provider, max_concurrency=concurrency, max_queue=count)
+    limit = asyncio.Semaphore(concurrency)
+
+    async def direct(call):
+        async with limit:
+            return await call()
+
+    # 20 distinct prompts, so most requests have an identical one in flight
+    prompts = [f"Score this answer against rubric {i % 20}" for i in range(count)]
+    messages = [[{"role": "user", "content": prompt}] for prompt in prompts]
+    print(f"{count} requests, {latency * 1000:.0f} ms provider latency, {concurrency} concurrent calls\n")
+    await timed(
+        "completions, one call each", count,
+        [direct(lambda m=m: provider.complete(m, "stub", 256, 0.0)) for m in messages], provider, "complete"
+    )
+    await timed("completions, coalesced", count, [client.complete(prompt) for prompt in prompts], provider, "complete")
+
+    texts = [f"candidate {i} resume: python, postgres, distributed systems" for i in range(count)]
+    await timed(
+        "embeddings, one call each", count,
+        [direct(lambda t=t: provider.embed([t], "stub")) for t in texts], provider, "embed"
+    )
+    await timed("embeddings, micro-batched", count, [client.embed_one(text) for text in texts], provider, "embed")
+
+    cached_client = AIClient(provider, max_concurrency=concurrency, max_queue=count, cache=SemanticResponseCache())
+    answers = [f"answer {i % 200}: use a hash map keyed by value, then scan it once" for i in range(count)]
+
+    async def evaluate(i, answer):
+        return await cached_client.complete(**evaluation_request("find the mode", answer, company_id=i % 5))
+
+    # First occurrences, then the repeats, so repeats find the cache filled
+    # rather than racing the original call
+    calls_before = provider.calls["complete"]
+    started = time.perf_counter()
+    await asyncio.gather(*(evaluate(i, answer) for i, answer in enumerate(answers[:200])))
+    await asyncio.gather(*(evaluate(i, answer) for i, answer in enumerate(answers[200:], start=200)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{'evaluations, response cache':<32} {elapsed:8.2f} s  {count / elapsed:9.0f} req/s  "
+        f"{provider.calls['complete'] - calls_before:6d} provider calls"
+    )
+
+    # 64 words at 20 ms each after the first-token latency
+    streaming = AIClient(StubProvider(latency=latency, token_latency=0.02), max_concurrency=concurrency)
+    prompt = " ".join(f"word{i}" for i in range(62))
+    started = time.perf_counter()
+    await streaming.complete(prompt)
+    blocking = time.perf_counter() - started
+    started = time.perf_counter()
+    first_chunk = None
+    async for chunk in streaming.stream(prompt + " again"):
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - started
+    print(
+        f"{'completion, blocking':<32} {blocking * 1000:8.0f} ms to first byte\n"
+        f"{'completion, streamed':<32} {first_chunk * 1000:8.0f} ms to first byte, "
+        f"{(time.perf_counter() - started) * 1000:.0f} ms to last"
+    )
+
+    print(f"\nclient: {client.stats()}")
+    print(f"response cache: {cached_client.cache.stats()}")
+    await client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,103 @@
+"""
+Benchmark candidate creation: the previous multi-commit write path vs
+candidate_service.create_candidate (one flush, one commit).
+Usage: python scripts/benchmark_candidate_create.py [iterations]
+
+Runs against settings.DATABASE_URL (run `python scripts/init_db.py`
+first) and deletes the benchmark rows it creates.
+"""
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import selectinload
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.models import Candidate, CandidateSkill, EmbeddingQueueItem, Skill
+from app.schemas.candidate import CandidateCreate
+from app.services.candidate_service import calculate_profile_completion, create_candidate
+
+EMAIL_DOMAIN = "benchmark.intervieworchestrator.com"
+
+def candidate_payload(skill_ids):
+    return CandidateCreate(
+        first_name="Bench",
+        last_name="Candidate",
+        email=f"{uuid.uuid4().hex}@{EMAIL_DOMAIN}",
+        current_title="Software Engineer",
+        years_of_experience=5,
+        summary="Benchmark candidate",
+        skills=[{"skill_id": skill_id, "proficiency_level": "advanced"} for skill_id in skill_ids]
+    )
+
+async def create_candidate_legacy(db, candidate_data):
+    """The write path create_candidate replaced: existence check, three commits, reload"""
+    existing = await db.scalar(select(Candidate.id).where(Candidate.email == candidate_data.email))
+    if existing:
+        raise ValueError("Candidate email already exists")
+    db_candidate = Candidate(**candidate_data.dict(exclude={"skills"}))
+    db.add(db_candidate)
+    await db.commit()
+    for skill_data in candidate_data.skills:
+        db.add(CandidateSkill(candidate_id=db_candidate.id, **skill_data.dict()))
+    await db.commit()
+    db_candidate.profile_completion_score = calculate_profile_completion(db_candidate)
+    await db.commit()
+    return await db.scalar(
+        select(Candidate)
+        .options(selectinload(Candidate.skills).selectinload(CandidateSkill.skill))
+        .where(Candidate.id == db_candidate.id)
+        .execution_options(populate_existing=True)
+    )
+
+async def measure(name, create, skill_ids, iterations):
+    latencies = []
+    for _ in range(iterations):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            await create(db, candidate_payload(skill_ids))
+            latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    print(
+        f"{name:<10} n={iterations} mean={statistics.mean(latencies):.2f}ms "
+        f"p50={latencies[len(latencies) // 2]:.2f}ms "
+        f"p95={latencies[int(len(latencies) * 0.95) - 1]:.2f}ms"
+    )
+    return statistics.mean(latencies)
+
+async def main(iterations: int):
+    async with AsyncSessionLocal() as db:
+        skill_ids = (await db.scalars(select(Skill.id).limit(3))).all()
+    if not skill_ids:
+        print("No skills found; run `python scripts/init_db.py` first")
+        return
+
+    try:
+        # Warm up the pool and statement caches for both paths
+        await measure("warmup", create_candidate, skill_ids, 5)
+        await measure("warmup", create_candidate_legacy, skill_ids, 5)
+        legacy = await measure("legacy", create_candidate_legacy, skill_ids, iterations)
+        current = await measure("service", create_candidate, skill_ids, iterations)
+        print(f"speedup: {legacy / current:.2f}x")
+    finally:
+        async with AsyncSessionLocal() as db:
+            bench_ids = select(Candidate.id).where(Candidate.email.like(f"%@{EMAIL_DOMAIN}"))
+            await db.execute(delete(CandidateSkill).where(CandidateSkill.candidate_id.in_(bench_ids)))
+            # create_candidate queues an embedding; the queue has no foreign key to cascade it
+            await db.execute(delete(EmbeddingQueueItem).where(
+                EmbeddingQueueItem.entity_type == "candidate", EmbeddingQueueItem.entity_id.in_(bench_ids)
+            ))
+            await db.execute(delete(Candidate).where(Candidate.email.like(f"%@{EMAIL_DOMAIN}")))
+            await db.commit()
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
@@ -0,0 +1,82 @@
+"""
+Benchmark grading throughput for a coding round: every candidate submits a
+solution that is run against the problem's test cases, comparing one
+sandboxed run per test case, one batched run per submission, and a re-grade
+after one test case was edited (served from the result cache).
+Usage: python scripts/benchmark_code_runner.py [submissions] [test_cases] [workers]
+
+No database needed; runs on the local sandbox (Linux).
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services import coding_service
+from app.services.coding_service import GradingCase, grade_submission, is_passing
+from app.utils.code_runner import CodeRunnerPool
+
+SOLUTION = """
+import heapq
+n = int(input())
+values = list(map(int, input().split()))
+print(sum(heapq.nlargest(3, values)) + n)
+"""
+
+def make_cases(count: int):
+    cases = []
+    for i in range(count):
+        values = [(i * 7919 + j * 104729) % 1000 for j in range(200)]
+        cases.append(GradingCase(f"{i}\n{' '.join(map(str, values))}\n", f"{sum(sorted(values)[-3:]) + i}\n"))
+    return cases
+
+def make_submissions(count: int):
+    # Distinct sources, so nothing is shared through the cache between candidates
+    return [f"CANDIDATE = {i}{SOLUTION}" for i in range(count)]
+
+async def grade_per_case(pool: CodeRunnerPool, code: str, cases):
+    results = await asyncio.gather(*(pool.run(code, case.input) for case in cases))
+    return sum(is_passing(result, case) for result, case in zip(results, cases))
+
+async def timed(label: str, total_cases: int, coroutines):
+    started = time.perf_counter()
+    passed = sum(await asyncio.gather(*coroutines))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed:8.2f} s  {total_cases / elapsed:9.0f} cases/s  ({passed}/{total_cases} passed)")
+
+async def main():
+    submissions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    case_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    total = submissions * case_count
+
+    pool = CodeRunnerPool(size=workers, max_queue=submissions * case_count)
+    coding_service.code_runner.pools["python"] = pool
+    started = time.perf_counter()
+    await pool.start()
+    print(f"Started {workers} workers in {(time.perf_counter() - started) * 1000:.0f} ms")
+    print(f"{submissions} submissions x {case_count} test cases\n")
+
+    cases = make_cases(case_count)
+    codes = make_submissions(submissions)
+
+    async def passed(code, test_cases, problem_id):
+        return (await grade_submission("python", code, test_cases, problem_id=problem_id))["passed"]
+
+    await timed("one run per test case", total, [grade_per_case(pool, code, cases) for code in codes])
+    await timed("batched per submission", total, [passed(code, cases, "bench") for code in codes])
+    cases[0] = GradingCase(cases[0].input, cases[0].expected_output + "\n")
+    await timed("re-grade, 1 case edited", total, [passed(code, cases, "bench") for code in codes])
+
+    stats = pool.stats()
+    print(f"\nrun latency ms: {stats['run_ms']}")
+    print(f"queue wait ms:  {stats['queue_wait_ms']}")
+    print(f"result cache:   {coding_service.grading_result_cache.stats()}")
+    await pool.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Benchmark the interview scheduling index: per-interviewer interval trees
+(app.services.interview_service.CompanySchedule) vs scanning each
+interviewer's bookings, on a synthetic company of interviewers booked over
+three months of working days.
+Usage: python scripts/benchmark_scheduling.py [interviewers] [days]
+
+No database needed.
+"""
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.services.interview_service import CompanySchedule, slot_starts
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+def working_days(days):
+    return [day * DAY for day in range(days) if day % 7 < 5]
+
+def propose(rng, interviewers, days):
+    """A 30-120 minute panel interview on a half-hour grid between 9:00 and 17:00"""
+    panel = rng.sample(range(interviewers), rng.choice([1, 1, 2, 2, 3]))
+    length = rng.choice([30, 45, 60, 60, 90, 120]) * 60
+    start = rng.choice(days) + 9 * HOUR + rng.randrange(0, 8 * HOUR - length + 1, 1800)
+    return panel, start, start + length
+
+def scan_conflicts(bookings, interviewer_ids, start, end):
+    found = {}
+    for user_id in interviewer_ids:
+        clashes = [key for busy_start, busy_end, key in bookings[user_id] if busy_start < end and start < busy_end]
+        if clashes:
+            found[user_id] = sorted(clashes)
+    return found
+
+def scan_free_windows(bookings, interviewer_ids, start, end, min_length):
+    busy = sorted(
+        booking for user_id in set(interviewer_ids) for booking in bookings[user_id]
+        if booking[0] < end and start < booking[1]
+    )
+    windows = []
+    cursor = start
+    for busy_start, busy_end, _ in busy:
+        if busy_start - cursor >= min_length:
+            windows.append((cursor, busy_start))
+        cursor = max(cursor, busy_end)
+    if end - cursor >= min_length:
+        windows.append((cursor, end))
+    return windows
+
+def main(interviewers, days):
+    rng = random.Random(0)
+    calendar = working_days(days)
+    schedule = CompanySchedule(company_id=1)
+    bookings = {user_id: [] for user_id in range(interviewers)}
+
+    # Book about four interviews per interviewer per working day, skipping
+    # proposals that clash, the way the booking endpoint would
+    attempts = interviewers * len(calendar) * 4
+    started = time.perf_counter()
+    for interview_id in range(attempts):
+        panel, start, end = propose(rng, interviewers, calendar)
+        if not schedule.conflicts(panel, start, end):
+            schedule.book(interview_id, start, end, panel)
+    build_seconds = time.perf_counter() - started
+    for interview_id, (start, end, panel) in schedule.bookings.items():
+        for user_id in panel:
+            bookings[user_id].append((start, end, interview_id))
+
+    proposals = [propose(rng, interviewers, calendar) for _ in range(20_000)]
+    started = time.perf_counter()
+    tree_conflicts = [schedule.conflicts(*proposal) for proposal in proposals]
+    tree_check_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    scanned_conflicts = [scan_conflicts(bookings, *proposal) for proposal in proposals[:2000]]
+    scan_check_seconds = (time.perf_counter() - started) * 10
+    assert [
+        {user_id: sorted(ids) for user_id, ids in found.items()} for found in tree_conflicts[:2000]
+    ] == scanned_conflicts, "tree conflicts diverge from the scan"
+
+    # Three-interviewer panels looking for an hour in a two-week window
+    queries = []
+    for _ in range(2000):
+        window_start = rng.choice(calendar[:-10])
+        queries.append((rng.sample(range(interviewers), 3), window_start, window_start + 14 * DAY, HOUR))
+    started = time.perf_counter()
+    tree_windows = [schedule.free_windows(*query) for query in queries]
+    for windows in tree_windows:
+        slot_starts(windows, HOUR, 1800, limit=20)
+    tree_slot_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    scanned_windows = [scan_free_windows(bookings, *query) for query in queries[:200]]
+    scan_slot_seconds = (time.perf_counter() - started) * 10
+    assert tree_windows[:200] == scanned_windows, "tree free windows diverge from the scan"
+
+    booked = len(schedule.bookings)
+    print(f"interviewers={interviewers} working_days={len(calendar)} interviews={booked} "
+          f"bookings per interviewer={sum(len(b) for b in bookings.values()) / interviewers:.0f}")
+    print(f"build (with a conflict check per proposal): {build_seconds:.2f}s")
+    print(f"conflict checks/s: tree {len(proposals) / tree_check_seconds:,.0f}, "
+          f"scan {len(proposals) / scan_check_seconds:,.0f}")
+    print(f"3-interviewer free-slot queries/s (14-day window): tree {len(queries) / tree_slot_seconds:,.0f}, "
+          f"scan {len(queries) / scan_slot_seconds:,.0f}")
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 91
+    )
@@ -0,0 +1,32 @@
+"""
+Index every candidate for near-duplicate detection (MinHash/LSH) and
+recompute the duplicate clusters (candidate_minhashes.cluster_id).
+Usage: python scripts/cluster_duplicate_candidates.py [batch_size]
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.services.similarity_service import candidate_deduplicator
+
+async def main(batch_size: int):
+    try:
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            stats = await candidate_deduplicator.cluster_candidates(db, batch_size=batch_size)
+        print(
+            f"Indexed {stats['indexed']} candidates, checked {stats['pairs_checked']} bucket collisions: "
+            f"{stats['duplicate_pairs']} duplicate pairs in {stats['clusters']} clusters "
+            f"({stats['clustered_candidates']} candidates) in {time.perf_counter() - started:.1f} s"
+        )
+    finally:
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
@@ -0,0 +1,41 @@
+"""
+Run the embedding pipeline once: queue never-embedded candidates and jobs
+(or everything with --all, e.g. after changing EMBEDDING_BACKEND or the
+model), then drain the queue. Rows whose embedding text is unchanged are
+skipped without calling the embedder.
+Usage: python scripts/embed_pending.py [--all]
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.services.embedding_service import embedding_pipeline
+
+async def main(everything: bool):
+    try:
+        async with AsyncSessionLocal() as db:
+            if everything:
+                queued = await embedding_pipeline.enqueue_all(db)
+            else:
+                queued = await embedding_pipeline.enqueue_missing(db)
+            started = time.perf_counter()
+            stats = await embedding_pipeline.drain(db)
+            elapsed = time.perf_counter() - started
+            queue = await embedding_pipeline.queue_stats(db)
+        print(
+            f"Queued {queued}; {stats['claimed']} processed in {stats['batches']} batches "
+            f"({stats['claimed'] / elapsed if elapsed else 0:.0f}/s) with {embedding_pipeline.embedder.name}: "
+            f"{stats['embedded']} embedded, {stats['unchanged']} unchanged, {stats['missing']} deleted, "
+            f"{stats['failed']} failed; {queue['depth']} left in the queue"
+        )
+    finally:
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main("--all" in sys.argv[1:]))
@@ -0,0 +1,29 @@
+"""
+Derive resume skills (CandidateSkill rows with source="resume") for every
+candidate with resume text.
+Usage: python scripts/extract_resume_skills.py [batch_size]
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import AsyncSessionLocal, async_engine
+from app.services.skill_service import extract_resume_skills
+
+async def main(batch_size: int):
+    try:
+        async with AsyncSessionLocal() as db:
+            stats = await extract_resume_skills(db, batch_size=batch_size)
+        print(
+            f"Scanned {stats['candidates']} resumes: {stats['skills_added']} resume skills, "
+            f"{stats['candidates_changed']} candidates changed"
+        )
+    finally:
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
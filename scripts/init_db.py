@@ -11,7 +11,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from app.core.config import settings
 from app.core.database import Base
 from app.models import *  # Import all models
@@ -25,6 +25,10 @@ def create_database():
     try:
         engine = create_engine(settings.DATABASE_URL)
         
+        # Trigram indexes on candidates need pg_trgm before create_all
+        with engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        
         logger.info("Creating database tables...")
         Base.metadata.create_all(bind=engine)
         logger.info("Database tables created successfully!")